@@ -0,0 +1,104 @@
+"""Benchmark per-trade Account.save() cost against transaction history size.
+
+Compares the incremental (delta) save path with the legacy full-state rewrite on a
+throwaway database, e.g.:
+
+    uv run scripts/bench_account_save.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+BENCH_ACCOUNT = "bench_trader"
+
+
+def _seed_history(db_path: str, size: int) -> None:
+    """Bulk insert `size` transactions and history points directly through sqlite3."""
+    with sqlite3.connect(db_path) as conn:
+        for table, column in (("transactions", "account_name"), ("portfolio_history", "account_name"),
+                              ("portfolio_rollups", "account_name"), ("positions", "account_name"),
+                              ("holdings", "account_name"),
+                              ("accounts", "name")):
+            conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (BENCH_ACCOUNT,))
+        conn.execute(
+            "INSERT INTO accounts (name, balance_paise, strategy) VALUES (?, ?, ?)",
+            (BENCH_ACCOUNT, 10_000_000, "benchmark"),
+        )
+        conn.executemany(
+            "INSERT INTO transactions (account_name, symbol, quantity, price_paise, timestamp, rationale) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (BENCH_ACCOUNT, f"SYM{i % 50}", 1, 10_000, f"2020-01-01 00:00:00.{i:07d}", "seed")
+                for i in range(size)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO portfolio_history (account_name, timestamp, value_paise) VALUES (?, ?, ?)",
+            ((BENCH_ACCOUNT, f"2020-01-01 00:00:00.{i:07d}", 10_000_000) for i in range(size)),
+        )
+        conn.commit()
+
+
+async def _time_saves(size: int, trades: int, full_rewrite: bool) -> float:
+    """Return mean seconds per save after appending one trade and one history point."""
+    from src.core.database import async_write_account
+    from src.core.models import Account, Transaction
+
+    account = await Account.get(BENCH_ACCOUNT)
+    elapsed = 0.0
+    for i in range(trades):
+        ts = f"2030-01-01 00:00:00.{size + i:07d}{'f' if full_rewrite else 'd'}"
+        account.transactions.append(Transaction(
+            symbol="BENCH", quantity=1, price=Decimal("100.00"), timestamp=ts, rationale="bench"
+        ))
+        account.holdings["BENCH"] = account.holdings.get("BENCH", 0) + 1
+        account.balance -= Decimal("100.00")
+        account.portfolio_value_time_series.append((ts, 100000.0))
+
+        start = time.perf_counter()
+        if full_rewrite:
+            await async_write_account(BENCH_ACCOUNT, account.model_dump(mode="json"))
+        else:
+            await account.save()
+        elapsed += time.perf_counter() - start
+    return elapsed / trades
+
+
+async def run(sizes, trades: int, full_trades: int) -> None:
+    from src.core.database import DB, db_manager, setup_database
+
+    await setup_database()
+    print(f"{'history':>10} | {'delta save (ms)':>16} | {'full rewrite (ms)':>18}")
+    print("-" * 52)
+    for size in sizes:
+        _seed_history(DB, size)
+        delta_ms = await _time_saves(size, trades, full_rewrite=False) * 1000
+        full_ms = await _time_saves(size, full_trades, full_rewrite=True) * 1000 if full_trades else float("nan")
+        print(f"{size:>10,} | {delta_ms:>16.3f} | {full_ms:>18.3f}")
+    await db_manager.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--trades", type=int, default=200, help="delta saves measured per size")
+    parser.add_argument("--full-trades", type=int, default=3, help="full rewrites measured per size (0 to skip)")
+    args = parser.parse_args()
+
+    # The database path is relative, so run against a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="bench_account_save_"))
+    asyncio.run(run(args.sizes, args.trades, args.full_trades))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,70 @@
 
 from .models import Account, Transaction
 from .database import (
+    db_manager,
     async_write_account,
     async_read_account,
+    async_read_account_version,
+    async_read_transactions,
+    async_read_portfolio_history,
+    async_iter_transactions,
+    async_iter_portfolio_history,
+    async_read_portfolio_series,
     async_write_log,
+    submit_log,
     async_read_log,
     async_write_market,
     async_read_market,
 )
-from .market import get_share_price, get_historical_close, is_market_open
+from .money import Paise, to_paise, paise_to_decimal
+from .market import get_share_price, get_share_prices, aget_share_price, aget_share_prices, get_historical_close, is_market_open, next_market_open, get_quote_cache_stats, get_provider_health
+from .candles import CandleStore, candle_store
+from .market_calendar import ExchangeCalendar, get_calendar
+from .instruments import Instrument, InstrumentIndex, instrument_index
+from .executor import OrderExecutor, order_executor, get_order_queue_stats
+from .market_feed import MarketDataDaemon, ReplayFeedSource, tick_store, start_market_feed
 
 __all__ = [
     "Account",
     "Transaction",
+    "db_manager",
     "async_write_account",
     "async_read_account",
+    "async_read_account_version",
+    "async_read_transactions",
+    "async_read_portfolio_history",
+    "async_iter_transactions",
+    "async_iter_portfolio_history",
+    "async_read_portfolio_series",
     "async_write_log",
+    "submit_log",
     "async_read_log",
     "async_write_market",
     "async_read_market",
+    "Paise",
+    "to_paise",
+    "paise_to_decimal",
     "get_share_price",
+    "get_share_prices",
+    "aget_share_price",
+    "aget_share_prices",
     "get_historical_close",
     "is_market_open",
+    "next_market_open",
+    "get_quote_cache_stats",
+    "get_provider_health",
+    "CandleStore",
+    "candle_store",
+    "ExchangeCalendar",
+    "get_calendar",
+    "Instrument",
+    "InstrumentIndex",
+    "instrument_index",
+    "MarketDataDaemon",
+    "ReplayFeedSource",
+    "tick_store",
+    "start_market_feed",
+    "OrderExecutor",
+    "order_executor",
+    "get_order_queue_stats",
 ]
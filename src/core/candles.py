@@ -0,0 +1,254 @@
+# src/core/candles.py
+"""
+On-disk historical candle store.
+Candles live in one append-only binary file of fixed-size records per instrument and interval,
+read back through NumPy memory maps. Each file has a small sidecar recording the time range
+already fetched, so range queries only ask the provider for the parts not yet covered, and
+periods with no trading (holidays) are not re-requested.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from .instruments import Instrument
+
+logger = logging.getLogger("candles")
+
+CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", "data/candles")
+
+CANDLE_DTYPE = np.dtype([
+    ("ts", "<i8"),       # bucket start, epoch seconds
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<i8"),
+])
+
+# Interval name -> bucket length in seconds
+INTERVALS: Dict[str, int] = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "1d": 86400}
+
+EXCHANGE_TIMEZONES = {
+    "NSE": "Asia/Kolkata",
+    "BSE": "Asia/Kolkata",
+    "NASDAQ": "America/New_York",
+    "NYSE": "America/New_York",
+    "HKEX": "Asia/Hong_Kong",
+}
+
+
+def exchange_timezone(exchange: str) -> ZoneInfo:
+    return ZoneInfo(EXCHANGE_TIMEZONES.get(exchange, "UTC"))
+
+
+def _empty() -> np.ndarray:
+    return np.empty(0, dtype=CANDLE_DTYPE)
+
+
+class CandleSource(ABC):
+    """Upstream history provider."""
+
+    @abstractmethod
+    def supports_instrument(self, inst: Instrument) -> bool:
+        pass
+
+    @abstractmethod
+    def fetch(self, inst: Instrument, interval: str, start: int, end: int) -> np.ndarray:
+        """Candles with start <= ts <= end as a CANDLE_DTYPE array sorted by ts."""
+
+
+class GrowwCandleSource(CandleSource):
+    """Historical candles for NSE/BSE cash instruments from the Groww SDK."""
+
+    SDK_INTERVALS = {"1m": "1minute", "5m": "5minute", "15m": "15minute", "1h": "1hour", "1d": "1day"}
+    # Longest range requested per call, kept within the API's per-request limits
+    MAX_SPAN_DAYS = {"1m": 7, "5m": 15, "15m": 30, "1h": 90, "1d": 365}
+
+    def __init__(self, client=None):
+        if client is None:
+            from groww_client import client as groww_client
+            client = groww_client
+        self.client = client
+
+    def supports_instrument(self, inst: Instrument) -> bool:
+        return inst.exchange in {"NSE", "BSE"} and self.client.available()
+
+    def fetch(self, inst: Instrument, interval: str, start: int, end: int) -> np.ndarray:
+        tz = exchange_timezone(inst.exchange)
+        span = self.MAX_SPAN_DAYS[interval] * 86400
+        chunks = []
+        for chunk_start in range(start, end + 1, span):
+            chunk_end = min(end, chunk_start + span - 1)
+            payload = self.client.get_historical_candles(
+                exchange=inst.exchange,
+                segment="CASH",
+                groww_symbol=f"{inst.exchange}-{inst.symbol}",
+                start_time=datetime.fromtimestamp(chunk_start, tz).strftime("%Y-%m-%d %H:%M:%S"),
+                end_time=datetime.fromtimestamp(chunk_end, tz).strftime("%Y-%m-%d %H:%M:%S"),
+                candle_interval=self.SDK_INTERVALS[interval],
+            )
+            chunks.append(self._parse(payload.get("candles") or [], tz))
+        candles = np.concatenate(chunks) if chunks else _empty()
+        candles = candles[(candles["ts"] >= start) & (candles["ts"] <= end)]
+        return candles[np.argsort(candles["ts"], kind="stable")]
+
+    @staticmethod
+    def _parse(rows: List[list], tz: ZoneInfo) -> np.ndarray:
+        candles = np.empty(len(rows), dtype=CANDLE_DTYPE)
+        for i, row in enumerate(rows):
+            ts = row[0]
+            if isinstance(ts, str):
+                parsed = datetime.fromisoformat(ts)
+                ts = (parsed if parsed.tzinfo else parsed.replace(tzinfo=tz)).timestamp()
+            elif ts > 10**11:
+                ts = ts / 1000
+            candles[i] = (int(ts), row[1], row[2], row[3], row[4], int(row[5] or 0) if len(row) > 5 else 0)
+        return candles
+
+
+class CandleStore:
+    """
+    Range queries over locally stored candles, filling missing history from `source`.
+    Files are <root>/<interval>/<EXCHANGE>_<SYMBOL>.bin with a .json coverage sidecar.
+    Only closed buckets are stored, so a partial candle is never frozen on disk.
+    """
+
+    def __init__(self, root: Union[str, Path] = CANDLE_STORE_DIR, source: Optional[CandleSource] = None):
+        self.root = Path(root)
+        self._source = source
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.fetches = 0
+
+    @property
+    def source(self) -> Optional[CandleSource]:
+        if self._source is None:
+            try:
+                self._source = GrowwCandleSource()
+            except Exception as exc:
+                logger.warning(f"Groww candle source unavailable: {exc}")
+        return self._source
+
+    def _lock(self, key: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((key, interval), threading.Lock())
+
+    def _paths(self, inst: Instrument, interval: str) -> Tuple[Path, Path]:
+        base = self.root / interval / f"{inst.exchange}_{inst.symbol}"
+        return base.with_suffix(".bin"), base.with_suffix(".json")
+
+    @staticmethod
+    def _read_coverage(meta_path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            return int(meta["start"]), int(meta["end"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @staticmethod
+    def _write_coverage(meta_path: Path, start: int, end: int) -> None:
+        tmp = meta_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"start": start, "end": end}), encoding="utf-8")
+        os.replace(tmp, meta_path)
+
+    @staticmethod
+    def _map(data_path: Path) -> np.ndarray:
+        """Read-only memory map of a candle file (empty array if it has no records)."""
+        try:
+            size = data_path.stat().st_size
+        except OSError:
+            return _empty()
+        count = size // CANDLE_DTYPE.itemsize
+        if not count:
+            return _empty()
+        return np.memmap(data_path, dtype=CANDLE_DTYPE, mode="r", shape=(count,))
+
+    def _merge(self, data_path: Path, fetched: np.ndarray) -> None:
+        """Append candles newer than the file's last record; rewrite the file for earlier ones."""
+        if not len(fetched):
+            return
+        existing = self._map(data_path)
+        if not len(existing) or fetched["ts"][0] > existing["ts"][-1]:
+            with open(data_path, "ab") as f:
+                f.write(fetched.tobytes())
+            return
+        merged = np.concatenate([np.asarray(existing), fetched])
+        merged = merged[np.argsort(merged["ts"], kind="stable")]
+        keep = np.ones(len(merged), dtype=bool)
+        keep[:-1] = merged["ts"][1:] != merged["ts"][:-1]
+        del existing
+        tmp = data_path.with_suffix(".bin.tmp")
+        merged[keep].tofile(tmp)
+        os.replace(tmp, data_path)
+
+    def _fill(self, inst: Instrument, interval: str, start: int, end: int) -> None:
+        data_path, meta_path = self._paths(inst, interval)
+        coverage = self._read_coverage(meta_path)
+        if coverage is None:
+            missing = [(start, end)]
+        else:
+            missing = [(a, b) for a, b in ((start, coverage[0] - 1), (coverage[1] + 1, end)) if a <= b]
+        source = self.source
+        if not missing or source is None or not source.supports_instrument(inst):
+            return
+
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        for a, b in missing:
+            self.fetches += 1
+            try:
+                fetched = source.fetch(inst, interval, a, b)
+            except Exception as exc:
+                logger.warning(f"Candle fetch failed for '{inst.key}' {interval} [{a}, {b}]: {exc}", exc_info=True)
+                return
+            self._merge(data_path, fetched)
+            if coverage is None:
+                coverage = (a, b)
+            else:
+                # Ranges only ever extend the covered span at either end, so it stays contiguous
+                coverage = (min(coverage[0], a), max(coverage[1], b))
+            self._write_coverage(meta_path, *coverage)
+
+    def range(self, symbol: Union[str, Instrument], interval: str, start: Union[int, datetime],
+              end: Union[int, datetime, None] = None) -> np.ndarray:
+        """
+        Candles with start <= ts <= end (epoch seconds or aware datetimes) as a read-only
+        CANDLE_DTYPE array, e.g. candles["close"]. Missing history is fetched first.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported candle interval '{interval}'.")
+        inst = Instrument.parse(symbol)
+        start_ts = int(start.timestamp()) if isinstance(start, datetime) else int(start)
+        end_ts = int(time.time()) if end is None else (int(end.timestamp()) if isinstance(end, datetime) else int(end))
+        # Never cover buckets that have not closed yet
+        last_closed = int(time.time()) // INTERVALS[interval] * INTERVALS[interval] - 1
+        fill_end = min(end_ts, last_closed)
+        data_path, _ = self._paths(inst, interval)
+        with self._lock(inst.key, interval):
+            if start_ts <= fill_end:
+                self._fill(inst, interval, start_ts, fill_end)
+            candles = self._map(data_path)
+        if not len(candles):
+            return candles
+        ts = candles["ts"]
+        return candles[np.searchsorted(ts, start_ts, "left"):np.searchsorted(ts, end_ts, "right")]
+
+    def close_on(self, symbol: Union[str, Instrument], date_iso: str, lookback_days: int = 7) -> Optional[float]:
+        """Daily close for the exchange-local date, or the last close before it within lookback_days."""
+        inst = Instrument.parse(symbol)
+        tz = exchange_timezone(inst.exchange)
+        day = datetime.strptime(date_iso, "%Y-%m-%d").replace(tzinfo=tz)
+        candles = self.range(inst, "1d", day - timedelta(days=lookback_days), day + timedelta(days=1, seconds=-1))
+        return float(candles["close"][-1]) if len(candles) else None
+
+
+candle_store = CandleStore()
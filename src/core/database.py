@@ -4,14 +4,23 @@ Persistent Async Database Connection Manager with Safe SQL Migration & Pure Asyn
 Backed by aiosqlite with WAL mode and foreign key constraints.
 """
 
+import os
 import sqlite3
 import aiosqlite
 import asyncio
 import json
 import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from dotenv import load_dotenv
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+
+from .money import to_paise, paise_to_decimal, paise_to_float
+from .migrations import PORTFOLIO_ROLLUP_RESOLUTIONS, migrate
 
 load_dotenv(override=True)
 
@@ -20,144 +29,12 @@ logger = logging.getLogger("database")
 
 
 def _init_db_sync():
-    """
-    Ensure normalized relational tables exist with WAL mode and foreign key constraints.
-    Safe Migration: If legacy JSON schema exists, migrate data safely without data loss before cleanup.
-    """
-    with sqlite3.connect(DB) as conn:
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL;")
-        cursor.execute("PRAGMA synchronous=NORMAL;")
-        cursor.execute("PRAGMA foreign_keys=ON;")
-
-        # Safe Migration Check
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='accounts'")
-        table_exists = cursor.fetchone()
-        if table_exists:
-            cursor.execute("PRAGMA table_info(accounts)")
-            columns = [row[1] for row in cursor.fetchall()]
-            if "account" in columns and "balance" not in columns:
-                logger.info("Safe SQL Migration: Migrating legacy JSON accounts table to normalized relational schema...")
-                cursor.execute("ALTER TABLE accounts RENAME TO accounts_legacy")
-
-        # 1. Relational Accounts Table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS accounts (
-                name TEXT PRIMARY KEY,
-                balance TEXT NOT NULL,
-                strategy TEXT
-            )
-        """)
-
-        # 2. Relational Holdings Table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS holdings (
-                account_name TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                quantity INTEGER NOT NULL,
-                PRIMARY KEY (account_name, symbol),
-                FOREIGN KEY (account_name) REFERENCES accounts(name) ON DELETE CASCADE
-            )
-        """)
-
-        # 3. Relational Transactions Table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                account_name TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                quantity INTEGER NOT NULL,
-                price TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                rationale TEXT,
-                FOREIGN KEY (account_name) REFERENCES accounts(name) ON DELETE CASCADE
-            )
-        """)
-        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_acc_ts_sym ON transactions (account_name, timestamp, symbol);")
-
-        # 4. Portfolio History Table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS portfolio_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                account_name TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                portfolio_value TEXT NOT NULL,
-                FOREIGN KEY (account_name) REFERENCES accounts(name) ON DELETE CASCADE
-            )
-        """)
-        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_portfolio_history_acc_ts ON portfolio_history (account_name, timestamp);")
-
-        # 5. Logs Table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                datetime TEXT,
-                type TEXT,
-                message TEXT
-            )
-        """)
-
-        # 6. Market Cache Table
-        cursor.execute("CREATE TABLE IF NOT EXISTS market (date TEXT PRIMARY KEY, data TEXT)")
-
-        # Execute Safe Legacy Data Population if accounts_legacy exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='accounts_legacy'")
-        if cursor.fetchone():
-            try:
-                cursor.execute("SELECT name, account FROM accounts_legacy")
-                legacy_rows = cursor.fetchall()
-                for acc_name, json_str in legacy_rows:
-                    if not json_str:
-                        continue
-                    data = json.loads(json_str)
-                    clean_name = acc_name.lower().strip()
-                    balance_str = str(data.get("balance", "100000.00"))
-                    strategy = data.get("strategy", "")
-                    
-                    cursor.execute("""
-                        INSERT INTO accounts (name, balance, strategy)
-                        VALUES (?, ?, ?)
-                        ON CONFLICT(name) DO UPDATE SET balance=excluded.balance, strategy=excluded.strategy
-                    """, (clean_name, balance_str, strategy))
-
-                    for sym, qty in data.get("holdings", {}).items():
-                        if qty > 0:
-                            cursor.execute("""
-                                INSERT INTO holdings (account_name, symbol, quantity)
-                                VALUES (?, ?, ?)
-                                ON CONFLICT(account_name, symbol) DO UPDATE SET quantity=excluded.quantity
-                            """, (clean_name, sym.upper(), qty))
-
-                    for t in data.get("transactions", []):
-                        cursor.execute("""
-                            INSERT INTO transactions (account_name, symbol, quantity, price, timestamp, rationale)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                            ON CONFLICT(account_name, timestamp, symbol) DO UPDATE SET
-                                quantity=excluded.quantity, price=excluded.price, rationale=excluded.rationale
-                        """, (
-                            clean_name,
-                            t.get("symbol", "").upper(),
-                            t.get("quantity", 0),
-                            str(t.get("price", "0.0")),
-                            t.get("timestamp", ""),
-                            t.get("rationale", "")
-                        ))
-
-                    for ts_entry in data.get("portfolio_value_time_series", []):
-                        if isinstance(ts_entry, (list, tuple)) and len(ts_entry) == 2:
-                            cursor.execute("""
-                                INSERT INTO portfolio_history (account_name, timestamp, portfolio_value)
-                                VALUES (?, ?, ?)
-                                ON CONFLICT(account_name, timestamp) DO UPDATE SET portfolio_value=excluded.portfolio_value
-                            """, (clean_name, str(ts_entry[0]), str(ts_entry[1])))
-
-                cursor.execute("DROP TABLE accounts_legacy")
-                logger.info("Safe SQL Migration completed successfully. Legacy table removed.")
-            except Exception as exc:
-                logger.error(f"Migration error: {exc}. Retaining accounts_legacy table for safety.", exc_info=True)
-
-        conn.commit()
+    """Bring the schema up to date; a single PRAGMA read when it already is (see migrations.py)."""
+    conn = sqlite3.connect(DB)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
 
 
 async def setup_database() -> None:
@@ -169,15 +46,41 @@ async def setup_database() -> None:
 # Module-Level Persistent Connection Pool / Manager
 # -------------------------------------------------------------
 
+DB_READER_POOL_SIZE = int(os.getenv("DB_READER_POOL_SIZE", "3"))
+
+# (owning task, writer connection) of the unit of work running in the current context
+_active_transaction: ContextVar[Optional[Tuple[asyncio.Task, aiosqlite.Connection]]] = ContextVar(
+    "db_active_transaction", default=None
+)
+
+
 class AsyncDatabaseManager:
-    """Module-level persistent connection pool manager for aiosqlite."""
+    """
+    Module-level persistent connection manager for aiosqlite.
+    Writes go through one dedicated writer connection; reads lease a connection from a small
+    pool of read-only connections so that, under WAL, they never queue behind trade writes.
+    """
 
-    def __init__(self, db_path: str = DB):
+    def __init__(self, db_path: str = DB, reader_pool_size: int = DB_READER_POOL_SIZE):
         self.db_path = db_path
+        self.reader_pool_size = max(0, reader_pool_size)
         self._conn: Optional[aiosqlite.Connection] = None
         self._lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: deque = deque()
+        self._reader_waiters: deque = deque()
+        self._opening_readers = 0
+        self._writer_leased = False
+        self._writer_waiters: deque = deque()
+        self._reader_stats = {
+            "acquisitions": 0,
+            "waits": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
 
     async def get_connection(self) -> aiosqlite.Connection:
+        """Return the single writer connection, (re)opening it if needed."""
         async with self._lock:
             if self._conn is None or not self._conn._running:
                 self._conn = await aiosqlite.connect(self.db_path)
@@ -186,8 +89,134 @@ class AsyncDatabaseManager:
                 await self._conn.execute("PRAGMA foreign_keys=ON;")
             return self._conn
 
+    async def _acquire_writer(self) -> None:
+        if not self._writer_leased:
+            self._writer_leased = True
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._writer_waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_writer()
+            raise
+
+    def _release_writer(self) -> None:
+        while self._writer_waiters:
+            waiter = self._writer_waiters.popleft()
+            if not waiter.done() and not waiter.get_loop().is_closed():
+                waiter.set_result(None)
+                return
+        self._writer_leased = False
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Lease the writer connection exclusively for one unit of work.
+        Statements inside the block commit together on exit or roll back on error, and no other
+        coroutine can write in between. Nested blocks in the same task join the outer transaction.
+        """
+        current = asyncio.current_task()
+        active = _active_transaction.get()
+        if active is not None and active[0] is current:
+            yield active[1]
+            return
+
+        await self._acquire_writer()
+        try:
+            conn = await self.get_connection()
+            await conn.execute("BEGIN IMMEDIATE;")
+            token = _active_transaction.set((current, conn))
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            else:
+                await conn.commit()
+            finally:
+                _active_transaction.reset(token)
+        finally:
+            self._release_writer()
+
+    async def _open_reader(self) -> aiosqlite.Connection:
+        # Make sure the database file and its WAL exist before opening read-only
+        await self.get_connection()
+        conn = await aiosqlite.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        await conn.execute("PRAGMA query_only=ON;")
+        return conn
+
+    async def _acquire_reader(self) -> aiosqlite.Connection:
+        while self._idle_readers:
+            conn = self._idle_readers.popleft()
+            if conn._running:
+                return conn
+            self._readers.remove(conn)
+
+        if len(self._readers) + self._opening_readers < self.reader_pool_size:
+            self._opening_readers += 1
+            try:
+                conn = await self._open_reader()
+            finally:
+                self._opening_readers -= 1
+            self._readers.append(conn)
+            return conn
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._reader_waiters.append(waiter)
+        self._reader_stats["waits"] += 1
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_reader(waiter.result())
+            raise
+
+    def _release_reader(self, conn: aiosqlite.Connection) -> None:
+        while self._reader_waiters:
+            waiter = self._reader_waiters.popleft()
+            if not waiter.done() and not waiter.get_loop().is_closed():
+                waiter.set_result(conn)
+                return
+        self._idle_readers.append(conn)
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Lease a read-only connection for the duration of the block."""
+        if self.reader_pool_size == 0:
+            yield await self.get_connection()
+            return
+
+        started = time.perf_counter()
+        conn = await self._acquire_reader()
+        wait_ms = (time.perf_counter() - started) * 1000
+        self._reader_stats["acquisitions"] += 1
+        self._reader_stats["total_wait_ms"] += wait_ms
+        self._reader_stats["max_wait_ms"] = max(self._reader_stats["max_wait_ms"], wait_ms)
+        try:
+            yield conn
+        finally:
+            self._release_reader(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Reader pool size, utilisation and lease wait-time metrics."""
+        acquisitions = self._reader_stats["acquisitions"]
+        return {
+            "reader_pool_size": self.reader_pool_size,
+            "open_readers": len(self._readers),
+            "idle_readers": len(self._idle_readers),
+            "waiting": len(self._reader_waiters),
+            **self._reader_stats,
+            "avg_wait_ms": self._reader_stats["total_wait_ms"] / acquisitions if acquisitions else 0.0,
+        }
+
     async def close(self) -> None:
         async with self._lock:
+            for conn in self._readers:
+                await conn.close()
+            self._readers.clear()
+            self._idle_readers.clear()
             if self._conn:
                 await self._conn.close()
                 self._conn = None
@@ -200,168 +229,638 @@ db_manager = AsyncDatabaseManager()
 # Pure Async Database API
 # -------------------------------------------------------------
 
-async def async_write_account(name: str, account_dict: Dict[str, Any]) -> None:
-    """Save account state atomically into normalized relational tables using native SQLite UPSERTs."""
+_UPSERT_POSITION_SQL = """
+    INSERT INTO positions (account_name, symbol, quantity, cost_paise, realized_paise, lots)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(account_name, symbol) DO UPDATE SET
+        quantity=excluded.quantity,
+        cost_paise=excluded.cost_paise,
+        realized_paise=excluded.realized_paise,
+        lots=excluded.lots
+"""
+
+
+def _position_params(acc_name: str, rows: List[Dict[str, Any]]) -> List[tuple]:
+    return [
+        (acc_name, row["symbol"], row["quantity"], row["cost_paise"], row["realized_paise"], row["lots"])
+        for row in rows
+    ]
+
+
+async def _read_version(db: aiosqlite.Connection, acc_name: str) -> int:
+    async with db.execute("SELECT version FROM accounts WHERE name = ?", (acc_name,)) as cursor:
+        row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+async def async_write_account(name: str, account_dict: Dict[str, Any]) -> int:
+    """
+    Save account state atomically into normalized relational tables using native SQLite UPSERTs.
+    Returns the account's new version.
+    """
     acc_name = name.lower().strip()
-    balance_str = str(account_dict.get("balance", "100000.00"))
+    balance_paise = to_paise(account_dict.get("balance", "100000.00"))
     strategy = account_dict.get("strategy", "")
     holdings = account_dict.get("holdings", {})
     transactions = account_dict.get("transactions", [])
     history = account_dict.get("portfolio_value_time_series", [])
 
-    db = await db_manager.get_connection()
     try:
-        await db.execute("BEGIN TRANSACTION;")
-        await db.execute("""
-            INSERT INTO accounts (name, balance, strategy)
-            VALUES (?, ?, ?)
-            ON CONFLICT(name) DO UPDATE SET
-                balance=excluded.balance,
-                strategy=excluded.strategy
-        """, (acc_name, balance_str, strategy))
-
-        active_symbols = set()
-        for sym, qty in holdings.items():
-            clean_sym = sym.upper().strip()
-            if qty > 0:
-                active_symbols.add(clean_sym)
+        async with db_manager.transaction() as db:
+            await db.execute("""
+                INSERT INTO accounts (name, balance_paise, strategy, version)
+                VALUES (?, ?, ?, 1)
+                ON CONFLICT(name) DO UPDATE SET
+                    balance_paise=excluded.balance_paise,
+                    strategy=excluded.strategy,
+                    version=accounts.version + 1
+            """, (acc_name, balance_paise, strategy))
+
+            active_symbols = set()
+            for sym, qty in holdings.items():
+                clean_sym = sym.upper().strip()
+                if qty > 0:
+                    active_symbols.add(clean_sym)
+                    await db.execute("""
+                        INSERT INTO holdings (account_name, symbol, quantity)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(account_name, symbol) DO UPDATE SET quantity=excluded.quantity
+                    """, (acc_name, clean_sym, qty))
+
+            if active_symbols:
+                placeholders = ",".join("?" for _ in active_symbols)
+                await db.execute(
+                    f"DELETE FROM holdings WHERE account_name = ? AND symbol NOT IN ({placeholders})",
+                    (acc_name, *active_symbols)
+                )
+            else:
+                await db.execute("DELETE FROM holdings WHERE account_name = ?", (acc_name,))
+
+            for t in transactions:
                 await db.execute("""
+                    INSERT INTO transactions (account_name, symbol, quantity, price_paise, timestamp, rationale)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(account_name, timestamp, symbol) DO UPDATE SET
+                        quantity=excluded.quantity,
+                        price_paise=excluded.price_paise,
+                        rationale=excluded.rationale
+                """, (
+                    acc_name, 
+                    t.get("symbol", "").upper(), 
+                    t.get("quantity", 0), 
+                    to_paise(t.get("price", "0.0")),
+                    t.get("timestamp", ""), 
+                    t.get("rationale", "")
+                ))
+
+            for ts_entry in history:
+                if isinstance(ts_entry, (list, tuple)) and len(ts_entry) == 2:
+                    await db.execute("""
+                        INSERT INTO portfolio_history (account_name, timestamp, value_paise)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(account_name, timestamp) DO UPDATE SET
+                            value_paise=excluded.value_paise
+                    """, (acc_name, str(ts_entry[0]), to_paise(ts_entry[1])))
+
+            if "positions" in account_dict:
+                await db.execute("DELETE FROM positions WHERE account_name = ?", (acc_name,))
+                await db.executemany(_UPSERT_POSITION_SQL, _position_params(acc_name, account_dict["positions"]))
+            return await _read_version(db, acc_name)
+    except Exception as exc:
+        logger.error(f"Failed atomic account write for '{acc_name}': {exc}", exc_info=True)
+        raise exc
+
+
+async def async_write_account_delta(name: str, delta: Dict[str, Any]) -> int:
+    """
+    Persist only the rows an account changed since it was last loaded or saved.
+    The delta carries the account header, holding upserts/deletes, the positions of symbols
+    traded since, and the newly appended transactions and portfolio history points, so
+    per-trade cost stays flat as history grows.
+    A truthy "reset" key clears stored transactions, history and positions before applying the delta.
+    Returns the account's new version.
+    """
+    acc_name = name.lower().strip()
+    balance_paise = to_paise(delta.get("balance", "100000.00"))
+    strategy = delta.get("strategy", "")
+    holdings_upsert = delta.get("holdings_upsert", {})
+    holdings_delete = delta.get("holdings_delete", [])
+    positions_upsert = delta.get("positions_upsert", [])
+    transactions = delta.get("transactions", [])
+    history = delta.get("portfolio_value_time_series", [])
+
+    try:
+        async with db_manager.transaction() as db:
+            await db.execute("""
+                INSERT INTO accounts (name, balance_paise, strategy, version)
+                VALUES (?, ?, ?, 1)
+                ON CONFLICT(name) DO UPDATE SET
+                    balance_paise=excluded.balance_paise,
+                    strategy=excluded.strategy,
+                    version=accounts.version + 1
+            """, (acc_name, balance_paise, strategy))
+
+            if delta.get("reset"):
+                await db.execute("DELETE FROM transactions WHERE account_name = ?", (acc_name,))
+                await db.execute("DELETE FROM portfolio_history WHERE account_name = ?", (acc_name,))
+                await db.execute("DELETE FROM portfolio_rollups WHERE account_name = ?", (acc_name,))
+                await db.execute("DELETE FROM holdings WHERE account_name = ?", (acc_name,))
+                await db.execute("DELETE FROM positions WHERE account_name = ?", (acc_name,))
+
+            if holdings_delete:
+                await db.executemany(
+                    "DELETE FROM holdings WHERE account_name = ? AND symbol = ?",
+                    [(acc_name, sym.upper().strip()) for sym in holdings_delete]
+                )
+            if holdings_upsert:
+                await db.executemany("""
                     INSERT INTO holdings (account_name, symbol, quantity)
                     VALUES (?, ?, ?)
                     ON CONFLICT(account_name, symbol) DO UPDATE SET quantity=excluded.quantity
-                """, (acc_name, clean_sym, qty))
-
-        if active_symbols:
-            placeholders = ",".join("?" for _ in active_symbols)
-            await db.execute(
-                f"DELETE FROM holdings WHERE account_name = ? AND symbol NOT IN ({placeholders})",
-                (acc_name, *active_symbols)
-            )
-        else:
-            await db.execute("DELETE FROM holdings WHERE account_name = ?", (acc_name,))
-
-        for t in transactions:
-            await db.execute("""
-                INSERT INTO transactions (account_name, symbol, quantity, price, timestamp, rationale)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(account_name, timestamp, symbol) DO UPDATE SET
-                    quantity=excluded.quantity,
-                    price=excluded.price,
-                    rationale=excluded.rationale
-            """, (
-                acc_name, 
-                t.get("symbol", "").upper(), 
-                t.get("quantity", 0), 
-                str(t.get("price", "0.0")), 
-                t.get("timestamp", ""), 
-                t.get("rationale", "")
-            ))
-
-        for ts_entry in history:
-            if isinstance(ts_entry, (list, tuple)) and len(ts_entry) == 2:
-                await db.execute("""
-                    INSERT INTO portfolio_history (account_name, timestamp, portfolio_value)
+                """, [(acc_name, sym.upper().strip(), qty) for sym, qty in holdings_upsert.items()])
+
+            if positions_upsert:
+                await db.executemany(_UPSERT_POSITION_SQL, _position_params(acc_name, positions_upsert))
+
+            if transactions:
+                await db.executemany("""
+                    INSERT INTO transactions (account_name, symbol, quantity, price_paise, timestamp, rationale)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(account_name, timestamp, symbol) DO UPDATE SET
+                        quantity=excluded.quantity,
+                        price_paise=excluded.price_paise,
+                        rationale=excluded.rationale
+                """, [(
+                    acc_name,
+                    t.get("symbol", "").upper(),
+                    t.get("quantity", 0),
+                    to_paise(t.get("price", "0.0")),
+                    t.get("timestamp", ""),
+                    t.get("rationale", "")
+                ) for t in transactions])
+
+            history_rows = [
+                (acc_name, str(ts_entry[0]), to_paise(ts_entry[1]))
+                for ts_entry in history
+                if isinstance(ts_entry, (list, tuple)) and len(ts_entry) == 2
+            ]
+            if history_rows:
+                await db.executemany("""
+                    INSERT INTO portfolio_history (account_name, timestamp, value_paise)
                     VALUES (?, ?, ?)
                     ON CONFLICT(account_name, timestamp) DO UPDATE SET
-                        portfolio_value=excluded.portfolio_value
-                """, (acc_name, str(ts_entry[0]), str(ts_entry[1])))
-
-        await db.commit()
+                        value_paise=excluded.value_paise
+                """, history_rows)
+            return await _read_version(db, acc_name)
     except Exception as exc:
-        await db.rollback()
-        logger.error(f"Failed atomic account write for '{acc_name}': {exc}", exc_info=True)
+        logger.error(f"Failed incremental account write for '{acc_name}': {exc}", exc_info=True)
         raise exc
 
 
-async def async_read_account(name: str) -> Optional[Dict[str, Any]]:
-    """Query normalized relational tables to reconstruct account payload asynchronously."""
-    acc_name = name.lower().strip()
-    db = await db_manager.get_connection()
-    async with db.execute("SELECT balance, strategy FROM accounts WHERE name = ?", (acc_name,)) as cursor:
-        row = await cursor.fetchone()
-        if not row:
-            return None
-        balance_str, strategy = row
+ACCOUNT_PAGE_SIZE = int(os.getenv("ACCOUNT_PAGE_SIZE", "500"))
+
 
-    holdings = {}
-    async with db.execute("SELECT symbol, quantity FROM holdings WHERE account_name = ?", (acc_name,)) as cursor:
-        async for sym, qty in cursor:
-            holdings[sym] = qty
+async def async_read_account(name: str, include_transactions: bool = True,
+                             include_history: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Query normalized relational tables to reconstruct account payload asynchronously.
+    The header (balance, strategy, holdings) is always loaded; transactions and portfolio
+    history can be skipped and fetched later page by page. The payload records the highest
+    stored transaction/history ids so later pages never overlap rows written afterwards, and
+    the per-symbol position ledger rows and the account version.
+    """
+    acc_name = name.lower().strip()
+    async with db_manager.reader() as db:
+        async with db.execute("SELECT balance_paise, strategy, version FROM accounts WHERE name = ?", (acc_name,)) as cursor:
+            row = await cursor.fetchone()
+            if not row:
+                return None
+            balance_paise, strategy, version = row
+
+        holdings = {}
+        async with db.execute("SELECT symbol, quantity FROM holdings WHERE account_name = ?", (acc_name,)) as cursor:
+            async for sym, qty in cursor:
+                holdings[sym] = qty
+
+        async with db.execute("""
+            SELECT symbol, quantity, cost_paise, realized_paise, lots FROM positions WHERE account_name = ?
+        """, (acc_name,)) as cursor:
+            positions = [
+                {"symbol": sym, "quantity": qty, "cost_paise": cost, "realized_paise": realized, "lots": lots}
+                async for sym, qty, cost, realized, lots in cursor
+            ]
+
+        async with db.execute("""
+            SELECT
+                (SELECT MAX(id) FROM transactions WHERE account_name = ?),
+                (SELECT MAX(id) FROM portfolio_history WHERE account_name = ?)
+        """, (acc_name, acc_name)) as cursor:
+            last_tx_id, last_history_id = await cursor.fetchone()
 
     transactions = []
-    async with db.execute("""
-        SELECT symbol, quantity, price, timestamp, rationale 
-        FROM transactions 
-        WHERE account_name = ? 
-        ORDER BY id ASC
-    """, (acc_name,)) as cursor:
-        async for sym, qty, price_str, ts, rationale in cursor:
-            transactions.append({
-                "symbol": sym,
-                "quantity": qty,
-                "price": price_str,
-                "timestamp": ts,
-                "rationale": rationale
-            })
+    if include_transactions:
+        transactions = await async_read_transactions(acc_name, until_id=last_tx_id or 0)
 
     history = []
-    async with db.execute("""
-        SELECT timestamp, portfolio_value 
-        FROM portfolio_history 
-        WHERE account_name = ? 
-        ORDER BY id ASC
-    """, (acc_name,)) as cursor:
-        async for ts, val_str in cursor:
-            try:
-                history.append((ts, float(val_str)))
-            except ValueError:
-                pass
+    if include_history:
+        history = [(ts, val) for _, ts, val in
+                   await async_read_portfolio_history(acc_name, until_id=last_history_id or 0)]
 
     return {
         "name": acc_name,
-        "balance": balance_str,
+        "balance": paise_to_decimal(balance_paise),
         "strategy": strategy,
         "holdings": holdings,
         "transactions": transactions,
-        "portfolio_value_time_series": history
+        "portfolio_value_time_series": history,
+        "last_transaction_id": last_tx_id or 0,
+        "last_history_id": last_history_id or 0,
+        "positions": positions,
+        "version": version,
     }
 
 
+async def async_read_account_version(name: str) -> Optional[int]:
+    """Current version of an account (bumped on every write), or None if it does not exist."""
+    async with db_manager.reader() as db:
+        async with db.execute("SELECT version FROM accounts WHERE name = ?", (name.lower().strip(),)) as cursor:
+            row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def async_read_transactions(name: str, after_id: int = 0, limit: Optional[int] = None,
+                                  until_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Keyset page of transactions with after_id < id <= until_id, in insertion order."""
+    acc_name = name.lower().strip()
+    sql = """
+        SELECT id, symbol, quantity, price_paise, timestamp, rationale
+        FROM transactions
+        WHERE account_name = ? AND id > ?
+    """
+    params: List[Any] = [acc_name, after_id]
+    if until_id is not None:
+        sql += " AND id <= ?"
+        params.append(until_id)
+    sql += " ORDER BY id ASC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    async with db_manager.reader() as db:
+        async with db.execute(sql, params) as cursor:
+            return [
+                {
+                    "id": tx_id,
+                    "symbol": sym,
+                    "quantity": qty,
+                    "price": paise_to_decimal(price_paise),
+                    "timestamp": ts,
+                    "rationale": rationale
+                }
+                async for tx_id, sym, qty, price_paise, ts, rationale in cursor
+            ]
+
+
+async def async_read_portfolio_history(name: str, after_id: int = 0, limit: Optional[int] = None,
+                                       until_id: Optional[int] = None) -> List[Tuple[int, str, float]]:
+    """Keyset page of (id, timestamp, value) history points with after_id < id <= until_id."""
+    acc_name = name.lower().strip()
+    sql = """
+        SELECT id, timestamp, value_paise
+        FROM portfolio_history
+        WHERE account_name = ? AND id > ?
+    """
+    params: List[Any] = [acc_name, after_id]
+    if until_id is not None:
+        sql += " AND id <= ?"
+        params.append(until_id)
+    sql += " ORDER BY id ASC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    history = []
+    async with db_manager.reader() as db:
+        async with db.execute(sql, params) as cursor:
+            async for point_id, ts, value_paise in cursor:
+                history.append((point_id, ts, paise_to_float(value_paise)))
+    return history
+
+
+async def async_iter_transactions(name: str, after_id: int = 0, until_id: Optional[int] = None,
+                                  page_size: int = ACCOUNT_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """Stream transactions page by page without materializing the full list."""
+    while True:
+        page = await async_read_transactions(name, after_id=after_id, limit=page_size, until_id=until_id)
+        for row in page:
+            yield row
+        if len(page) < page_size:
+            return
+        after_id = page[-1]["id"]
+
+
+async def async_iter_portfolio_history(name: str, after_id: int = 0, until_id: Optional[int] = None,
+                                       page_size: int = ACCOUNT_PAGE_SIZE) -> AsyncIterator[Tuple[int, str, float]]:
+    """Stream portfolio history points page by page without materializing the full series."""
+    while True:
+        page = await async_read_portfolio_history(name, after_id=after_id, limit=page_size, until_id=until_id)
+        for row in page:
+            yield row
+        if len(page) < page_size:
+            return
+        after_id = page[-1][0]
+
+
+PORTFOLIO_CHART_POINTS = int(os.getenv("PORTFOLIO_CHART_POINTS", "300"))
+
+
+def _rollup_bucket_start(timestamp: str, prefix_len: int, suffix: str) -> str:
+    """Python mirror of the bucket expression used by the rollup triggers."""
+    return timestamp[:prefix_len] + suffix
+
+
+async def async_read_portfolio_series(name: str, start: Optional[str] = None, end: Optional[str] = None,
+                                      max_points: int = PORTFOLIO_CHART_POINTS) -> Dict[str, Any]:
+    """
+    Portfolio value series for charts, at the finest resolution that fits `max_points`.
+    Tries raw history first, then the minute, hour and day rollups; each candidate is counted
+    with a LIMIT so the choice costs O(max_points) whatever the history size. If even daily
+    buckets overflow, the most recent `max_points` days are returned.
+    Points are (timestamp, open, high, low, close) rupee floats; raw points repeat the value.
+    """
+    acc_name = name.lower().strip()
+    max_points = max(1, max_points)
+    async with db_manager.reader() as db:
+        candidates = [("raw", None, None)] + PORTFOLIO_ROLLUP_RESOLUTIONS
+        for resolution, prefix_len, suffix in candidates:
+            if resolution == "raw":
+                sql = "SELECT timestamp, value_paise, value_paise, value_paise, value_paise FROM portfolio_history WHERE account_name = ?"
+                column, params = "timestamp", [acc_name]
+                lower = start
+            else:
+                sql = """
+                    SELECT bucket, open_paise, high_paise, low_paise, close_paise
+                    FROM portfolio_rollups WHERE account_name = ? AND resolution = ?
+                """
+                column, params = "bucket", [acc_name, resolution]
+                lower = _rollup_bucket_start(start, prefix_len, suffix) if start else None
+            if lower is not None:
+                sql += f" AND {column} >= ?"
+                params.append(lower)
+            if end is not None:
+                sql += f" AND {column} <= ?"
+                params.append(end)
+
+            async with db.execute(f"SELECT COUNT(*) FROM ({sql} LIMIT ?)", (*params, max_points + 1)) as cursor:
+                (count,) = await cursor.fetchone()
+            if count <= max_points or resolution == "day":
+                break
+
+        async with db.execute(f"{sql} ORDER BY {column} DESC LIMIT ?", (*params, max_points)) as cursor:
+            rows = await cursor.fetchall()
+
+    points = [
+        (ts, paise_to_float(o), paise_to_float(h), paise_to_float(l), paise_to_float(c))
+        for ts, o, h, l, c in reversed(rows)
+    ]
+    return {"resolution": resolution, "points": points}
+
+
 async def async_write_log(name: str, log_type: str, message: str) -> None:
     now = datetime.now().isoformat()
-    db = await db_manager.get_connection()
-    await db.execute("""
-        INSERT INTO logs (name, datetime, type, message)
-        VALUES (?, ?, ?, ?)
-    """, (name.lower(), now, log_type, message))
-    await db.commit()
+    async with db_manager.transaction() as db:
+        await db.execute("""
+            INSERT INTO logs (name, datetime, type, message)
+            VALUES (?, ?, ?, ?)
+        """, (name.lower(), now, log_type, message))
+
+
+# -------------------------------------------------------------
+# Group-Commit Log Writer
+# -------------------------------------------------------------
+
+LOG_FLUSH_INTERVAL_MS = int(os.getenv("LOG_FLUSH_INTERVAL_MS", "250"))
+LOG_MAX_BATCH = int(os.getenv("LOG_MAX_BATCH", "200"))
+LOG_MAX_PENDING = int(os.getenv("LOG_MAX_PENDING", "10000"))
+
+_INSERT_LOG_SQL = "INSERT INTO logs (name, datetime, type, message) VALUES (?, ?, ?, ?)"
+
+
+class LogBatchWriter:
+    """
+    Buffered log sink: rows are queued in memory and a single writer task drains them
+    with executemany, one transaction per batch, every flush interval or max batch rows.
+    The queue is bounded; rows submitted while it is full are dropped and counted.
+    """
+
+    def __init__(self, max_batch: int = LOG_MAX_BATCH, flush_interval_ms: int = LOG_FLUSH_INTERVAL_MS,
+                 max_pending: int = LOG_MAX_PENDING):
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = max(flush_interval_ms, 1) / 1000
+        self.max_pending = max(1, max_pending)
+        self._pending: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, name: str, log_type: str, message: str) -> bool:
+        """Queue a log row without waiting on the database; returns False if it was dropped."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self._pending.append((name.lower(), datetime.now().isoformat(), log_type, message))
+        self.submitted += 1
+        try:
+            self._ensure_task(asyncio.get_running_loop())
+        except RuntimeError:
+            return True
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    def _ensure_task(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _next_batch(self) -> List[Tuple[str, str, str, str]]:
+        return [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+
+    async def flush(self) -> None:
+        """Write every queued row, one transaction per batch."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            while self._pending:
+                batch = self._next_batch()
+                try:
+                    async with db_manager.transaction() as db:
+                        await db.executemany(_INSERT_LOG_SQL, batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                except Exception as exc:
+                    self.failed += len(batch)
+                    logger.error(f"Failed to flush {len(batch)} buffered log rows: {exc}", exc_info=True)
+
+    def flush_sync(self) -> None:
+        """Write queued rows through a blocking sqlite3 connection (for use when no event loop runs)."""
+        if not self._pending:
+            return
+        try:
+            with sqlite3.connect(db_manager.db_path) as conn:
+                while self._pending:
+                    batch = self._next_batch()
+                    conn.executemany(_INSERT_LOG_SQL, batch)
+                    self.written += len(batch)
+                    self.batches += 1
+        except Exception as exc:
+            logger.error(f"Failed to flush buffered log rows on shutdown: {exc}", exc_info=True)
+
+    def request_flush(self) -> None:
+        """Flush promptly: wake the writer task inside a running loop, otherwise write synchronously."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()
+            return
+        self._ensure_task(loop)
+        self._wakeup.set()
+
+    async def close(self) -> None:
+        """Stop the writer task after writing every queued row."""
+        if self._task is not None and self._loop is asyncio.get_running_loop():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+log_writer = LogBatchWriter()
+
+
+def submit_log(name: str, log_type: str, message: str) -> bool:
+    """Fire-and-forget log write through the shared group-commit writer."""
+    return log_writer.submit(name, log_type, message)
 
 
 async def async_read_log(name: str, last_n: int = 10) -> List[tuple]:
-    db = await db_manager.get_connection()
-    async with db.execute("""
-        SELECT datetime, type, message FROM logs 
-        WHERE name = ? 
-        ORDER BY datetime DESC
-        LIMIT ?
-    """, (name.lower(), last_n)) as cursor:
-        rows = await cursor.fetchall()
-        return list(reversed(rows))
+    async with db_manager.reader() as db:
+        async with db.execute("""
+            SELECT datetime, type, message FROM logs 
+            WHERE name = ? 
+            ORDER BY datetime DESC
+            LIMIT ?
+        """, (name.lower(), last_n)) as cursor:
+            rows = await cursor.fetchall()
+            return list(reversed(rows))
 
 
 async def async_write_market(date: str, data: Dict[str, Any]) -> None:
     data_json = json.dumps(data)
-    db = await db_manager.get_connection()
-    await db.execute("""
-        INSERT INTO market (date, data)
-        VALUES (?, ?)
-        ON CONFLICT(date) DO UPDATE SET data=excluded.data
-    """, (date, data_json))
-    await db.commit()
+    async with db_manager.transaction() as db:
+        await db.execute("""
+            INSERT INTO market (date, data, fetched_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET data=excluded.data, fetched_at=excluded.fetched_at
+        """, (date, data_json, time.time()))
 
 
 async def async_read_market(date: str) -> Optional[Dict[str, Any]]:
-    db = await db_manager.get_connection()
-    async with db.execute("SELECT data FROM market WHERE date = ?", (date,)) as cursor:
-        row = await cursor.fetchone()
-        return json.loads(row[0]) if row else None
+    async with db_manager.reader() as db:
+        async with db.execute("SELECT data FROM market WHERE date = ?", (date,)) as cursor:
+            row = await cursor.fetchone()
+            return json.loads(row[0]) if row else None
+
+
+# -------------------------------------------------------------
+# Synchronous Market Cache Access (shared L2 quote cache)
+# -------------------------------------------------------------
+
+# Quote lookups are synchronous and may run inside the event loop, so a cache write must never
+# wait long on the writer lock held by another process or by this process's own transaction.
+MARKET_CACHE_BUSY_TIMEOUT_MS = int(os.getenv("MARKET_CACHE_BUSY_TIMEOUT_MS", "50"))
+
+_market_cache_local = threading.local()
+
+
+def _market_cache_connection() -> sqlite3.Connection:
+    """Per-thread autocommit sqlite3 connection used for the market cache."""
+    conn = getattr(_market_cache_local, "conn", None)
+    if conn is None or getattr(_market_cache_local, "path", None) != db_manager.db_path:
+        conn = sqlite3.connect(db_manager.db_path, timeout=MARKET_CACHE_BUSY_TIMEOUT_MS / 1000,
+                               isolation_level=None, check_same_thread=False)
+        _market_cache_local.conn = conn
+        _market_cache_local.path = db_manager.db_path
+    return conn
+
+
+def read_market_cache_sync(key: str, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached market payload for `key` if it was fetched within `max_age_seconds`.
+    Any database error (missing table, locked file) is treated as a cache miss.
+    """
+    try:
+        row = _market_cache_connection().execute(
+            "SELECT data FROM market WHERE date = ? AND fetched_at >= ?",
+            (key, time.time() - max_age_seconds)
+        ).fetchone()
+    except sqlite3.Error as exc:
+        logger.debug(f"Market cache read skipped for '{key}': {exc}")
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def write_market_cache_sync(key: str, data: Dict[str, Any]) -> bool:
+    """Best-effort upsert of a market payload stamped with the current time; False if skipped."""
+    try:
+        _market_cache_connection().execute("""
+            INSERT INTO market (date, data, fetched_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET data=excluded.data, fetched_at=excluded.fetched_at
+        """, (key, json.dumps(data), time.time()))
+    except sqlite3.Error as exc:
+        logger.debug(f"Market cache write skipped for '{key}': {exc}")
+        return False
+    return True
+
+
+def read_held_symbols_sync() -> List[str]:
+    """Distinct symbols held by any account; an unreadable database yields an empty list."""
+    try:
+        rows = _market_cache_connection().execute(
+            "SELECT DISTINCT symbol FROM holdings WHERE quantity > 0 ORDER BY symbol"
+        ).fetchall()
+    except sqlite3.Error as exc:
+        logger.debug(f"Held symbol lookup skipped: {exc}")
+        return []
+    return [row[0] for row in rows]
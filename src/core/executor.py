@@ -0,0 +1,162 @@
+# src/core/executor.py
+"""
+Per-account order execution.
+Every account gets one mailbox (an asyncio queue drained by a single worker task), so orders for
+the same account are applied one at a time against its single in-memory Account, while
+different accounts are served concurrently. Submitting returns a future resolving to the fill
+report, or raising the order's error.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .models import Account
+
+logger = logging.getLogger("executor")
+
+# A mailbox worker with nothing to do for this long exits; the next order starts a new one
+ORDER_MAILBOX_IDLE_SECONDS = float(os.getenv("ORDER_MAILBOX_IDLE_SECONDS", "60"))
+
+AccountOperation = Callable[[Account], Awaitable[Any]]
+
+
+@dataclass
+class MailboxStats:
+    """Queue metrics for one account: depth, wait before execution and execution time."""
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    max_depth: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    service_total: float = 0.0
+    service_max: float = 0.0
+
+    def record(self, wait: float, service: float, ok: bool) -> None:
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.service_total += service
+        self.service_max = max(self.service_max, service)
+
+
+class _Mailbox:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.stats = MailboxStats()
+        self.worker: Optional[asyncio.Task] = None
+
+
+class OrderExecutor:
+    """Serializes account operations per account; see module docstring."""
+
+    def __init__(self, idle_seconds: float = ORDER_MAILBOX_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._mailboxes: Dict[str, _Mailbox] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _mailbox(self, name: str) -> _Mailbox:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and workers belong to one event loop; a new loop starts with fresh mailboxes
+            self._mailboxes = {}
+            self._loop = loop
+        mailbox = self._mailboxes.get(name)
+        if mailbox is None:
+            mailbox = self._mailboxes[name] = _Mailbox(name)
+        if mailbox.worker is None or mailbox.worker.done():
+            mailbox.worker = loop.create_task(self._run(mailbox), name=f"orders:{name}")
+        return mailbox
+
+    def submit(self, name: str, operation: AccountOperation) -> "asyncio.Future[Any]":
+        """Queue operation(account) on the account's mailbox and return a future for its result."""
+        name = name.lower()
+        mailbox = self._mailbox(name)
+        future = asyncio.get_running_loop().create_future()
+        mailbox.queue.put_nowait((operation, future, time.perf_counter()))
+        mailbox.stats.submitted += 1
+        mailbox.stats.max_depth = max(mailbox.stats.max_depth, mailbox.queue.qsize())
+        return future
+
+    def buy(self, name: str, symbol: str, quantity: int, rationale: str) -> "asyncio.Future[str]":
+        return self.submit(name, lambda account: account.buy_shares(symbol, quantity, rationale))
+
+    def sell(self, name: str, symbol: str, quantity: int, rationale: str) -> "asyncio.Future[str]":
+        return self.submit(name, lambda account: account.sell_shares(symbol, quantity, rationale))
+
+    async def _run(self, mailbox: _Mailbox) -> None:
+        while True:
+            try:
+                operation, future, enqueued = await asyncio.wait_for(mailbox.queue.get(), self.idle_seconds)
+            except asyncio.TimeoutError:
+                if mailbox.queue.empty():
+                    return
+                continue
+            started = time.perf_counter()
+            ok = False
+            try:
+                if not future.cancelled():
+                    # The identity map hands every order the same instance unless another process wrote
+                    account = await Account.get(mailbox.name, lazy=True)
+                    result = await operation(account)
+                    ok = True
+                    if not future.cancelled():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+                else:
+                    logger.warning(f"Order for '{mailbox.name}' failed after its caller gave up: {exc}")
+            finally:
+                mailbox.stats.record(started - enqueued, time.perf_counter() - started, ok)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per account: current depth, totals and wait/execution latency in milliseconds."""
+        rows = []
+        for name, mailbox in sorted(self._mailboxes.items()):
+            s = mailbox.stats
+            done = s.completed + s.failed
+            rows.append({
+                "account": name,
+                "depth": mailbox.queue.qsize(),
+                "max_depth": s.max_depth,
+                "submitted": s.submitted,
+                "completed": s.completed,
+                "failed": s.failed,
+                "avg_wait_ms": round(s.wait_total / done * 1000, 2) if done else 0.0,
+                "max_wait_ms": round(s.wait_max * 1000, 2),
+                "avg_exec_ms": round(s.service_total / done * 1000, 2) if done else 0.0,
+                "max_exec_ms": round(s.service_max * 1000, 2),
+            })
+        return rows
+
+    async def close(self) -> None:
+        """Stop all mailbox workers; orders still queued are cancelled."""
+        mailboxes, self._mailboxes = list(self._mailboxes.values()), {}
+        for mailbox in mailboxes:
+            while not mailbox.queue.empty():
+                _, future, _ = mailbox.queue.get_nowait()
+                future.cancel()
+            if mailbox.worker is not None:
+                mailbox.worker.cancel()
+        await asyncio.gather(*(m.worker for m in mailboxes if m.worker is not None), return_exceptions=True)
+
+
+order_executor = OrderExecutor()
+
+
+def get_order_queue_stats() -> List[Dict[str, Any]]:
+    return order_executor.stats()
@@ -0,0 +1,207 @@
+# src/core/instruments.py
+"""
+Instrument master index.
+Raw symbols ("INFY", "US.AAPL", "NASDAQ:TSLA", "RELIANCE.NS") resolve to one immutable,
+interned Instrument per "EXCHANGE:SYMBOL". Resolutions are memoized, so repeat lookups are a
+single dict hit. Entries from config/instruments.json carry metadata (lot size, sector,
+exchange token), and the file is reloaded when it changes on disk.
+"""
+
+import json
+import logging
+import os
+import pathlib
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger("market")
+
+# Seconds between checks of instruments.json for changes
+INSTRUMENT_RELOAD_CHECK_SECONDS = float(os.getenv("INSTRUMENT_RELOAD_CHECK_SECONDS", "5"))
+# Memoized raw spellings kept before the memo is reset (guards against unbounded symbol churn)
+INSTRUMENT_MEMO_MAX_SIZE = int(os.getenv("INSTRUMENT_MEMO_MAX_SIZE", "100000"))
+
+_CONFIG_PATHS = [
+    pathlib.Path("config/instruments.json"),
+    pathlib.Path(__file__).parent.parent.parent / "config" / "instruments.json",
+]
+
+
+@dataclass(frozen=True)
+class Instrument:
+    """Structured financial instrument model specifying symbol, exchange, asset class and listing metadata."""
+    symbol: str
+    exchange: str = "NSE"        # NSE, BSE, NASDAQ, NYSE, HKEX
+    asset_class: str = "EQUITY"   # EQUITY, ETF, CRYPTO_ETF
+    lot_size: int = 1
+    sector: Optional[str] = None
+    exchange_token: Optional[str] = None
+    # Canonical "EXCHANGE:SYMBOL" key, computed once
+    key: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "symbol", sys.intern(self.symbol))
+        object.__setattr__(self, "exchange", sys.intern(self.exchange))
+        object.__setattr__(self, "key", sys.intern(f"{self.exchange}:{self.symbol}".upper()))
+
+    @classmethod
+    def parse(cls, raw: Union[str, "Instrument"]) -> "Instrument":
+        """Resolve a raw symbol through the shared instrument index (memoized)."""
+        if isinstance(raw, Instrument):
+            return raw
+        return instrument_index.resolve(raw)
+
+
+def _parse_rules(clean: str) -> Tuple[str, str]:
+    """(symbol, exchange) for an upper-cased raw symbol that is not in the config."""
+    # Explicit prefix rule: EXCHANGE:SYMBOL (e.g. NASDAQ:AAPL, HKEX:9988)
+    if ":" in clean:
+        prefix, sym = clean.split(":", 1)
+        return sym, prefix
+    # Market prefix rules (US. / HK.)
+    if clean.startswith("US."):
+        return clean[3:], "NASDAQ"
+    if clean.startswith("HK."):
+        return clean[3:], "HKEX"
+    # Market suffix rules (.NS / .BO)
+    if clean.endswith(".NS"):
+        return clean[:-3], "NSE"
+    if clean.endswith(".BO"):
+        return clean[:-3], "BSE"
+    # Default generic rule
+    return clean, "NSE"
+
+
+def _instrument_from_config(raw: str, cfg: Dict[str, Any]) -> Instrument:
+    token = cfg.get("exchange_token")
+    return Instrument(
+        symbol=cfg.get("symbol", raw).upper(),
+        exchange=cfg.get("exchange", "NSE").upper(),
+        asset_class=cfg.get("asset_class", "EQUITY"),
+        lot_size=int(cfg.get("lot_size", 1)),
+        sector=cfg.get("sector"),
+        exchange_token=str(token) if token else None,
+    )
+
+
+class InstrumentIndex:
+    """
+    O(1) raw-symbol -> Instrument resolution. Configured entries are indexed by their config
+    name and by "EXCHANGE:SYMBOL"; other symbols are parsed by rule once and then interned as
+    discovered instruments. State is swapped wholesale on reload, so readers take no lock.
+    """
+
+    def __init__(self, paths: Optional[List[pathlib.Path]] = None):
+        self._paths = list(paths) if paths is not None else _CONFIG_PATHS
+        self._lock = threading.Lock()
+        self._source: Optional[pathlib.Path] = None
+        self._mtime: Optional[float] = None
+        self._last_check = float("-inf")
+        self.reloads = 0
+        self._load()
+
+    def _find_config(self) -> Tuple[Optional[pathlib.Path], Optional[float]]:
+        for p in self._paths:
+            try:
+                return p, p.stat().st_mtime
+            except OSError:
+                continue
+        return None, None
+
+    def _load(self) -> None:
+        """Rebuild the index from the config file and reset memoized resolutions."""
+        source, mtime = self._find_config()
+        raw_config: Dict[str, Dict[str, Any]] = {}
+        if source is not None:
+            try:
+                with open(source, "r", encoding="utf-8") as f:
+                    raw_config = json.load(f)
+            except Exception as exc:
+                logger.warning(f"Failed to load instrument config from {source}: {exc}")
+                if self._mtime is not None:
+                    # Keep serving the last good index until the file is fixed
+                    self._source, self._mtime = source, mtime
+                    return
+
+        configured: Dict[str, Instrument] = {}
+        aliases: Dict[str, Instrument] = {}
+        for raw, cfg in raw_config.items():
+            inst = _instrument_from_config(raw.upper().strip(), cfg)
+            inst = configured.setdefault(inst.key, inst)
+            aliases[raw.upper().strip()] = inst
+        # Published together: configured instruments by key, config aliases, the memo of raw
+        # spellings, and instruments discovered by rule
+        self._state: Tuple[Dict[str, Instrument], ...] = (configured, aliases, {}, {})
+        self._source, self._mtime = source, mtime
+        self.reloads += 1
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < INSTRUMENT_RELOAD_CHECK_SECONDS:
+            return
+        with self._lock:
+            if now - self._last_check < INSTRUMENT_RELOAD_CHECK_SECONDS:
+                return
+            self._last_check = now
+            source, mtime = self._find_config()
+            if (source, mtime) != (self._source, self._mtime):
+                logger.info(f"Reloading instrument index from {source}.")
+                self._load()
+
+    def reload(self) -> None:
+        with self._lock:
+            self._load()
+
+    def resolve(self, raw: str) -> Instrument:
+        """The interned Instrument for a raw symbol spelling."""
+        self._maybe_reload()
+        configured, aliases, memo, discovered = self._state
+        inst = memo.get(raw)
+        if inst is not None:
+            return inst
+
+        clean = raw.upper().strip()
+        inst = aliases.get(clean)
+        if inst is None:
+            symbol, exchange = _parse_rules(clean)
+            key = f"{exchange}:{symbol}"
+            inst = configured.get(key) or discovered.get(key)
+            if inst is None:
+                inst = discovered.setdefault(key, Instrument(symbol=symbol, exchange=exchange))
+        if len(memo) >= INSTRUMENT_MEMO_MAX_SIZE:
+            memo.clear()
+        memo[raw] = inst
+        return inst
+
+    def get(self, key: str) -> Optional[Instrument]:
+        """Instrument already known under the "EXCHANGE:SYMBOL" key, if any."""
+        key = key.upper()
+        return self._state[0].get(key) or self._state[3].get(key)
+
+    def instruments(self, include_discovered: bool = False) -> Iterator[Instrument]:
+        yield from self._state[0].values()
+        if include_discovered:
+            yield from list(self._state[3].values())
+
+    def screen(self, sector: Optional[str] = None, exchange: Optional[str] = None,
+               asset_class: Optional[str] = None) -> List[Instrument]:
+        """Configured instruments matching every given attribute (case-insensitive)."""
+        matches = []
+        for inst in self.instruments():
+            if sector is not None and (inst.sector or "").lower() != sector.lower():
+                continue
+            if exchange is not None and inst.exchange != exchange.upper():
+                continue
+            if asset_class is not None and inst.asset_class != asset_class.upper():
+                continue
+            matches.append(inst)
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+
+instrument_index = InstrumentIndex()
@@ -4,93 +4,63 @@ Market data adapter with pluggable Provider Registry.
 Zero special-case if-statements in core price lookups.
 """
 
-from dataclasses import dataclass
 from abc import ABC, abstractmethod
-from datetime import datetime, timezone, timedelta
-from functools import lru_cache
+import asyncio
+from datetime import datetime
 import logging
 import os
 import random
-import requests
-from typing import Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 
-import json
-import pathlib
+import time
 
-logger = logging.getLogger("market")
-
-_price_cache: Dict[str, float] = {}
-_CACHE_TTL_SECONDS = int(os.getenv("GROWW_CACHE_TTL_SECONDS", "5"))
-
-
-def _load_instrument_config() -> Dict[str, Dict[str, str]]:
-    """Load optional instrument exchange/asset_class mapping from configuration file."""
-    config_paths = [
-        pathlib.Path("config/instruments.json"),
-        pathlib.Path(__file__).parent.parent.parent / "config" / "instruments.json",
-    ]
-    for p in config_paths:
-        if p.exists():
-            try:
-                with open(p, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception as exc:
-                logger.warning(f"Failed to load instrument config from {p}: {exc}")
-    return {}
-
-
-_INSTRUMENT_CONFIG_MAPPING = _load_instrument_config()
-
-
-@dataclass
-class Instrument:
-    """Structured financial instrument model specifying symbol, exchange, and asset class."""
-    symbol: str
-    exchange: str = "NSE"        # NSE, BSE, NASDAQ, NYSE, HKEX
-    asset_class: str = "EQUITY"   # EQUITY, ETF, CRYPTO_ETF
-
-    @classmethod
-    def parse(cls, raw: Union[str, "Instrument"]) -> "Instrument":
-        """Generic rule-based symbol parser with configurable mapping overrides."""
-        if isinstance(raw, Instrument):
-            return raw
-
-        clean = raw.upper().strip()
-
-        # 1. Configured mapping lookup
-        if clean in _INSTRUMENT_CONFIG_MAPPING:
-            cfg = _INSTRUMENT_CONFIG_MAPPING[clean]
-            return cls(
-                symbol=cfg.get("symbol", clean),
-                exchange=cfg.get("exchange", "NSE"),
-                asset_class=cfg.get("asset_class", "EQUITY"),
-            )
-
-        # 2. Explicit prefix rule: EXCHANGE:SYMBOL (e.g. NASDAQ:AAPL, HKEX:9988)
-        if ":" in clean:
-            prefix, sym = clean.split(":", 1)
-            return cls(symbol=sym, exchange=prefix, asset_class="EQUITY")
+import threading
 
-        # 3. Market prefix rules (US. / HK.)
-        if clean.startswith("US."):
-            return cls(symbol=clean.replace("US.", ""), exchange="NASDAQ", asset_class="EQUITY")
-        if clean.startswith("HK."):
-            return cls(symbol=clean.replace("HK.", ""), exchange="HKEX", asset_class="EQUITY")
+from .candles import candle_store
+from . import market_calendar
+from .database import read_market_cache_sync, write_market_cache_sync
+from .market_feed import MARKET_FEED_MAX_TICK_AGE_SECONDS, tick_store
+from .instruments import Instrument
+from .provider_health import ProviderHealthRegistry
+from .quote_cache import QuoteCache
+from ..utils.http import get_async_client, get_session
 
-        # 4. Market suffix rules (.NS / .BO)
-        if clean.endswith(".NS"):
-            return cls(symbol=clean[:-3], exchange="NSE", asset_class="EQUITY")
-        if clean.endswith(".BO"):
-            return cls(symbol=clean[:-3], exchange="BSE", asset_class="EQUITY")
+logger = logging.getLogger("market")
 
-        # 5. Default generic rule
-        return cls(symbol=clean, exchange="NSE", asset_class="EQUITY")
+_CACHE_TTL_SECONDS = int(os.getenv("GROWW_CACHE_TTL_SECONDS", "5"))
+# L1: per-process LRU keyed by "EXCHANGE:SYMBOL"; read-only callers may accept quotes up to
+# QUOTE_STALE_SECONDS past the TTL while a background refresh runs
+_price_cache = QuoteCache(
+    max_size=int(os.getenv("QUOTE_CACHE_MAX_SIZE", "1024")),
+    ttl=_CACHE_TTL_SECONDS,
+    stale_ttl=float(os.getenv("QUOTE_STALE_SECONDS", "30")),
+)
+# L2: quotes shared by every process on the same database through the `market` table
+_L2_CACHE_ENABLED = os.getenv("QUOTE_L2_CACHE", "true").lower() in ("true", "1", "yes")
+
+_QUOTE_BATCH_WORKERS = int(os.getenv("QUOTE_BATCH_WORKERS", "8"))
+GROWW_LTP_BATCH = 50  # instruments per Groww SDK get_ltp call
+
+_quote_cache_stats: Dict[str, int] = {
+    "feed_hits": 0,
+    "l1_hits": 0,
+    "l1_stale_hits": 0,
+    "l1_misses": 0,
+    "l2_hits": 0,
+    "l2_misses": 0,
+    "provider_fetches": 0,
+    "provider_batches": 0,
+}
 
 
 # Abstract Provider Interface
 class MarketProvider(ABC):
     """Abstract interface for pluggable market data providers."""
 
+    # Generalists (supporting every instrument) are only consulted after the specialists
+    specialist: bool = True
+
     @abstractmethod
     def supports_instrument(self, inst: Instrument) -> bool:
         """Return True if this provider supports quote lookups for the given instrument."""
@@ -101,17 +71,39 @@ class MarketProvider(ABC):
         """Fetch current share price or return None if lookup fails/unconfigured."""
         pass
 
+    def get_prices(self, insts: List[Instrument]) -> Dict[str, float]:
+        """
+        Fetch prices for several instruments, keyed by "EXCHANGE:SYMBOL"; failed lookups are omitted.
+        Providers with a bulk endpoint override this. The default issues the single-instrument
+        lookups concurrently, so a batch costs about one round trip per QUOTE_BATCH_WORKERS symbols.
+        """
+        if len(insts) == 1:
+            price = self.get_price(insts[0])
+            return {} if price is None else {instrument_key(insts[0]): price}
+        with ThreadPoolExecutor(max_workers=min(_QUOTE_BATCH_WORKERS, len(insts))) as pool:
+            prices = list(pool.map(self.get_price, insts))
+        return {instrument_key(inst): price for inst, price in zip(insts, prices) if price is not None}
+
+    async def aget_price(self, inst: Instrument) -> Optional[float]:
+        """
+        Awaitable quote lookup. The default runs the blocking get_price() in a worker thread so the
+        event loop stays free; cancelling the await abandons the result of that thread.
+        """
+        return await asyncio.to_thread(self.get_price, inst)
+
 
 class INDmoneyProvider(MarketProvider):
     """INDmoney / INDstocks provider for US and Indian stock chart data."""
 
+    specialist = False
+
     def supports_instrument(self, inst: Instrument) -> bool:
         return True
 
     def get_price(self, inst: Instrument) -> Optional[float]:
         try:
-            from src.utils.indmoney_client import INDmoneyClient
-            ind_data = INDmoneyClient().get_stock_chart_data(inst.symbol)
+            from src.utils.indmoney_client import get_indmoney_client
+            ind_data = get_indmoney_client().get_stock_chart_data(inst.symbol)
             if ind_data.get("current_price") is not None:
                 return float(ind_data["current_price"])
         except Exception as exc:
@@ -127,15 +119,40 @@ class MoomooProvider(MarketProvider):
 
     def get_price(self, inst: Instrument) -> Optional[float]:
         try:
-            from src.utils.moomoo_client import MoomooClient
-            moo_symbol = f"US.{inst.symbol}" if inst.exchange in {"NASDAQ", "NYSE"} else f"HK.{inst.symbol}"
-            moo_data = MoomooClient().get_stock_quote(moo_symbol)
+            from src.utils.moomoo_client import get_moomoo_client
+            moo_data = get_moomoo_client().get_stock_quote(self._moo_symbol(inst))
             if moo_data.get("last_price") is not None and moo_data.get("last_price") > 0:
                 return float(moo_data["last_price"])
         except Exception as exc:
             logger.warning(f"Moomoo provider lookup failed for '{inst.symbol}': {exc}", exc_info=True)
         return None
 
+    @staticmethod
+    def _moo_symbol(inst: Instrument) -> str:
+        return f"US.{inst.symbol}" if inst.exchange in {"NASDAQ", "NYSE"} else f"HK.{inst.symbol}"
+
+    def get_prices(self, insts: List[Instrument]) -> Dict[str, float]:
+        """One multi-code market snapshot for the batch; codes OpenD does not answer use get_price()."""
+        if len(insts) == 1:
+            return super().get_prices(insts)
+        prices: Dict[str, float] = {}
+        try:
+            from src.utils.moomoo_client import get_moomoo_client
+            snapshots = get_moomoo_client().get_stock_quotes([self._moo_symbol(inst) for inst in insts])
+        except Exception as exc:
+            logger.warning(f"Moomoo provider batch lookup failed: {exc}", exc_info=True)
+            snapshots = {}
+        missing = []
+        for inst in insts:
+            last_price = snapshots.get(self._moo_symbol(inst), {}).get("last_price")
+            if last_price is not None and last_price > 0:
+                prices[instrument_key(inst)] = float(last_price)
+            else:
+                missing.append(inst)
+        if missing:
+            prices.update(super().get_prices(missing))
+        return prices
+
 
 class GrowwProvider(MarketProvider):
     """Groww EOD and realtime quote provider for Indian equities (NSE/BSE)."""
@@ -144,6 +161,7 @@ class GrowwProvider(MarketProvider):
         self.api_key = os.getenv("GROWW_API_KEY")
         self.base_url = os.getenv("GROWW_BASE_URL", "https://api.groww.in")
         self.token = os.getenv("GROWW_TOKEN")
+        self.session = get_session("groww")
 
     def _headers(self) -> Dict[str, str]:
         headers = {"Accept": "application/json", "User-Agent": "azmat-trading/1.0"}
@@ -156,25 +174,80 @@ class GrowwProvider(MarketProvider):
     def supports_instrument(self, inst: Instrument) -> bool:
         return inst.exchange in {"NSE", "BSE"}
 
+    @staticmethod
+    def _parse_quote(data) -> Optional[float]:
+        if isinstance(data, dict):
+            if "last_price" in data:
+                return float(data["last_price"])
+            if "data" in data and isinstance(data["data"], dict) and "last_price" in data["data"]:
+                return float(data["data"]["last_price"])
+            if "last" in data:
+                return float(data["last"])
+        return None
+
     def get_price(self, inst: Instrument) -> Optional[float]:
         if not (self.api_key or self.token):
             return None
         try:
             url = f"{self.base_url}/market/v1/quotes"
-            resp = requests.get(url, headers=self._headers(), params={"symbol": inst.symbol}, timeout=4)
+            resp = self.session.get(url, headers=self._headers(), params={"symbol": inst.symbol}, timeout=4)
             resp.raise_for_status()
-            data = resp.json()
-            if isinstance(data, dict):
-                if "last_price" in data:
-                    return float(data["last_price"])
-                if "data" in data and isinstance(data["data"], dict) and "last_price" in data["data"]:
-                    return float(data["data"]["last_price"])
-                if "last" in data:
-                    return float(data["last"])
+            return self._parse_quote(resp.json())
         except Exception as exc:
             logger.warning(f"Groww provider lookup failed for '{inst.symbol}': {exc}", exc_info=True)
         return None
 
+    async def aget_price(self, inst: Instrument) -> Optional[float]:
+        """REST quote over the loop's pooled async client, without a worker thread."""
+        if not (self.api_key or self.token):
+            return None
+        try:
+            resp = await get_async_client("groww").get(
+                f"{self.base_url}/market/v1/quotes", headers=self._headers(), params={"symbol": inst.symbol}, timeout=4
+            )
+            resp.raise_for_status()
+            return self._parse_quote(resp.json())
+        except Exception as exc:
+            logger.warning(f"Groww provider lookup failed for '{inst.symbol}': {exc}", exc_info=True)
+        return None
+
+    def get_prices(self, insts: List[Instrument]) -> Dict[str, float]:
+        """
+        Use the Groww SDK's bulk get_ltp (up to GROWW_LTP_BATCH instruments per call) when the SDK
+        client is available; otherwise, and for instruments it does not return, fall back to get_price().
+        """
+        prices: Dict[str, float] = {}
+        missing = list(insts)
+        sdk = _groww_sdk_client()
+        if sdk is not None:
+            missing = []
+            for start in range(0, len(insts), GROWW_LTP_BATCH):
+                chunk = insts[start:start + GROWW_LTP_BATCH]
+                try:
+                    ltp = sdk.get_ltp(segment="CASH",
+                                      exchange_trading_symbols=tuple(f"{i.exchange}_{i.symbol}" for i in chunk))
+                except Exception as exc:
+                    logger.warning(f"Groww bulk LTP lookup failed for {len(chunk)} symbols: {exc}", exc_info=True)
+                    ltp = {}
+                for inst in chunk:
+                    price = (ltp or {}).get(f"{inst.exchange}_{inst.symbol}")
+                    if price is not None:
+                        prices[instrument_key(inst)] = float(price)
+                    else:
+                        missing.append(inst)
+        if missing and (self.api_key or self.token):
+            prices.update(super().get_prices(missing))
+        return prices
+
+
+def _groww_sdk_client():
+    """The shared Groww SDK wrapper when the SDK is installed and authenticated, else None."""
+    try:
+        from groww_client import client
+    except Exception:
+        return None
+    return client if client.available() else None
+
 
 def _build_provider_registry() -> List[MarketProvider]:
     """Dynamically register market providers based on feature flags."""
@@ -190,68 +263,321 @@ def _build_provider_registry() -> List[MarketProvider]:
 
 _PROVIDERS = _build_provider_registry()
 
+# Delay before the next eligible provider is raced against those already in flight
+QUOTE_HEDGE_DELAY_MS = int(os.getenv("QUOTE_HEDGE_DELAY_MS", "750"))
+# Upper bound on a whole async quote race
+QUOTE_TIMEOUT_SECONDS = float(os.getenv("QUOTE_TIMEOUT_SECONDS", "15"))
+
+
+# Rolling success/latency stats and circuit breaker state per provider instance
+_provider_health = ProviderHealthRegistry()
+
+
+def _ordered_providers(providers: List[MarketProvider], exchange: Optional[str] = None) -> List[MarketProvider]:
+    """
+    Providers whose circuit is not open, specialists before generalists, each tier ordered by
+    median latency on `exchange` (registry order until latencies are known).
+    """
+    return (_provider_health.rank([p for p in providers if p.specialist], exchange)
+            + _provider_health.rank([p for p in providers if not p.specialist], exchange))
+
+
+def instrument_key(inst: Instrument) -> str:
+    """Canonical "EXCHANGE:SYMBOL" key shared by the quote caches and the tick store."""
+    return inst.key
 
-def get_share_price(symbol_or_inst: Union[str, Instrument]) -> float:
+
+def _read_cached_quote(cache_key: str, now_ts: float, allow_stale: bool = False) -> Optional[Tuple[float, bool]]:
+    """
+    Look a quote up in the streaming tick store, then L1, then the shared L2 table, counting hits
+    and misses per tier. Returns (price, fresh); stale L1 entries are only returned when
+    allow_stale is set.
+    """
+    tick = tick_store.latest(cache_key, max_age=MARKET_FEED_MAX_TICK_AGE_SECONDS, now=now_ts)
+    if tick is not None:
+        _quote_cache_stats["feed_hits"] += 1
+        return tick.price, True
+
+    cached = _price_cache.get(cache_key, now_ts, allow_stale=allow_stale)
+    if cached is not None:
+        _quote_cache_stats["l1_hits" if cached[1] else "l1_stale_hits"] += 1
+        return cached
+    _quote_cache_stats["l1_misses"] += 1
+
+    if _L2_CACHE_ENABLED:
+        shared = read_market_cache_sync(f"quote:{cache_key}", _CACHE_TTL_SECONDS)
+        if shared and shared.get("price") is not None:
+            _quote_cache_stats["l2_hits"] += 1
+            price = float(shared["price"])
+            _price_cache.put(cache_key, price, float(shared.get("fetched_at", now_ts)))
+            return price, True
+        _quote_cache_stats["l2_misses"] += 1
+    return None
+
+
+def _store_quote(inst: Instrument, price: float, now_ts: float, provider: MarketProvider) -> None:
+    cache_key = instrument_key(inst)
+    _price_cache.put(cache_key, price, now_ts)
+    if _L2_CACHE_ENABLED:
+        write_market_cache_sync(f"quote:{cache_key}", {
+            "symbol": inst.symbol,
+            "exchange": inst.exchange,
+            "price": price,
+            "fetched_at": now_ts,
+            "provider": type(provider).__name__,
+        })
+
+
+def _fetch_from_providers(missing: Dict[str, Instrument], now_ts: float) -> Dict[str, float]:
+    """Price `missing` (cache key -> instrument) with one batch per provider, specialists first."""
+    prices: Dict[str, float] = {}
+    missing = dict(missing)
+    exchanges = {inst.exchange for inst in missing.values()}
+    for provider in _ordered_providers(_PROVIDERS, next(iter(exchanges)) if len(exchanges) == 1 else None):
+        batch = [inst for inst in missing.values() if provider.supports_instrument(inst)]
+        if not batch:
+            continue
+        health = _provider_health.get(provider)
+        if not health.allow():
+            continue
+        _quote_cache_stats["provider_fetches"] += len(batch)
+        _quote_cache_stats["provider_batches"] += 1
+        started = time.perf_counter()
+        try:
+            quoted = provider.get_prices(batch)
+        except Exception as exc:
+            logger.warning(f"{type(provider).__name__} batch quote failed for {len(batch)} symbols: {exc}", exc_info=True)
+            quoted = {}
+        health.record(bool(quoted), time.perf_counter() - started, {inst.exchange for inst in batch})
+        for cache_key, price in quoted.items():
+            inst = missing.pop(cache_key, None)
+            if inst is not None:
+                prices[cache_key] = price
+                _store_quote(inst, price, now_ts, provider)
+        if not missing:
+            break
+    return prices
+
+
+def _revalidate_in_background(insts: List[Instrument]) -> None:
+    """Refresh stale quotes on a daemon thread; keys already being refreshed are skipped."""
+    claimed = [inst for inst in insts if _price_cache.begin_revalidate(instrument_key(inst))]
+    if not claimed:
+        return
+
+    def _refresh() -> None:
+        try:
+            get_share_prices(claimed)
+        except Exception as exc:
+            logger.warning(f"Background quote refresh failed: {exc}")
+        finally:
+            for inst in claimed:
+                _price_cache.end_revalidate(instrument_key(inst))
+
+    threading.Thread(target=_refresh, name="quote-revalidate", daemon=True).start()
+
+
+def get_share_prices(symbols: List[Union[str, Instrument]], allow_stale: bool = False) -> Dict[str, float]:
+    """
+    Batched quote resolver keyed by the symbols as passed in.
+    Cached quotes come from L1/L2; the rest are grouped per provider, so each provider sees one
+    bulk request for every instrument it supports that is still unpriced. A symbol another
+    thread is already fetching is waited for instead of fetched again.
+    With allow_stale (read-only displays), recently expired L1 quotes are returned at once and
+    refreshed in the background; trading paths keep the default strict freshness.
+    Fails loudly with RuntimeError if any symbol has no live quote.
+    """
+    now_ts = time.time()
+    requested = {}
+    for symbol in symbols:
+        inst = Instrument.parse(symbol)
+        requested[symbol if isinstance(symbol, str) else inst.symbol] = inst
+
+    prices: Dict[str, float] = {}
+    missing: Dict[str, Instrument] = {}
+    stale: List[Instrument] = []
+    for inst in requested.values():
+        cache_key = instrument_key(inst)
+        if cache_key in prices or cache_key in missing:
+            continue
+        cached = _read_cached_quote(cache_key, now_ts, allow_stale=allow_stale)
+        if cached is None:
+            missing[cache_key] = inst
+            continue
+        prices[cache_key] = cached[0]
+        if not cached[1]:
+            stale.append(inst)
+    if stale:
+        _revalidate_in_background(stale)
+
+    if missing:
+        leading, following = _price_cache.claim(missing)
+        try:
+            prices.update(_fetch_from_providers({key: missing[key] for key in leading}, now_ts))
+        finally:
+            _price_cache.release(leading)
+        for event in following:
+            event.wait(QUOTE_TIMEOUT_SECONDS)
+        for cache_key in missing:
+            if cache_key not in prices:
+                cached = _price_cache.get(cache_key, allow_stale=allow_stale)
+                if cached is not None:
+                    prices[cache_key] = cached[0]
+
+    unavailable = [inst.symbol for key, inst in missing.items() if key not in prices]
+    if unavailable:
+        logger.error(f"HARD MARKET FAILURE: All registered providers failed/unconfigured for '{', '.join(unavailable)}'.")
+        raise RuntimeError(f"Live market quote unavailable for '{', '.join(unavailable)}'. Halting execution to prevent trading on unverified data.")
+    return {symbol: prices[instrument_key(inst)] for symbol, inst in requested.items()}
+
+
+def get_share_price(symbol_or_inst: Union[str, Instrument], allow_stale: bool = False) -> float:
     """
     Zero-special-case market price resolver over active Provider Registry and Instrument model.
+    A live tick from the market feed is used first; otherwise quotes are served from the
+    in-process L1 cache, then the shared SQLite L2 cache, before any provider is called; both
+    cache tiers honour GROWW_CACHE_TTL_SECONDS.
     Fails loudly with RuntimeError if live market data is unavailable.
     """
+    return next(iter(get_share_prices([symbol_or_inst], allow_stale=allow_stale).values()))
+
+
+async def _race_providers(inst: Instrument, providers: List[MarketProvider],
+                          hedge_delay: float) -> Optional[Tuple[MarketProvider, float]]:
+    """
+    Hedged race over `providers` in order: the next one starts when the previous fails or has not
+    answered within `hedge_delay` seconds. The first positive quote wins and every other lookup
+    still in flight is cancelled. Finished lookups feed the providers' health stats; providers
+    whose circuit opened since ordering are skipped at launch.
+    """
+    remaining = list(providers)
+    owners: Dict[asyncio.Task, Tuple[MarketProvider, float]] = {}
+    pending: set = set()
+
+    def launch() -> None:
+        while remaining:
+            provider = remaining.pop(0)
+            if _provider_health.get(provider).allow():
+                task = asyncio.create_task(provider.aget_price(inst))
+                owners[task] = (provider, time.perf_counter())
+                pending.add(task)
+                return
+
+    launch()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending, timeout=hedge_delay if remaining else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            pending.difference_update(done)
+            for task in done:
+                provider, started = owners[task]
+                health = _provider_health.get(provider)
+                if task.exception() is not None:
+                    health.record(False, time.perf_counter() - started)
+                    logger.warning(f"{type(provider).__name__} quote failed for '{inst.symbol}': {task.exception()}")
+                    continue
+                price = task.result()
+                ok = price is not None and price > 0
+                health.record(ok, time.perf_counter() - started, (inst.exchange,))
+                if ok:
+                    return provider, price
+            # Hedge after the delay, or fail over at once when a lookup came back empty
+            if remaining:
+                launch()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _afetch_quote(inst: Instrument, hedge_delay_ms: Optional[int], timeout: Optional[float]) -> float:
+    now_ts = time.time()
+    providers = [p for p in _ordered_providers(_PROVIDERS, inst.exchange) if p.supports_instrument(inst)]
+    winner = None
+    if providers:
+        delay = (QUOTE_HEDGE_DELAY_MS if hedge_delay_ms is None else hedge_delay_ms) / 1000
+        try:
+            winner = await asyncio.wait_for(
+                _race_providers(inst, providers, delay),
+                QUOTE_TIMEOUT_SECONDS if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Quote race for '{inst.symbol}' timed out.")
+    if winner is None:
+        logger.error(f"HARD MARKET FAILURE: All registered providers failed/unconfigured for '{inst.symbol}' (Exchange: {inst.exchange}).")
+        raise RuntimeError(f"Live market quote unavailable for '{inst.symbol}'. Halting execution to prevent trading on unverified data.")
+
+    provider, price = winner
+    _quote_cache_stats["provider_fetches"] += 1
+    _store_quote(inst, price, now_ts, provider)
+    return price
+
+
+async def aget_share_price(symbol_or_inst: Union[str, Instrument], hedge_delay_ms: Optional[int] = None,
+                           timeout: Optional[float] = None, allow_stale: bool = False) -> float:
+    """
+    Non-blocking get_share_price(). After the L1/L2 caches, eligible providers (specialists first)
+    are raced with hedging: each later provider starts QUOTE_HEDGE_DELAY_MS after the previous one
+    unless that one already failed. The first valid quote wins and the rest are cancelled.
+    Concurrent callers missing the same symbol share one race.
+    Fails loudly with RuntimeError if no provider answers within QUOTE_TIMEOUT_SECONDS.
+    """
     inst = Instrument.parse(symbol_or_inst)
-    cache_key = inst.symbol.upper().strip()
-    now_ts = int(datetime.now(tz=timezone.utc).timestamp())
+    cache_key = instrument_key(inst)
+    cached = _read_cached_quote(cache_key, time.time(), allow_stale=allow_stale)
+    if cached is not None:
+        if not cached[1]:
+            _revalidate_in_background([inst])
+        return cached[0]
+    return await _price_cache.coalesce(cache_key, lambda: _afetch_quote(inst, hedge_delay_ms, timeout))
 
-    cached = _price_cache.get(cache_key)
-    if cached:
-        ts, price = cached
-        if now_ts - ts <= _CACHE_TTL_SECONDS:
-            return price
 
-    for provider in _PROVIDERS:
-        if provider.supports_instrument(inst):
-            price = provider.get_price(inst)
-            if price is not None:
-                _price_cache[cache_key] = (now_ts, price)
-                return price
+async def aget_share_prices(symbols: List[Union[str, Instrument]], allow_stale: bool = False) -> Dict[str, float]:
+    """Non-blocking get_share_prices(): the batched, bulk-endpoint lookup runs in a worker thread."""
+    return await asyncio.to_thread(get_share_prices, symbols, allow_stale)
 
-    logger.error(f"HARD MARKET FAILURE: All registered providers failed/unconfigured for '{cache_key}' (Exchange: {inst.exchange}).")
-    raise RuntimeError(f"Live market quote unavailable for '{cache_key}'. Halting execution to prevent trading on unverified data.")
 
+def get_quote_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters per quote tier, provider calls made on L2 misses, and L1 LRU internals."""
+    l1 = _price_cache.stats()
+    return {
+        **_quote_cache_stats,
+        "l1_size": l1["size"],
+        "l1_evictions": l1["evictions"],
+        "coalesced": l1["coalesced"],
+        "revalidations": l1["revalidations"],
+    }
 
-@lru_cache(maxsize=256)
-def get_historical_close(symbol: str, date_iso: str) -> float:
+
+def get_provider_health() -> List[Dict]:
     """
-    Get historical close for symbol at date (YYYY-MM-DD).
-    Fails loudly if provider history is unavailable.
+    Health of each registered provider for dashboards: circuit state, rolling success rate,
+    median latency overall and per exchange, and call/failure/trip counts.
     """
-    groww = GrowwProvider()
-    if groww.supports_symbol(symbol):
-        try:
-            url = f"{groww.base_url}/market/v1/history"
-            resp = requests.get(url, headers=groww._headers(), params={"symbol": symbol, "date": date_iso}, timeout=6)
-            resp.raise_for_status()
-            payload = resp.json()
-            if isinstance(payload, dict):
-                if "close" in payload:
-                    return float(payload["close"])
-                if "data" in payload and isinstance(payload["data"], dict) and "close" in payload["data"]:
-                    return float(payload["data"]["close"])
-        except Exception as exc:
-            logger.warning(f"Historical close request failed for '{symbol}' ({date_iso}): {exc}", exc_info=True)
+    return [_provider_health.get(provider).snapshot() for provider in _PROVIDERS]
 
-    raise RuntimeError(f"Historical close price unavailable for '{symbol}' ({date_iso}).")
+
+def get_historical_close(symbol: str, date_iso: str) -> float:
+    """
+    Get historical close for symbol at date (YYYY-MM-DD, exchange-local). A non-trading date
+    yields the last close before it. Served from the on-disk candle store, which fetches only
+    history it does not hold yet. Fails loudly if provider history is unavailable.
+    """
+    close = candle_store.close_on(symbol, date_iso)
+    if close is None:
+        raise RuntimeError(f"Historical close price unavailable for '{symbol}' ({date_iso}).")
+    return close
 
 
-def is_market_open(now_utc: Optional[datetime] = None) -> bool:
+def is_market_open(now_utc: Optional[datetime] = None, exchange: str = "NSE") -> bool:
     """
-    Return True if Indian equities market is open now (Mon-Fri 09:15-15:30 IST).
+    Return True if the exchange (Indian equities by default) is in session now, honouring
+    its holidays and special sessions from config/market_calendar.json.
     """
-    if now_utc is None:
-        now_utc = datetime.now(tz=timezone.utc)
+    return market_calendar.is_open(exchange, now_utc)
 
-    ist = now_utc.astimezone(timezone(timedelta(hours=5, minutes=30)))
-    if ist.weekday() >= 5:
-        return False
 
-    market_open = ist.replace(hour=9, minute=15, second=0, microsecond=0)
-    market_close = ist.replace(hour=15, minute=30, second=0, microsecond=0)
-    return market_open <= ist <= market_close
+def next_market_open(now_utc: Optional[datetime] = None, exchange: str = "NSE") -> datetime:
+    """Start of the exchange's next session, in exchange-local time."""
+    return market_calendar.next_open(exchange, now_utc)
@@ -0,0 +1,189 @@
+# src/core/market_calendar.py
+"""
+Exchange trading calendars.
+Regular hours, holidays and special sessions (e.g. NSE Muhurat trading, US half days) come
+from config/market_calendar.json. Sessions are precomputed per exchange, with lookup tables
+keyed by local date, so is_open() and next_open() are constant-time dictionary reads.
+"""
+
+import json
+import logging
+import pathlib
+import threading
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger("market")
+
+_CONFIG_PATHS = [
+    pathlib.Path("config/market_calendar.json"),
+    pathlib.Path(__file__).parent.parent.parent / "config" / "market_calendar.json",
+]
+
+# Used for exchanges missing from the config file
+_DEFAULT_CONFIG = {"timezone": "Asia/Kolkata", "session": ["09:15", "15:30"], "holidays": [], "special_sessions": {}}
+
+
+def _parse_hours(hours: List[str]) -> Tuple[time, time]:
+    return time.fromisoformat(hours[0]), time.fromisoformat(hours[1])
+
+
+class ExchangeCalendar:
+    """Precomputed trading sessions of one exchange as (open_ts, close_ts) epoch-second pairs."""
+
+    def __init__(self, name: str, tz: str, session: Tuple[time, time], holidays: Set[date],
+                 special_sessions: Dict[date, Tuple[time, time]]):
+        self.name = name
+        self.tz = ZoneInfo(tz)
+        self.session = session
+        self.holidays = holidays
+        self.special_sessions = special_sessions
+        self._listed_years = {d.year for d in holidays} | {d.year for d in special_sessions}
+        self._lock = threading.Lock()
+        self._first_year = self._last_year = None
+        self._sessions: List[Tuple[int, int]] = []
+        self._by_date: Dict[date, int] = {}
+        self._next_by_date: Dict[date, int] = {}
+        today = datetime.now(self.tz).date()
+        self._build(min([today.year - 1, *self._listed_years]), max([today.year + 1, *self._listed_years]))
+
+    @classmethod
+    def from_config(cls, name: str, cfg: Dict[str, Any]) -> "ExchangeCalendar":
+        return cls(
+            name,
+            cfg.get("timezone", "UTC"),
+            _parse_hours(cfg.get("session", ["09:15", "15:30"])),
+            {date.fromisoformat(d) for d in cfg.get("holidays", [])},
+            {date.fromisoformat(d): _parse_hours(h) for d, h in cfg.get("special_sessions", {}).items()},
+        )
+
+    def _hours_on(self, day: date) -> Optional[Tuple[time, time]]:
+        if day in self.special_sessions:
+            return self.special_sessions[day]
+        if day.weekday() >= 5 or day in self.holidays:
+            return None
+        return self.session
+
+    def _build(self, first_year: int, last_year: int) -> None:
+        """(Re)compute sessions and per-date lookups for first_year..last_year inclusive."""
+        missing = sorted(set(range(first_year, last_year + 1)) - self._listed_years)
+        if missing and self._listed_years:
+            logger.warning(f"No {self.name} holiday list for {missing}; those years use weekdays only.")
+        sessions: List[Tuple[int, int]] = []
+        by_date: Dict[date, int] = {}
+        days: List[date] = []
+        day, end = date(first_year, 1, 1), date(last_year, 12, 31)
+        while day <= end:
+            days.append(day)
+            hours = self._hours_on(day)
+            if hours is not None:
+                by_date[day] = len(sessions)
+                sessions.append((
+                    int(datetime.combine(day, hours[0], self.tz).timestamp()),
+                    int(datetime.combine(day, hours[1], self.tz).timestamp()),
+                ))
+            day += timedelta(days=1)
+        # Index of the first session on or after each date, filled backwards
+        next_by_date: Dict[date, int] = {}
+        upcoming = len(sessions)
+        for day in reversed(days):
+            if day in by_date:
+                upcoming = by_date[day]
+            next_by_date[day] = upcoming
+        self._sessions, self._by_date, self._next_by_date = sessions, by_date, next_by_date
+        self._first_year, self._last_year = first_year, last_year
+
+    def _ensure(self, day: date) -> None:
+        # Keep a year of headroom so next_open() never runs off the end of the table
+        if self._first_year <= day.year < self._last_year:
+            return
+        with self._lock:
+            if not (self._first_year <= day.year < self._last_year):
+                self._build(min(self._first_year, day.year), max(self._last_year, day.year + 1))
+
+    def _local(self, now: Optional[datetime]) -> Tuple[int, date]:
+        now = datetime.now(tz=timezone.utc) if now is None else now
+        local = now.astimezone(self.tz)
+        self._ensure(local.date())
+        return int(now.timestamp()), local.date()
+
+    def session_on(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """Open and close of the session on a local date, or None if the exchange is shut."""
+        self._ensure(day)
+        index = self._by_date.get(day)
+        if index is None:
+            return None
+        open_ts, close_ts = self._sessions[index]
+        return datetime.fromtimestamp(open_ts, self.tz), datetime.fromtimestamp(close_ts, self.tz)
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        ts, day = self._local(now)
+        index = self._by_date.get(day)
+        if index is None:
+            return False
+        open_ts, close_ts = self._sessions[index]
+        return open_ts <= ts <= close_ts
+
+    def next_open(self, now: Optional[datetime] = None) -> datetime:
+        """Start of the next session that has not begun yet (tomorrow's if one is running)."""
+        ts, day = self._local(now)
+        index = self._next_by_date[day]
+        if index < len(self._sessions) and self._sessions[index][0] <= ts:
+            index += 1
+        if index >= len(self._sessions):
+            # Only reachable when no session exists in the year of headroom
+            self._ensure(day + timedelta(days=366))
+            index = bisect_left(self._sessions, (ts + 1, 0))
+        return datetime.fromtimestamp(self._sessions[index][0], self.tz)
+
+    def next_close(self, now: Optional[datetime] = None) -> datetime:
+        """End of the running session, or of the next one if the exchange is shut."""
+        ts, day = self._local(now)
+        index = self._by_date.get(day)
+        if index is not None and ts <= self._sessions[index][1]:
+            return datetime.fromtimestamp(self._sessions[index][1], self.tz)
+        opening = self.next_open(now)
+        return datetime.fromtimestamp(self._sessions[self._by_date[opening.date()]][1], self.tz)
+
+
+def _load_config() -> Dict[str, Dict[str, Any]]:
+    for p in _CONFIG_PATHS:
+        if p.exists():
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as exc:
+                logger.warning(f"Failed to load market calendar from {p}: {exc}")
+    return {}
+
+
+_calendar_config = _load_config()
+_calendars: Dict[str, ExchangeCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(exchange: str = "NSE") -> ExchangeCalendar:
+    exchange = exchange.upper()
+    calendar = _calendars.get(exchange)
+    if calendar is None:
+        with _calendars_lock:
+            calendar = _calendars.get(exchange)
+            if calendar is None:
+                cfg = _calendar_config.get(exchange)
+                while cfg is not None and "same_as" in cfg:
+                    cfg = _calendar_config.get(cfg["same_as"])
+                if cfg is None:
+                    logger.warning(f"No market calendar configured for {exchange}; using NSE hours without holidays.")
+                    cfg = _DEFAULT_CONFIG
+                calendar = _calendars[exchange] = ExchangeCalendar.from_config(exchange, cfg)
+    return calendar
+
+
+def is_open(exchange: str = "NSE", now: Optional[datetime] = None) -> bool:
+    return get_calendar(exchange).is_open(now)
+
+
+def next_open(exchange: str = "NSE", now: Optional[datetime] = None) -> datetime:
+    return get_calendar(exchange).next_open(now)
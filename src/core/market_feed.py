@@ -0,0 +1,310 @@
+# src/core/market_feed.py
+"""
+Streaming market data: a daemon subscribes to LTP updates for held and watchlisted instruments
+and writes them into a shared in-process TickStore that quote lookups read before any provider.
+Feed sources are pluggable; GrowwFeedSource streams from the Groww SDK and ReplayFeedSource
+drives the same interface from a recorded tick file for tests and offline runs.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger("market_feed")
+
+TICK_BUFFER_SIZE = int(os.getenv("MARKET_FEED_BUFFER_SIZE", "10000"))
+# Ticks older than this are not trusted as a live price
+MARKET_FEED_MAX_TICK_AGE_SECONDS = float(os.getenv("MARKET_FEED_MAX_TICK_AGE_SECONDS", "10"))
+
+# Callback invoked by feed sources as on_tick(instrument_key, price, epoch_seconds)
+TickCallback = Callable[[str, float, float], None]
+
+
+class Tick(NamedTuple):
+    key: str
+    price: float
+    ts: float
+
+
+class TickStore:
+    """
+    Latest tick per instrument key ("EXCHANGE:SYMBOL") plus a bounded ring of recent ticks.
+    Writers replace whole immutable Tick tuples and append to a maxlen deque, both single
+    atomic operations under the GIL, so readers never take a lock.
+    """
+
+    def __init__(self, buffer_size: int = TICK_BUFFER_SIZE):
+        self._latest: Dict[str, Tick] = {}
+        self._recent: Deque[Tick] = deque(maxlen=buffer_size)
+        self.received = 0
+
+    def update(self, key: str, price: float, ts: Optional[float] = None) -> None:
+        tick = Tick(key.upper(), float(price), time.time() if ts is None else ts)
+        current = self._latest.get(tick.key)
+        if current is None or tick.ts >= current.ts:
+            self._latest[tick.key] = tick
+        self._recent.append(tick)
+        self.received += 1
+
+    def latest(self, key: str, max_age: Optional[float] = None, now: Optional[float] = None) -> Optional[Tick]:
+        """Most recent tick for `key`, or None when there is none or it is older than max_age."""
+        tick = self._latest.get(key.upper())
+        if tick is None:
+            return None
+        if max_age is not None and (time.time() if now is None else now) - tick.ts > max_age:
+            return None
+        return tick
+
+    def recent(self, key: Optional[str] = None, limit: Optional[int] = None) -> List[Tick]:
+        """Buffered ticks oldest first, optionally for one key and limited to the newest `limit`."""
+        ticks = list(self._recent)
+        if key is not None:
+            ticks = [tick for tick in ticks if tick.key == key.upper()]
+        return ticks[-limit:] if limit else ticks
+
+    def clear(self) -> None:
+        self._latest = {}
+        self._recent.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"instruments": len(self._latest), "buffered": len(self._recent), "received": self.received}
+
+
+class FeedSource(ABC):
+    """A stream of last-traded prices for a set of instrument keys."""
+
+    @abstractmethod
+    def start(self, keys: Iterable[str], on_tick: TickCallback) -> None:
+        """Begin delivering ticks for `keys` to `on_tick`; must not block the caller."""
+
+    @abstractmethod
+    def update_subscriptions(self, keys: Iterable[str]) -> None:
+        """Replace the subscribed key set."""
+
+    @abstractmethod
+    def stop(self) -> None:
+        pass
+
+
+class GrowwFeedSource(FeedSource):
+    """
+    Live LTP stream over the Groww SDK's GrowwFeed. The SDK subscribes by exchange token, which
+    is taken from the optional "exchange_token" of an entry in config/instruments.json;
+    instruments without one are left to the polling providers.
+    """
+
+    def __init__(self, client=None, tokens: Optional[Dict[str, str]] = None,
+                 poll_interval: float = float(os.getenv("MARKET_FEED_POLL_SECONDS", "1"))):
+        if client is None:
+            from groww_client import client as groww_client
+            client = groww_client
+        self.client = client
+        self.tokens = tokens if tokens is not None else _configured_exchange_tokens()
+        self.poll_interval = poll_interval
+        self._feed = None
+        self._keys: Set[str] = set()
+        self._on_tick: Optional[TickCallback] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _instruments(self, keys: Iterable[str]) -> List[Dict[str, str]]:
+        instruments = []
+        for key in keys:
+            exchange = key.partition(":")[0]
+            token = self.tokens.get(key)
+            if token:
+                instruments.append({"exchange": exchange, "segment": "CASH", "exchange_token": str(token)})
+            else:
+                logger.debug(f"No exchange token configured for '{key}'; it stays on polled quotes.")
+        return instruments
+
+    def start(self, keys: Iterable[str], on_tick: TickCallback) -> None:
+        self._on_tick = on_tick
+        self.update_subscriptions(keys)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="groww-feed", daemon=True)
+        self._thread.start()
+
+    def update_subscriptions(self, keys: Iterable[str]) -> None:
+        self._keys = {key.upper() for key in keys}
+        instruments = self._instruments(self._keys)
+        if not instruments:
+            return
+        if self._feed is None:
+            self._feed = self.client.feed_subscribe_ltp(instruments)
+        else:
+            self._feed.subscribe_ltp(instruments)
+
+    def _run(self) -> None:
+        by_token = {str(token): key for key, token in self.tokens.items()}
+        while not self._stop.wait(self.poll_interval):
+            if self._feed is None or self._on_tick is None:
+                continue
+            try:
+                snapshot = self._feed.get_ltp() or {}
+            except Exception as exc:
+                logger.warning(f"Groww feed read failed: {exc}")
+                continue
+            for segments in (snapshot.get("ltp") or {}).values():
+                for tokens in segments.values():
+                    for token, data in tokens.items():
+                        key = by_token.get(str(token))
+                        if key in self._keys and data.get("ltp") is not None:
+                            ts = data.get("tsInMillis")
+                            self._on_tick(key, float(data["ltp"]), ts / 1000 if ts else time.time())
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._feed is not None and hasattr(self._feed, "unsubscribe_ltp"):
+            try:
+                self._feed.unsubscribe_ltp(self._instruments(self._keys))
+            except Exception as exc:
+                logger.debug(f"Groww feed unsubscribe failed: {exc}")
+
+
+class ReplayFeedSource(FeedSource):
+    """
+    Replays a recorded tick file as a feed. Each line is a JSON object such as
+    {"key": "NSE:INFY", "price": 1523.4, "ts": 1722580000.25}; "symbol" is accepted for "key".
+    Gaps between recorded timestamps are reproduced divided by `speed` (0 replays at once),
+    and ticks are re-stamped with the replay time so they count as live.
+    """
+
+    def __init__(self, path: str, speed: float = 0.0, loop: bool = False):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self._keys: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.finished = threading.Event()
+
+    def _load(self) -> List[Tick]:
+        ticks = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                ticks.append(Tick(str(row.get("key") or row["symbol"]).upper(), float(row["price"]), float(row.get("ts", 0))))
+        return ticks
+
+    def start(self, keys: Iterable[str], on_tick: TickCallback) -> None:
+        self.update_subscriptions(keys)
+        ticks = self._load()
+        self._stop.clear()
+        self.finished.clear()
+        self._thread = threading.Thread(target=self._run, args=(ticks, on_tick), name="replay-feed", daemon=True)
+        self._thread.start()
+
+    def update_subscriptions(self, keys: Iterable[str]) -> None:
+        self._keys = {key.upper() for key in keys}
+
+    def _run(self, ticks: List[Tick], on_tick: TickCallback) -> None:
+        try:
+            while not self._stop.is_set():
+                previous_ts = None
+                for tick in ticks:
+                    if self.speed and previous_ts is not None and tick.ts > previous_ts:
+                        if self._stop.wait((tick.ts - previous_ts) / self.speed):
+                            return
+                    previous_ts = tick.ts
+                    if tick.key in self._keys:
+                        on_tick(tick.key, tick.price, time.time())
+                if not self.loop:
+                    return
+        finally:
+            self.finished.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+
+def _configured_exchange_tokens() -> Dict[str, str]:
+    from .instruments import instrument_index
+    return {inst.key: inst.exchange_token for inst in instrument_index.instruments() if inst.exchange_token}
+
+
+class MarketDataDaemon:
+    """
+    Keeps a FeedSource subscribed to the union of held and watchlisted instruments and feeds
+    its ticks into a TickStore. refresh_subscriptions() re-reads holdings and resubscribes
+    only when the instrument set changed.
+    """
+
+    def __init__(self, source: FeedSource, store: Optional["TickStore"] = None,
+                 watchlist: Iterable[str] = (), held_symbols: Optional[Callable[[], Iterable[str]]] = None):
+        self.source = source
+        self.store = store if store is not None else tick_store
+        self.watchlist = list(watchlist)
+        self._held_symbols = held_symbols
+        self.keys: Set[str] = set()
+        self.running = False
+
+    def _wanted_keys(self) -> Set[str]:
+        from .instruments import Instrument
+        if self._held_symbols is None:
+            from .database import read_held_symbols_sync
+            held = read_held_symbols_sync()
+        else:
+            held = self._held_symbols()
+        return {Instrument.parse(symbol).key for symbol in [*held, *self.watchlist]}
+
+    def start(self) -> "MarketDataDaemon":
+        self.keys = self._wanted_keys()
+        self.source.start(self.keys, self.store.update)
+        self.running = True
+        logger.info(f"Market feed started for {len(self.keys)} instruments via {type(self.source).__name__}.")
+        return self
+
+    def refresh_subscriptions(self) -> bool:
+        keys = self._wanted_keys()
+        if keys == self.keys:
+            return False
+        self.keys = keys
+        self.source.update_subscriptions(keys)
+        return True
+
+    def stop(self) -> None:
+        if self.running:
+            self.source.stop()
+            self.running = False
+
+
+tick_store = TickStore()
+
+
+def start_market_feed(watchlist: Iterable[str] = ()) -> Optional[MarketDataDaemon]:
+    """
+    Start the feed daemon if a source is available: MARKET_FEED_REPLAY_FILE selects a replay,
+    otherwise the Groww SDK feed is used when the SDK client is authenticated.
+    """
+    replay_file = os.getenv("MARKET_FEED_REPLAY_FILE")
+    if replay_file:
+        source: FeedSource = ReplayFeedSource(
+            replay_file, speed=float(os.getenv("MARKET_FEED_REPLAY_SPEED", "1")), loop=True
+        )
+    else:
+        try:
+            from groww_client import client as groww_client
+        except Exception:
+            groww_client = None
+        if groww_client is None or not groww_client.available():
+            logger.info("Market feed disabled: no replay file and Groww SDK unavailable.")
+            return None
+        source = GrowwFeedSource(groww_client)
+    try:
+        return MarketDataDaemon(source, watchlist=watchlist).start()
+    except Exception as exc:
+        logger.error(f"Failed to start market feed: {exc}", exc_info=True)
+        return None
@@ -0,0 +1,409 @@
+# src/core/migrations.py
+"""
+Versioned schema migrations keyed on SQLite's PRAGMA user_version.
+When the database is current, startup costs one PRAGMA read; otherwise numbered migrations
+run in order, each committed together with its version bump. Large data moves are chunked
+and committed as they go, so an interrupted upgrade resumes where it stopped.
+"""
+
+import json
+import logging
+import sqlite3
+from typing import Callable, List, Tuple
+
+from .money import to_paise
+from .positions import PositionLedger
+
+logger = logging.getLogger("database")
+
+MIGRATION_CHUNK = 5000
+LEGACY_ACCOUNTS_CHUNK = 50
+
+
+def _create_base_schema(conn: sqlite3.Connection) -> None:
+    """
+    Ensure normalized relational tables exist with WAL mode.
+    A legacy JSON accounts table is renamed to accounts_legacy so its data can be imported later.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL;")
+
+    # Safe Migration Check
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='accounts'")
+    if cursor.fetchone():
+        cursor.execute("PRAGMA table_info(accounts)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if "account" in columns and "balance" not in columns:
+            logger.info("Safe SQL Migration: Migrating legacy JSON accounts table to normalized relational schema...")
+            cursor.execute("ALTER TABLE accounts RENAME TO accounts_legacy")
+
+    # 1. Relational Accounts Table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS accounts (
+            name TEXT PRIMARY KEY,
+            balance_paise INTEGER NOT NULL,
+            strategy TEXT
+        )
+    """)
+
+    # 2. Relational Holdings Table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS holdings (
+            account_name TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (account_name, symbol),
+            FOREIGN KEY (account_name) REFERENCES accounts(name) ON DELETE CASCADE
+        )
+    """)
+
+    # 3. Relational Transactions Table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_name TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            price_paise INTEGER NOT NULL,
+            timestamp TEXT NOT NULL,
+            rationale TEXT,
+            FOREIGN KEY (account_name) REFERENCES accounts(name) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_acc_ts_sym ON transactions (account_name, timestamp, symbol);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_acc_id ON transactions (account_name, id);")
+
+    # 4. Portfolio History Table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS portfolio_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            value_paise INTEGER NOT NULL,
+            FOREIGN KEY (account_name) REFERENCES accounts(name) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_portfolio_history_acc_ts ON portfolio_history (account_name, timestamp);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_history_acc_id ON portfolio_history (account_name, id);")
+
+    # 5. Logs Table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            datetime TEXT,
+            type TEXT,
+            message TEXT
+        )
+    """)
+
+    # 6. Market Cache Table
+    cursor.execute("CREATE TABLE IF NOT EXISTS market (date TEXT PRIMARY KEY, data TEXT)")
+
+
+# (table, legacy TEXT column, INTEGER paise column)
+_MONEY_COLUMNS = [
+    ("accounts", "balance", "balance_paise"),
+    ("transactions", "price", "price_paise"),
+    ("portfolio_history", "portfolio_value", "value_paise"),
+]
+
+
+def _migrate_money_columns(conn: sqlite3.Connection) -> None:
+    """
+    Online migration of TEXT money columns to INTEGER paise.
+    Adds the paise column, backfills it in committed chunks (resumable after interruption),
+    then drops the TEXT column. Unparseable history points are removed, matching how reads
+    already skipped them; unparseable balances and prices are stored as zero and logged.
+    """
+    for table, text_col, paise_col in _MONEY_COLUMNS:
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if text_col not in columns:
+            continue
+        logger.info(f"Safe SQL Migration: Converting {table}.{text_col} to integer paise...")
+        if paise_col not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {paise_col} INTEGER")
+            conn.commit()
+
+        while True:
+            rows = conn.execute(
+                f"SELECT rowid, {text_col} FROM {table} WHERE {paise_col} IS NULL LIMIT ?",
+                (MIGRATION_CHUNK,)
+            ).fetchall()
+            if not rows:
+                break
+            updates, invalid = [], []
+            for rowid, raw in rows:
+                try:
+                    updates.append((to_paise(raw), rowid))
+                except Exception:
+                    invalid.append(rowid)
+            if invalid and table == "portfolio_history":
+                conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", [(rowid,) for rowid in invalid])
+            elif invalid:
+                logger.warning(f"Storing {len(invalid)} unparseable {table}.{text_col} values as zero.")
+                updates.extend((0, rowid) for rowid in invalid)
+            conn.executemany(f"UPDATE {table} SET {paise_col} = ? WHERE rowid = ?", updates)
+            conn.commit()
+
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN {text_col}")
+        conn.commit()
+
+
+# (resolution, timestamp prefix length, suffix that turns the prefix into the bucket start)
+PORTFOLIO_ROLLUP_RESOLUTIONS = [
+    ("minute", 16, ":00"),
+    ("hour", 13, ":00:00"),
+    ("day", 10, " 00:00:00"),
+]
+
+
+def _rollup_bucket_sql(column: str, prefix_len: int, suffix: str) -> str:
+    return f"substr({column}, 1, {prefix_len}) || '{suffix}'"
+
+
+def _rollup_rebuild_sql(resolution: str, prefix_len: int, suffix: str, where: str) -> str:
+    """Recompute OHLC buckets of one resolution from the history rows matched by `where`."""
+    bucket = _rollup_bucket_sql("timestamp", prefix_len, suffix)
+    return f"""
+        INSERT INTO portfolio_rollups (account_name, resolution, bucket, open_ts, open_paise,
+                                       high_paise, low_paise, close_ts, close_paise, points)
+        SELECT g.account_name, '{resolution}', g.bucket, g.open_ts,
+               (SELECT value_paise FROM portfolio_history WHERE account_name = g.account_name AND timestamp = g.open_ts),
+               g.high_paise, g.low_paise, g.close_ts,
+               (SELECT value_paise FROM portfolio_history WHERE account_name = g.account_name AND timestamp = g.close_ts),
+               g.points
+        FROM (
+            SELECT account_name, {bucket} AS bucket, MIN(timestamp) AS open_ts, MAX(timestamp) AS close_ts,
+                   MAX(value_paise) AS high_paise, MIN(value_paise) AS low_paise, COUNT(*) AS points
+            FROM portfolio_history
+            WHERE {where}
+            GROUP BY account_name, bucket
+        ) AS g
+    """
+
+
+def _ensure_portfolio_rollups(conn: sqlite3.Connection) -> None:
+    """
+    Create the per-minute/hour/day OHLC rollups of portfolio_history and the triggers that keep
+    them current. Inserted points are folded into their buckets in O(1); a point rewritten in place
+    rebuilds only its own buckets. Deleting history does not touch rollups, so callers that remove
+    points (account reset) clear the account's rollups themselves. Existing history is backfilled
+    the first time the table is created.
+    """
+    table_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='portfolio_rollups'"
+    ).fetchone()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS portfolio_rollups (
+            account_name TEXT NOT NULL,
+            resolution TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            open_ts TEXT NOT NULL,
+            open_paise INTEGER NOT NULL,
+            high_paise INTEGER NOT NULL,
+            low_paise INTEGER NOT NULL,
+            close_ts TEXT NOT NULL,
+            close_paise INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            PRIMARY KEY (account_name, resolution, bucket)
+        ) WITHOUT ROWID
+    """)
+
+    for resolution, prefix_len, suffix in PORTFOLIO_ROLLUP_RESOLUTIONS:
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_portfolio_rollup_{resolution}_insert
+            AFTER INSERT ON portfolio_history
+            BEGIN
+                INSERT INTO portfolio_rollups (account_name, resolution, bucket, open_ts, open_paise,
+                                               high_paise, low_paise, close_ts, close_paise, points)
+                VALUES (NEW.account_name, '{resolution}', {_rollup_bucket_sql("NEW.timestamp", prefix_len, suffix)},
+                        NEW.timestamp, NEW.value_paise, NEW.value_paise, NEW.value_paise,
+                        NEW.timestamp, NEW.value_paise, 1)
+                ON CONFLICT(account_name, resolution, bucket) DO UPDATE SET
+                    open_paise = CASE WHEN excluded.open_ts < open_ts THEN excluded.open_paise ELSE open_paise END,
+                    open_ts = MIN(open_ts, excluded.open_ts),
+                    high_paise = MAX(high_paise, excluded.high_paise),
+                    low_paise = MIN(low_paise, excluded.low_paise),
+                    close_paise = CASE WHEN excluded.close_ts >= close_ts THEN excluded.close_paise ELSE close_paise END,
+                    close_ts = MAX(close_ts, excluded.close_ts),
+                    points = points + 1;
+            END
+        """)
+        prefix = f"substr(NEW.timestamp, 1, {prefix_len})"
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_portfolio_rollup_{resolution}_update
+            AFTER UPDATE OF value_paise ON portfolio_history
+            BEGIN
+                DELETE FROM portfolio_rollups
+                WHERE account_name = NEW.account_name AND resolution = '{resolution}'
+                  AND bucket = {_rollup_bucket_sql("NEW.timestamp", prefix_len, suffix)};
+                {_rollup_rebuild_sql(resolution, prefix_len, suffix,
+                                     f"account_name = NEW.account_name AND timestamp >= {prefix} AND timestamp < {prefix} || '~'")};
+            END
+        """)
+
+    if not table_exists:
+        for resolution, prefix_len, suffix in PORTFOLIO_ROLLUP_RESOLUTIONS:
+            conn.execute(_rollup_rebuild_sql(resolution, prefix_len, suffix, "1"))
+    conn.commit()
+
+
+def _add_market_fetched_at(conn: sqlite3.Connection) -> None:
+    """Stamp market cache rows with the time they were fetched so readers can apply a TTL."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(market)")]
+    if "fetched_at" not in columns:
+        conn.execute("ALTER TABLE market ADD COLUMN fetched_at REAL")
+
+
+def _import_legacy_accounts(conn: sqlite3.Connection) -> None:
+    """
+    Move accounts out of the legacy JSON table into the relational tables.
+    Accounts are imported LEGACY_ACCOUNTS_CHUNK at a time; each chunk deletes its legacy rows in
+    the same commit, so a restart continues with the accounts that are left. The emptied legacy
+    table is dropped at the end. A malformed row stops the migration and is kept for inspection.
+    """
+    if not conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='accounts_legacy'").fetchone():
+        return
+
+    while True:
+        rows = conn.execute(
+            "SELECT rowid, name, account FROM accounts_legacy ORDER BY rowid LIMIT ?", (LEGACY_ACCOUNTS_CHUNK,)
+        ).fetchall()
+        if not rows:
+            break
+        for rowid, acc_name, json_str in rows:
+            if json_str:
+                _import_legacy_account(conn, acc_name, json.loads(json_str))
+            conn.execute("DELETE FROM accounts_legacy WHERE rowid = ?", (rowid,))
+        conn.commit()
+        logger.info(f"Safe SQL Migration: Imported {len(rows)} legacy accounts...")
+
+    conn.execute("DROP TABLE accounts_legacy")
+    logger.info("Safe SQL Migration completed successfully. Legacy table removed.")
+
+
+def _import_legacy_account(conn: sqlite3.Connection, acc_name: str, data: dict) -> None:
+    clean_name = acc_name.lower().strip()
+    conn.execute("""
+        INSERT INTO accounts (name, balance_paise, strategy)
+        VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET balance_paise=excluded.balance_paise, strategy=excluded.strategy
+    """, (clean_name, to_paise(data.get("balance", "100000.00")), data.get("strategy", "")))
+
+    conn.executemany("""
+        INSERT INTO holdings (account_name, symbol, quantity)
+        VALUES (?, ?, ?)
+        ON CONFLICT(account_name, symbol) DO UPDATE SET quantity=excluded.quantity
+    """, [(clean_name, sym.upper(), qty) for sym, qty in data.get("holdings", {}).items() if qty > 0])
+
+    conn.executemany("""
+        INSERT INTO transactions (account_name, symbol, quantity, price_paise, timestamp, rationale)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(account_name, timestamp, symbol) DO UPDATE SET
+            quantity=excluded.quantity, price_paise=excluded.price_paise, rationale=excluded.rationale
+    """, [(
+        clean_name,
+        t.get("symbol", "").upper(),
+        t.get("quantity", 0),
+        to_paise(t.get("price", "0.0")),
+        t.get("timestamp", ""),
+        t.get("rationale", "")
+    ) for t in data.get("transactions", [])])
+
+    conn.executemany("""
+        INSERT INTO portfolio_history (account_name, timestamp, value_paise)
+        VALUES (?, ?, ?)
+        ON CONFLICT(account_name, timestamp) DO UPDATE SET value_paise=excluded.value_paise
+    """, [
+        (clean_name, str(ts_entry[0]), to_paise(ts_entry[1]))
+        for ts_entry in data.get("portfolio_value_time_series", [])
+        if isinstance(ts_entry, (list, tuple)) and len(ts_entry) == 2
+    ])
+
+
+def _create_positions(conn: sqlite3.Connection) -> None:
+    """
+    Create the per-symbol position ledger and build it by replaying each account's transactions
+    in id order. Every account is committed on its own; accounts that already have positions
+    rows are skipped, so an interrupted backfill resumes with the next account.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS positions (
+            account_name TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            cost_paise INTEGER NOT NULL,
+            realized_paise INTEGER NOT NULL,
+            lots TEXT NOT NULL,
+            PRIMARY KEY (account_name, symbol),
+            FOREIGN KEY (account_name) REFERENCES accounts(name) ON DELETE CASCADE
+        )
+    """)
+    conn.commit()
+
+    pending = conn.execute("""
+        SELECT name FROM accounts
+        WHERE NOT EXISTS (SELECT 1 FROM positions WHERE account_name = accounts.name)
+          AND EXISTS (SELECT 1 FROM transactions WHERE account_name = accounts.name)
+    """).fetchall()
+    for (acc_name,) in pending:
+        ledger = PositionLedger()
+        cursor = conn.execute(
+            "SELECT symbol, quantity, price_paise FROM transactions WHERE account_name = ? ORDER BY id",
+            (acc_name,)
+        )
+        for symbol, quantity, price_paise in cursor:
+            ledger.apply(symbol, quantity, price_paise)
+        conn.executemany("""
+            INSERT INTO positions (account_name, symbol, quantity, cost_paise, realized_paise, lots)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(acc_name, row["symbol"], row["quantity"], row["cost_paise"], row["realized_paise"], row["lots"])
+              for row in ledger.rows()])
+        conn.commit()
+
+
+def _add_account_version(conn: sqlite3.Connection) -> None:
+    """Add accounts.version, bumped on every account write so cached Account objects can detect changes."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(accounts)")]
+    if "version" not in columns:
+        conn.execute("ALTER TABLE accounts ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+
+# Append only: a migration's number is recorded in user_version once it has committed.
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "create relational schema", _create_base_schema),
+    (2, "convert TEXT money columns to integer paise", _migrate_money_columns),
+    (3, "add market.fetched_at", _add_market_fetched_at),
+    (4, "import legacy JSON accounts", _import_legacy_accounts),
+    (5, "create portfolio history rollups", _ensure_portfolio_rollups),
+    (6, "build per-symbol position ledger", _create_positions),
+    (7, "add accounts.version", _add_account_version),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply pending migrations and return the resulting schema version.
+    A failing migration is rolled back and logged; startup continues on the version reached
+    and the migration is retried on the next call.
+    """
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version >= SCHEMA_VERSION:
+        return version
+
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        logger.info(f"Schema migration {number}: {description}...")
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception as exc:
+            conn.rollback()
+            logger.error(f"Schema migration {number} failed: {exc}. It will resume on next startup.", exc_info=True)
+            break
+        version = number
+    return version
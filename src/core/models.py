@@ -1,15 +1,28 @@
 # src/core/models.py
 """Core data models for the trading system with pure async database persistence."""
 
+import functools
 import sys
 import pathlib
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from datetime import datetime
-from typing import Optional, Union, Dict, List, Tuple
+from typing import Any, AsyncIterator, Optional, Union, Dict, List, Tuple
 from decimal import Decimal, ROUND_HALF_UP
 
-from .database import async_write_account, async_read_account, async_write_log
-from .market import get_share_price
+from .database import (
+    ACCOUNT_PAGE_SIZE,
+    async_write_account,
+    async_write_account_delta,
+    async_read_account,
+    async_read_account_version,
+    async_iter_transactions,
+    async_iter_portfolio_history,
+    async_write_log,
+    db_manager,
+)
+from .market import aget_share_price, aget_share_prices, get_share_prices
+from .money import Paise, to_paise, paise_to_decimal, scale_paise
+from .positions import PositionLedger
 from ..utils.formatting import fmt_inr
 
 root_dir = str(pathlib.Path(__file__).parent.parent.parent.resolve())
@@ -23,6 +36,7 @@ except ModuleNotFoundError:
 
 INITIAL_BALANCE = Decimal("100000.00")  # starting balance (₹100,000)
 SPREAD = Decimal("0.002")  # 0.2% spread
+_SPREAD_NUM, _SPREAD_DEN = SPREAD.as_integer_ratio()
 
 
 def quantize_money(val: Union[Decimal, float, str, int]) -> Decimal:
@@ -48,6 +62,22 @@ class Transaction(BaseModel):
         return f"{abs(self.quantity)} shares of {self.symbol} at {fmt_inr(self.price)} each."
 
 
+# Identity map: the live Account instance per name in this process
+_accounts: Dict[str, "Account"] = {}
+
+
+def _evict_on_error(method):
+    """Drop the account from the identity map if a mutating call fails part-way, so the next get() reloads it."""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        except BaseException:
+            self._discard()
+            raise
+    return wrapper
+
+
 class Account(BaseModel):
     """Represents a trader's account with holdings and transaction history"""
     name: str
@@ -58,31 +88,201 @@ class Account(BaseModel):
     portfolio_value_time_series: List[Tuple[str, float]]
     live_balance: Optional[Decimal] = None
 
+    # Delta tracking: what the database already holds as of the last load/save
+    _synced: bool = PrivateAttr(default=False)
+    _reset_pending: bool = PrivateAttr(default=False)
+    _persisted_tx_count: int = PrivateAttr(default=0)
+    _persisted_history_count: int = PrivateAttr(default=0)
+    _persisted_holdings: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    # Lazy loading: stored rows up to these ids are fetched on demand
+    _transactions_loaded: bool = PrivateAttr(default=True)
+    _history_loaded: bool = PrivateAttr(default=True)
+    _last_transaction_id: int = PrivateAttr(default=0)
+    _last_history_id: int = PrivateAttr(default=0)
+
+    # Per-symbol positions; the first _ledger_tx_count transactions are already folded in
+    _positions: PositionLedger = PrivateAttr(default_factory=PositionLedger)
+    _ledger_tx_count: int = PrivateAttr(default=0)
+
+    # accounts.version as of the last load/save
+    _version: int = PrivateAttr(default=0)
+
+    @classmethod
+    async def get(cls, name: str, lazy: bool = False) -> "Account":
+        """
+        Get or create an account asynchronously by name.
+        Accounts are cached per process and writes go through the cached instance, so a repeat
+        call costs one version lookup; the account is reloaded only if it was written elsewhere.
+        With lazy=True only the header and holdings are read; transactions and portfolio
+        history are fetched on demand via load_transactions()/load_history() or the iterators.
+        """
+        key = name.lower()
+        cached = _accounts.get(key)
+        if cached is not None and await async_read_account_version(key) == cached._version:
+            if not lazy:
+                await cached.load_transactions()
+                await cached.load_history()
+            return cached
+
+        account = await cls._load(key, lazy)
+        current = _accounts.get(key)
+        if current is not None and current is not cached and current._version >= account._version:
+            # A concurrent get() loaded it first; keep handing out that instance
+            return current
+        _accounts[key] = account
+        return account
+
     @classmethod
-    async def get(cls, name: str) -> "Account":
-        """Get or create an account asynchronously by name."""
-        fields = await async_read_account(name.lower())
+    async def _load(cls, name: str, lazy: bool) -> "Account":
+        fields = await async_read_account(name, include_transactions=not lazy, include_history=not lazy)
         if not fields:
             fields = {
-                "name": name.lower(),
+                "name": name,
                 "balance": INITIAL_BALANCE,
                 "strategy": "",
                 "holdings": {},
                 "transactions": [],
                 "portfolio_value_time_series": []
             }
-            await async_write_account(name, fields)
+            fields["version"] = await async_write_account(name, fields)
         
         # Populate real Groww wallet balance separately if available without overwriting DB balance
         if groww_client and groww_client.available():
             fields["live_balance"] = Decimal(str(groww_client.get_wallet_balance()))
             
-        return cls(**fields)
-    
+        last_transaction_id = fields.pop("last_transaction_id", 0)
+        last_history_id = fields.pop("last_history_id", 0)
+        positions = fields.pop("positions", [])
+        version = fields.pop("version", 0)
+        account = cls(**fields)
+        account._positions = PositionLedger.from_rows(positions)
+        account._ledger_tx_count = len(account.transactions)
+        account._transactions_loaded = not (lazy and last_transaction_id)
+        account._history_loaded = not (lazy and last_history_id)
+        account._last_transaction_id = last_transaction_id
+        account._last_history_id = last_history_id
+        account._version = version
+        account._mark_persisted()
+        return account
+
+    @classmethod
+    def evict(cls, name: Optional[str] = None) -> None:
+        """Forget the cached instance for `name` (all accounts if None); the next get() reloads it."""
+        if name is None:
+            _accounts.clear()
+        else:
+            _accounts.pop(name.lower(), None)
+
+    def _discard(self) -> None:
+        if _accounts.get(self.name.lower()) is self:
+            del _accounts[self.name.lower()]
+
+    async def load_transactions(self) -> List[Transaction]:
+        """Fetch stored transactions skipped by a lazy load, placing them ahead of newer in-memory ones."""
+        if not self._transactions_loaded:
+            older = [
+                Transaction(**row)
+                async for row in async_iter_transactions(self.name, until_id=self._last_transaction_id)
+            ]
+            self.transactions[0:0] = older
+            self._persisted_tx_count += len(older)
+            self._ledger_tx_count += len(older)
+            self._transactions_loaded = True
+        return self.transactions
+
+    async def load_history(self) -> List[Tuple[str, float]]:
+        """Fetch stored portfolio history skipped by a lazy load, ahead of newer in-memory points."""
+        if not self._history_loaded:
+            older = [
+                (ts, val)
+                async for _, ts, val in async_iter_portfolio_history(self.name, until_id=self._last_history_id)
+            ]
+            self.portfolio_value_time_series[0:0] = older
+            self._persisted_history_count += len(older)
+            self._history_loaded = True
+        return self.portfolio_value_time_series
+
+    async def iter_transactions(self, page_size: int = ACCOUNT_PAGE_SIZE) -> AsyncIterator[Transaction]:
+        """Iterate transactions oldest first, streaming stored pages when they were not loaded."""
+        if not self._transactions_loaded:
+            async for row in async_iter_transactions(self.name, until_id=self._last_transaction_id, page_size=page_size):
+                yield Transaction(**row)
+        for transaction in list(self.transactions):
+            yield transaction
+
+    def _require_transactions(self) -> None:
+        if not self._transactions_loaded:
+            raise RuntimeError(
+                f"Transactions for '{self.name}' were loaded lazily; await load_transactions() first."
+            )
+
+    def _sync_positions(self) -> PositionLedger:
+        """Fold transactions appended since the last call into the position ledger."""
+        for transaction in self.transactions[self._ledger_tx_count:]:
+            self._positions.apply(transaction.symbol, transaction.quantity, to_paise(transaction.price))
+        self._ledger_tx_count = len(self.transactions)
+        return self._positions
+
+    def _mark_persisted(self) -> None:
+        """Record the current state as the database baseline for delta tracking."""
+        self._synced = True
+        self._reset_pending = False
+        self._persisted_tx_count = len(self.transactions)
+        self._persisted_history_count = len(self.portfolio_value_time_series)
+        self._persisted_holdings = dict(self.holdings)
+        self._positions.mark_clean()
+
+    def pending_changes(self) -> Dict[str, Any]:
+        """Collect the header, holdings, positions, transactions and history points changed since the last load/save."""
+        positions = self._sync_positions()
+        holdings_upsert = {
+            sym: qty for sym, qty in self.holdings.items()
+            if qty > 0 and self._persisted_holdings.get(sym) != qty
+        }
+        holdings_delete = [
+            sym for sym in self._persisted_holdings
+            if self.holdings.get(sym, 0) <= 0
+        ]
+        return {
+            "balance": str(self.balance),
+            "strategy": self.strategy,
+            "holdings_upsert": holdings_upsert,
+            "holdings_delete": holdings_delete,
+            "positions_upsert": positions.dirty_rows(),
+            "transactions": [
+                t.model_dump(mode="json") for t in self.transactions[self._persisted_tx_count:]
+            ],
+            "portfolio_value_time_series": [
+                list(point) for point in self.portfolio_value_time_series[self._persisted_history_count:]
+            ],
+            "reset": self._reset_pending,
+        }
+
+    @_evict_on_error
     async def save(self) -> None:
-        """Persist account asynchronously to database."""
-        await async_write_account(self.name.lower(), self.model_dump(mode="json"))
+        """Persist account asynchronously, writing only the rows changed since the last load/save."""
+        truncated = (
+            len(self.transactions) < self._persisted_tx_count
+            or len(self.portfolio_value_time_series) < self._persisted_history_count
+        )
+        if not self._synced or (truncated and not self._reset_pending):
+            if truncated:
+                # Transactions were rewritten in place, so the ledger is rebuilt from what remains
+                self._positions = PositionLedger()
+                self._ledger_tx_count = 0
+            data = self.model_dump(mode="json")
+            data["positions"] = self._sync_positions().rows()
+            version = await async_write_account(self.name.lower(), data)
+        else:
+            version = await async_write_account_delta(self.name.lower(), self.pending_changes())
+        if version != self._version + 1:
+            # Another process wrote in between; reload its changes on the next get()
+            self._discard()
+        self._version = version
+        self._mark_persisted()
 
+    @_evict_on_error
     async def reset(self, strategy: str) -> None:
         """Reset account asynchronously to initial state with new strategy."""
         self.balance = INITIAL_BALANCE
@@ -90,8 +290,18 @@ class Account(BaseModel):
         self.holdings = {}
         self.transactions = []
         self.portfolio_value_time_series = []
+        self._reset_pending = True
+        self._persisted_tx_count = 0
+        self._persisted_history_count = 0
+        self._transactions_loaded = True
+        self._history_loaded = True
+        self._last_transaction_id = 0
+        self._last_history_id = 0
+        self._positions = PositionLedger()
+        self._ledger_tx_count = 0
         await self.save()
 
+    @_evict_on_error
     async def deposit(self, amount: Union[Decimal, float, str, int]) -> None:
         """Deposit funds into the account asynchronously."""
         dec_amount = quantize_money(amount)
@@ -100,9 +310,11 @@ class Account(BaseModel):
         self.balance = quantize_money(self.balance + dec_amount)
         msg = f"Deposited {fmt_inr(dec_amount)}. New balance: {fmt_inr(self.balance)}"
         print(msg)
-        await async_write_log(self.name, "account", msg)
-        await self.save()
+        async with db_manager.transaction():
+            await async_write_log(self.name, "account", msg)
+            await self.save()
 
+    @_evict_on_error
     async def withdraw(self, amount: Union[Decimal, float, str, int]) -> None:
         """Withdraw funds asynchronously from the account."""
         dec_amount = quantize_money(amount)
@@ -111,22 +323,26 @@ class Account(BaseModel):
         self.balance = quantize_money(self.balance - dec_amount)
         msg = f"Withdrew {fmt_inr(dec_amount)}. New balance: {fmt_inr(self.balance)}"
         print(msg)
-        await async_write_log(self.name, "account", msg)
-        await self.save()
+        async with db_manager.transaction():
+            await async_write_log(self.name, "account", msg)
+            await self.save()
 
+    @_evict_on_error
     async def buy_shares(self, symbol: str, quantity: int, rationale: str) -> str:
         """Buy shares of a stock asynchronously if sufficient funds are available."""
         if quantity <= 0:
             raise ValueError("Quantity must be positive.")
-        raw_price = get_share_price(symbol)
+        raw_price = await aget_share_price(symbol)
         if raw_price == 0:
             raise ValueError(f"Unrecognized symbol {symbol}")
-        price = quantize_money(raw_price)
-        buy_price = quantize_money(price * (Decimal("1") + SPREAD))
-        total_cost = quantize_money(buy_price * Decimal(quantity))
+        buy_price_paise = scale_paise(to_paise(raw_price), _SPREAD_DEN + _SPREAD_NUM, _SPREAD_DEN)
+        total_cost_paise = buy_price_paise * quantity
+        balance_paise = to_paise(self.balance)
         
-        if total_cost > self.balance:
+        if total_cost_paise > balance_paise:
             raise ValueError("Insufficient funds to buy shares.")
+        buy_price = paise_to_decimal(buy_price_paise)
+        total_cost = paise_to_decimal(total_cost_paise)
         
         self.holdings[symbol] = self.holdings.get(symbol, 0) + quantity
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -138,11 +354,14 @@ class Account(BaseModel):
             rationale=rationale
         )
         self.transactions.append(transaction)
-        self.balance = quantize_money(self.balance - total_cost)
-        await self.save()
-        await async_write_log(self.name, "account", f"Bought {quantity} of {symbol} @ {fmt_inr(buy_price)} for {fmt_inr(total_cost)}")
-        return "Completed. Latest details:\n" + await self.report()
+        self.balance = paise_to_decimal(balance_paise - total_cost_paise)
+        portfolio_value = await self._value_for_report()
+        async with db_manager.transaction():
+            await async_write_log(self.name, "account", f"Bought {quantity} of {symbol} @ {fmt_inr(buy_price)} for {fmt_inr(total_cost)}")
+            details = await self._record_report(portfolio_value)
+        return "Completed. Latest details:\n" + details
 
+    @_evict_on_error
     async def sell_shares(self, symbol: str, quantity: int, rationale: str) -> str:
         """Sell shares of a stock asynchronously if enough shares are held."""
         if quantity <= 0:
@@ -151,10 +370,11 @@ class Account(BaseModel):
         if holding_qty < quantity:
             raise ValueError(f"Cannot sell {quantity} shares of {symbol}. Not enough shares held.")
         
-        raw_price = get_share_price(symbol)
-        price = quantize_money(raw_price)
-        sell_price = quantize_money(price * (Decimal("1") - SPREAD))
-        total_proceeds = quantize_money(sell_price * Decimal(quantity))
+        raw_price = await aget_share_price(symbol)
+        sell_price_paise = scale_paise(to_paise(raw_price), _SPREAD_DEN - _SPREAD_NUM, _SPREAD_DEN)
+        total_proceeds_paise = sell_price_paise * quantity
+        sell_price = paise_to_decimal(sell_price_paise)
+        total_proceeds = paise_to_decimal(total_proceeds_paise)
         
         self.holdings[symbol] = holding_qty - quantity
         if self.holdings[symbol] == 0:
@@ -169,30 +389,65 @@ class Account(BaseModel):
         )
         self.transactions.append(transaction)
 
-        self.balance = quantize_money(self.balance + total_proceeds)
-        await self.save()
-        await async_write_log(self.name, "account", f"Sold {quantity} of {symbol} @ {fmt_inr(sell_price)} for {fmt_inr(total_proceeds)}")
-        return "Completed. Latest details:\n" + await self.report()
+        self.balance = paise_to_decimal(to_paise(self.balance) + total_proceeds_paise)
+        portfolio_value = await self._value_for_report()
+        async with db_manager.transaction():
+            await async_write_log(self.name, "account", f"Sold {quantity} of {symbol} @ {fmt_inr(sell_price)} for {fmt_inr(total_proceeds)}")
+            details = await self._record_report(portfolio_value)
+        return "Completed. Latest details:\n" + details
+
+    def calculate_portfolio_value(self, allow_stale: bool = False) -> Decimal:
+        """
+        Calculate the total value of the user's portfolio with one batched quote lookup.
+        Display-only callers may pass allow_stale to accept recently expired cached quotes.
+        """
+        prices = get_share_prices(list(self.holdings), allow_stale=allow_stale) if self.holdings else {}
+        return self._portfolio_value_at(prices)
+
+    async def acalculate_portfolio_value(self) -> Decimal:
+        """calculate_portfolio_value() without blocking the event loop on quote lookups."""
+        prices = await aget_share_prices(list(self.holdings)) if self.holdings else {}
+        return self._portfolio_value_at(prices)
 
-    def calculate_portfolio_value(self) -> Decimal:
-        """Calculate the total value of the user's portfolio."""
-        total_value = self.balance
+    def _portfolio_value_at(self, prices: Dict[str, float]) -> Decimal:
+        total_paise = to_paise(self.balance)
         for symbol, quantity in self.holdings.items():
-            stock_price = quantize_money(get_share_price(symbol))
-            total_value += stock_price * Decimal(quantity)
-        return quantize_money(total_value)
+            total_paise += to_paise(prices[symbol]) * quantity
+        return paise_to_decimal(total_paise)
 
-    def calculate_profit_loss(self, portfolio_value: Decimal) -> Decimal:
+    def net_invested_paise(self) -> Paise:
+        """Buys minus sales proceeds in paise, read from the position ledger's running totals."""
+        return Paise(self._sync_positions().net_invested_paise)
+
+    def calculate_profit_loss(self, portfolio_value: Union[Decimal, float]) -> Decimal:
         """Calculate profit or loss from the initial spend."""
-        initial_spend = sum((t.price * Decimal(t.quantity)) for t in self.transactions if t.quantity > 0)
-        sales_proceeds = sum((-t.price * Decimal(t.quantity)) for t in self.transactions if t.quantity < 0)
-        net_spent = initial_spend - sales_proceeds
-        return quantize_money(portfolio_value - net_spent)
+        return paise_to_decimal(to_paise(portfolio_value) - self.net_invested_paise())
 
     def get_holdings(self) -> dict[str, int]:
         """Report current holdings."""
         return self.holdings
 
+    def get_positions(self, prices: Optional[Dict[str, Union[Decimal, float]]] = None) -> List[Dict[str, Any]]:
+        """
+        Per-symbol breakdown from the position ledger: open quantity, average and total FIFO cost,
+        realized P&L and, for symbols with a price in `prices`, market value and unrealized P&L.
+        """
+        breakdown = []
+        for symbol, position in sorted(self._sync_positions().positions.items()):
+            row = {
+                "symbol": symbol,
+                "quantity": position.quantity,
+                "average_cost": paise_to_decimal(position.average_cost_paise),
+                "cost_basis": paise_to_decimal(position.cost_paise),
+                "realized_pnl": paise_to_decimal(position.realized_paise),
+            }
+            if prices and symbol in prices:
+                price_paise = to_paise(prices[symbol])
+                row["market_value"] = paise_to_decimal(position.quantity * price_paise)
+                row["unrealized_pnl"] = paise_to_decimal(position.unrealized_paise(price_paise))
+            breakdown.append(row)
+        return breakdown
+
     def get_profit_loss(self) -> float:
         """Report current profit/loss as float."""
         pv = self.calculate_portfolio_value()
@@ -200,12 +455,18 @@ class Account(BaseModel):
 
     def list_transactions(self) -> list[dict]:
         """List all transactions as dicts."""
+        self._require_transactions()
         return [transaction.model_dump(mode="json") for transaction in self.transactions]
     
-    async def report(self) -> str:
-        """Return a json string representing the account asynchronously."""
+    async def _value_for_report(self) -> Decimal:
+        """Load everything a report needs and value the portfolio before any write is leased."""
+        await self.load_transactions()
+        await self.load_history()
+        return await self.acalculate_portfolio_value()
+
+    async def _record_report(self, portfolio_value: Decimal) -> str:
+        """Append a history point, persist the account and log the report in the caller's unit of work."""
         import json
-        portfolio_value = self.calculate_portfolio_value()
         pv_float = float(portfolio_value)
         self.portfolio_value_time_series.append((datetime.now().strftime("%Y-%m-%d %H:%M:%S"), pv_float))
         await self.save()
@@ -215,15 +476,24 @@ class Account(BaseModel):
         data["total_profit_loss"] = float(pnl)
         await async_write_log(self.name, "account", f"Retrieved account details: {fmt_inr(portfolio_value)} / P&L {fmt_inr(pnl)}")
         return json.dumps(data)
+
+    @_evict_on_error
+    async def report(self) -> str:
+        """Return a json string representing the account asynchronously."""
+        portfolio_value = await self._value_for_report()
+        async with db_manager.transaction():
+            return await self._record_report(portfolio_value)
     
     async def get_strategy(self) -> str:
         """Return account strategy asynchronously."""
         await async_write_log(self.name, "account", "Retrieved strategy")
         return self.strategy
     
+    @_evict_on_error
     async def change_strategy(self, strategy: str) -> str:
         """Change investment strategy asynchronously."""
         self.strategy = strategy
-        await self.save()
-        await async_write_log(self.name, "account", "Changed strategy")
+        async with db_manager.transaction():
+            await self.save()
+            await async_write_log(self.name, "account", "Changed strategy")
         return "Changed strategy"
@@ -0,0 +1,65 @@
+# src/core/money.py
+"""Integer fixed-point money: amounts are held as paise (₹1 == 100 paise) with ROUND_HALF_UP conversion."""
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import NewType, Union
+
+Paise = NewType("Paise", int)
+
+PAISE_PER_RUPEE = 100
+_DIGITS = frozenset("0123456789")
+
+
+def to_paise(val: Union[Decimal, float, str, int]) -> Paise:
+    """
+    Convert a rupee amount to integer paise, rounding half away from zero exactly like
+    quantize_money. Plain decimal strings and floats are converted without building Decimals.
+    """
+    if isinstance(val, bool):
+        raise TypeError("Boolean is not a money amount.")
+    if isinstance(val, int):
+        return Paise(val * PAISE_PER_RUPEE)
+    text = repr(val) if isinstance(val, float) else val
+    if isinstance(text, str):
+        paise = _parse_decimal_str(text)
+        if paise is not None:
+            return paise
+        val = Decimal(text.strip())
+    if not isinstance(val, Decimal):
+        val = Decimal(str(val))
+    if not val.is_finite():
+        raise ValueError(f"Cannot convert non-finite amount {val!r} to paise.")
+    return Paise(int((val * PAISE_PER_RUPEE).quantize(Decimal("1"), rounding=ROUND_HALF_UP)))
+
+
+def _parse_decimal_str(text: str) -> Union[Paise, None]:
+    """Fast path for strings like '-1234.505'; returns None for anything else (exponents, inf, etc.)."""
+    s = text.strip()
+    sign = 1
+    if s[:1] in ("-", "+"):
+        sign = -1 if s[0] == "-" else 1
+        s = s[1:]
+    whole, _, frac = s.partition(".")
+    if not (whole or frac) or not set(whole) <= _DIGITS or not set(frac) <= _DIGITS:
+        return None
+    paise = int(whole or "0") * PAISE_PER_RUPEE + int(frac[:2].ljust(2, "0"))
+    if len(frac) > 2 and frac[2] >= "5":
+        paise += 1
+    return Paise(sign * paise)
+
+
+def paise_to_decimal(paise: int) -> Decimal:
+    """Convert integer paise back to a 2-decimal-place rupee Decimal for the API boundary."""
+    return Decimal(paise).scaleb(-2)
+
+
+def paise_to_float(paise: int) -> float:
+    """Convert integer paise to a rupee float for charts and JSON payloads."""
+    return paise / PAISE_PER_RUPEE
+
+
+def scale_paise(paise: int, numerator: int, denominator: int) -> Paise:
+    """Multiply paise by numerator/denominator, rounding half away from zero without Decimals."""
+    sign = -1 if (paise < 0) != (numerator < 0) else 1
+    scaled = (2 * abs(paise) * abs(numerator) + denominator) // (2 * denominator)
+    return Paise(sign * scaled)
@@ -0,0 +1,120 @@
+# src/core/positions.py
+"""
+Incremental per-symbol position ledger.
+Each trade updates quantity, FIFO cost basis and realized P&L of its symbol in O(1) amortized
+time, and the ledger keeps running totals so account-level P&L needs no pass over transactions.
+All amounts are integer paise.
+"""
+
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Set
+
+
+@dataclass
+class Position:
+    """Open quantity, FIFO lots and realized P&L for one symbol."""
+    symbol: str
+    quantity: int = 0
+    cost_paise: int = 0
+    realized_paise: int = 0
+    # Open buy lots, oldest first, as [quantity, price_paise]
+    lots: Deque[List[int]] = field(default_factory=deque)
+
+    @property
+    def average_cost_paise(self) -> int:
+        """Average cost of the open quantity, rounded half up."""
+        if self.quantity <= 0:
+            return 0
+        return (2 * self.cost_paise + self.quantity) // (2 * self.quantity)
+
+    def unrealized_paise(self, price_paise: int) -> int:
+        return self.quantity * price_paise - self.cost_paise
+
+    def apply(self, quantity: int, price_paise: int) -> None:
+        """Fold one trade into the position: buys open a lot, sells consume lots oldest first."""
+        self.quantity += quantity
+        if quantity > 0:
+            self.lots.append([quantity, price_paise])
+            self.cost_paise += quantity * price_paise
+            return
+
+        remaining = -quantity
+        released = 0
+        while remaining and self.lots:
+            lot = self.lots[0]
+            take = min(remaining, lot[0])
+            released += take * lot[1]
+            lot[0] -= take
+            remaining -= take
+            if not lot[0]:
+                self.lots.popleft()
+        # Shares sold beyond the recorded lots carry no cost basis
+        self.cost_paise -= released
+        self.realized_paise += -quantity * price_paise - released
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "quantity": self.quantity,
+            "cost_paise": self.cost_paise,
+            "realized_paise": self.realized_paise,
+            "lots": json.dumps([list(lot) for lot in self.lots]),
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Position":
+        return cls(
+            symbol=row["symbol"],
+            quantity=row["quantity"],
+            cost_paise=row["cost_paise"],
+            realized_paise=row["realized_paise"],
+            lots=deque(json.loads(row["lots"] or "[]")),
+        )
+
+
+class PositionLedger:
+    """
+    Positions keyed by symbol with running totals of open cost and realized P&L.
+    Symbols touched since the last persist are tracked so only their rows are written.
+    """
+
+    def __init__(self, positions: Iterable[Position] = ()):
+        self.positions: Dict[str, Position] = {}
+        self.total_cost_paise = 0
+        self.total_realized_paise = 0
+        self._dirty: Set[str] = set()
+        for position in positions:
+            self.positions[position.symbol] = position
+            self.total_cost_paise += position.cost_paise
+            self.total_realized_paise += position.realized_paise
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "PositionLedger":
+        return cls(Position.from_row(row) for row in rows)
+
+    def apply(self, symbol: str, quantity: int, price_paise: int) -> Position:
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = Position(symbol)
+        cost_before, realized_before = position.cost_paise, position.realized_paise
+        position.apply(quantity, price_paise)
+        self.total_cost_paise += position.cost_paise - cost_before
+        self.total_realized_paise += position.realized_paise - realized_before
+        self._dirty.add(symbol)
+        return position
+
+    @property
+    def net_invested_paise(self) -> int:
+        """Buys minus sales proceeds: open cost less realized P&L."""
+        return self.total_cost_paise - self.total_realized_paise
+
+    def dirty_rows(self) -> List[Dict[str, Any]]:
+        return [self.positions[symbol].to_row() for symbol in sorted(self._dirty)]
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return [position.to_row() for position in self.positions.values()]
+
+    def mark_clean(self) -> None:
+        self._dirty.clear()
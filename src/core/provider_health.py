@@ -0,0 +1,166 @@
+# src/core/provider_health.py
+"""
+Rolling health statistics and circuit breakers for market data providers.
+Every provider call records its outcome and latency. A provider that keeps failing is skipped
+(circuit open) until a cooldown passes, after which a single probe call decides whether it
+is closed again or stays open. Latency is kept per exchange so routing can prefer the
+fastest healthy provider for the instrument being priced.
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+PROVIDER_HEALTH_WINDOW = int(os.getenv("PROVIDER_HEALTH_WINDOW", "50"))
+# Consecutive failures that open the circuit
+PROVIDER_FAILURE_THRESHOLD = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "3"))
+# Seconds an open circuit waits before letting one probe call through
+PROVIDER_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_COOLDOWN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Outcome window, per-exchange latencies and circuit state for one provider."""
+
+    def __init__(self, name: str, window: int = PROVIDER_HEALTH_WINDOW,
+                 failure_threshold: int = PROVIDER_FAILURE_THRESHOLD,
+                 cooldown: float = PROVIDER_COOLDOWN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._window = window
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.trips = 0
+
+    def _state_at(self, now: float) -> str:
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            return HALF_OPEN
+        return self.state
+
+    def available(self, now: Optional[float] = None) -> bool:
+        """True unless the circuit is open or a half-open probe is already running."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state_at(now)
+            return state == CLOSED or (state == HALF_OPEN and now - self.probe_started >= self.cooldown)
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Like available(), but claims the probe slot when half-open; call right before the request."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state_at(now)
+            if state == CLOSED:
+                return True
+            # A probe that never reported back (e.g. cancelled) frees the slot after another cooldown
+            if state == HALF_OPEN and now - self.probe_started >= self.cooldown:
+                self.state = HALF_OPEN
+                self.probe_started = now
+                return True
+            return False
+
+    def record(self, success: bool, latency: float, exchanges: Iterable[str] = ("*",),
+               now: Optional[float] = None) -> None:
+        """Record one call; a successful batch adds its latency to every exchange it covered."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.calls += 1
+            self._outcomes.append(success)
+            if success:
+                for exchange in exchanges:
+                    self._latencies.setdefault(exchange, deque(maxlen=self._window)).append(latency)
+                self.consecutive_failures = 0
+                self.state = CLOSED
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.trips += 1
+                self.state = OPEN
+                self.opened_at = now
+                self.probe_started = 0.0
+
+    def latency(self, exchange: Optional[str] = None) -> Optional[float]:
+        """Median successful-call latency in seconds for `exchange` (all exchanges if None)."""
+        with self._lock:
+            if exchange is not None:
+                samples = list(self._latencies.get(exchange, ()))
+            else:
+                samples = [s for window in self._latencies.values() for s in window]
+        return statistics.median(samples) if samples else None
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        with self._lock:
+            return sum(self._outcomes) / len(self._outcomes) if self._outcomes else None
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state_at(now)
+        latency = self.latency()
+        return {
+            "provider": self.name,
+            "state": state,
+            "success_rate": self.success_rate,
+            "latency_ms": None if latency is None else round(latency * 1000, 1),
+            "latency_ms_by_exchange": {
+                exchange: round(self.latency(exchange) * 1000, 1) for exchange in sorted(self._latencies)
+            },
+            "calls": self.calls,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+        }
+
+
+class ProviderHealthRegistry:
+    """ProviderHealth per provider instance, created on first use."""
+
+    def __init__(self):
+        self._health: "WeakKeyDictionary[Any, ProviderHealth]" = WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, provider: Any) -> ProviderHealth:
+        health = self._health.get(provider)
+        if health is None:
+            with self._lock:
+                health = self._health.get(provider)
+                if health is None:
+                    health = self._health[provider] = ProviderHealth(type(provider).__name__)
+        return health
+
+    def rank(self, providers: Iterable[Any], exchange: Optional[str] = None) -> List[Any]:
+        """
+        Available providers, fastest first by median latency on `exchange`. Providers without
+        latency samples sort first so they get measured; ties keep the given order.
+        """
+        now = time.time()
+        ranked: List[Tuple[float, int, Any]] = []
+        for position, provider in enumerate(providers):
+            health = self.get(provider)
+            if not health.available(now):
+                continue
+            latency = health.latency(exchange)
+            ranked.append((0.0 if latency is None else latency, position, provider))
+        ranked.sort(key=lambda item: (item[0], item[1]))
+        return [provider for _, _, provider in ranked]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._health = WeakKeyDictionary()
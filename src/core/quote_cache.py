@@ -0,0 +1,146 @@
+# src/core/quote_cache.py
+"""
+Bounded in-process quote cache (the L1 tier in front of the shared SQLite market cache).
+LRU eviction caps memory, entries past their TTL can still be served to callers that accept
+stale prices while one background refresh runs, and concurrent misses for a key are coalesced
+so they share a single provider fetch (singleflight), from threads and coroutines alike.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class QuoteCache:
+    """Thread-safe LRU of key -> (fetched_at epoch seconds, price) with TTL and stale window."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 5.0, stale_ttl: float = 30.0):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: Dict[str, threading.Event] = {}
+        self._async_flights: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._revalidating: Set[str] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.revalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: Optional[float] = None, allow_stale: bool = False) -> Optional[Tuple[float, bool]]:
+        """
+        Return (price, fresh) for a usable entry, else None. Fresh entries are younger than ttl;
+        with allow_stale, entries up to ttl + stale_ttl old are returned with fresh=False.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age <= self.ttl or (allow_stale and age <= self.ttl + self.stale_ttl):
+                    self._entries.move_to_end(key)
+                    fresh = age <= self.ttl
+                    if fresh:
+                        self.hits += 1
+                    else:
+                        self.stale_hits += 1
+                    return entry[1], fresh
+            self.misses += 1
+            return None
+
+    def put(self, key: str, price: float, fetched_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() if fetched_at is None else fetched_at, price)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ---- singleflight for threads ----
+
+    def claim(self, keys: Iterable[str]) -> Tuple[List[str], List[threading.Event]]:
+        """
+        Split keys into those this caller must fetch (now marked in flight) and events of
+        fetches already running elsewhere; pass the former to release() when done.
+        """
+        leading, following = [], []
+        with self._lock:
+            for key in keys:
+                event = self._flights.get(key)
+                if event is None:
+                    self._flights[key] = threading.Event()
+                    leading.append(key)
+                else:
+                    self.coalesced += 1
+                    following.append(event)
+        return leading, following
+
+    def release(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                event = self._flights.pop(key, None)
+                if event is not None:
+                    event.set()
+
+    # ---- singleflight for coroutines ----
+
+    async def coalesce(self, key: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Await the fetch already running for `key` on this loop, or start it. Shielded so one
+        cancelled caller does not cancel the fetch the others are waiting on."""
+        loop = asyncio.get_running_loop()
+        flight = self._async_flights.get(key)
+        if flight is not None and flight[0] is loop and not flight[1].done():
+            self.coalesced += 1
+            return await asyncio.shield(flight[1])
+
+        task = loop.create_task(fetch())
+        self._async_flights[key] = (loop, task)
+
+        def _forget(done: asyncio.Future) -> None:
+            if self._async_flights.get(key, (None, None))[1] is done:
+                del self._async_flights[key]
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    # ---- stale-while-revalidate bookkeeping ----
+
+    def begin_revalidate(self, key: str) -> bool:
+        """True if the caller should refresh `key`; False while another refresh is running."""
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            self.revalidations += 1
+            return True
+
+    def end_revalidate(self, key: str) -> None:
+        with self._lock:
+            self._revalidating.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "revalidations": self.revalidations,
+        }
@@ -4,11 +4,11 @@ MCP server providing INDmoney / INDstocks chart data and wallet balance tools.
 """
 
 from mcp.server.fastmcp import FastMCP
-from src.utils.indmoney_client import INDmoneyClient
+from src.utils.indmoney_client import get_indmoney_client
 
 # Initialize INDmoney MCP server
 mcp = FastMCP("indmoney")
-client = INDmoneyClient()
+client = get_indmoney_client()
 
 
 @mcp.tool()
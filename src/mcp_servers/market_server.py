@@ -1,6 +1,6 @@
 # src/mcp_servers/market_server.py
 from mcp.server.fastmcp import FastMCP
-from src.core.market import get_share_price
+from src.core.market import aget_share_price
 
 mcp = FastMCP("market_server")
 
@@ -11,7 +11,7 @@ async def lookup_share_price(symbol: str) -> float:
     Args:
         symbol: the symbol of the stock
     """
-    return get_share_price(symbol)
+    return await aget_share_price(symbol)
 
 if __name__ == "__main__":
     mcp.run(transport='stdio')
\ No newline at end of file
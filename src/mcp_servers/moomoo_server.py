@@ -4,11 +4,11 @@ MCP server providing Moomoo API Skills tools for AI trading agents.
 """
 
 from mcp.server.fastmcp import FastMCP
-from src.utils.moomoo_client import MoomooClient
+from src.utils.moomoo_client import get_moomoo_client
 
 # Initialize Moomoo MCP server
 mcp = FastMCP("moomoo")
-client = MoomooClient()
+client = get_moomoo_client()
 
 
 @mcp.tool()
@@ -9,11 +9,11 @@ extract live article text, and analyze real-time market sentiment directly from
 
 import urllib.parse
 from mcp.server.fastmcp import FastMCP
-from src.utils.pinchtab_client import PinchtabClient
+from src.utils.pinchtab_client import get_pinchtab_client
 
 # Initialize PinchTab MCP server
 mcp = FastMCP("pinchtab")
-client = PinchtabClient()
+client = get_pinchtab_client()
 
 
 @mcp.tool()
@@ -1,9 +1,9 @@
 # src/mcp_servers/push_server.py
 import os
 from dotenv import load_dotenv
-import requests
 from pydantic import BaseModel, Field
 from mcp.server.fastmcp import FastMCP
+from src.utils.http import get_session
 
 load_dotenv(override=True)
 
@@ -24,7 +24,7 @@ def push(args: PushModelArgs):
     """Send a push notification with this brief message"""
     print(f"Push: {args.message}")
     payload = {"user": pushover_user, "token": pushover_token, "message": args.message}
-    requests.post(pushover_url, data=payload)
+    get_session("pushover").post(pushover_url, data=payload, timeout=10)
     return "Push notification sent"
 
 
@@ -5,11 +5,11 @@ No third-party search API keys (like Brave) required!
 """
 
 from mcp.server.fastmcp import FastMCP
-from src.utils.pinchtab_client import PinchtabClient
+from src.utils.pinchtab_client import get_pinchtab_client
 
 # Initialize MCP server
 mcp = FastMCP("researcher")
-pinchtab = PinchtabClient()
+pinchtab = get_pinchtab_client()
 
 
 @mcp.tool()
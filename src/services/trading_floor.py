@@ -7,26 +7,43 @@ warnings.filterwarnings("ignore", message=".*HTTP_422_UNPROCESSABLE_ENTITY.*")
 
 import asyncio
 import logging
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
 from ..trading_agents.trader import Trader
 from ..utils.tracers import LogTracer
 from ..utils.config import settings, TRADER_CONFIGS
 from ..core.database import setup_database
+from ..core.market_feed import start_market_feed
 from agents import add_trace_processor
 
 try:
-    from ..core.market import is_market_open as _is_market_open
+    from ..core.market import is_market_open as _is_market_open, next_market_open as _next_market_open
 except Exception:
-    def _is_market_open() -> bool:
+    def _is_market_open(now_utc=None) -> bool:
         return True
 
+    def _next_market_open(now_utc=None) -> datetime:
+        return now_utc or datetime.now(tz=timezone.utc)
+
 logger = logging.getLogger("trading_floor")
 
 RUN_EVERY_N_MINUTES = settings.run_every_n_minutes
 RUN_EVEN_WHEN_MARKET_IS_CLOSED = settings.run_even_when_market_is_closed
 
 
+def seconds_until_next_run(now: Optional[datetime] = None) -> float:
+    """
+    Seconds until the next scheduled round: one interval from now, pushed back to the next
+    session open when the market will be closed by then (nights, weekends, holidays).
+    """
+    now = now or datetime.now(tz=timezone.utc)
+    wake = now + timedelta(minutes=RUN_EVERY_N_MINUTES)
+    if not RUN_EVEN_WHEN_MARKET_IS_CLOSED and not _is_market_open(wake):
+        wake = max(wake, _next_market_open(wake))
+    return (wake - now).total_seconds()
+
+
 def create_traders() -> List[Trader]:
     """Create trader instances from central TRADER_CONFIGS registry."""
     return [Trader(cfg) for cfg in TRADER_CONFIGS]
@@ -37,15 +54,19 @@ async def run_every_n_minutes():
     await setup_database()
     add_trace_processor(LogTracer())
     traders = create_traders()
+    feed = start_market_feed(settings.market_feed_watchlist_symbols()) if settings.use_market_feed else None
     while True:
+        if feed is not None:
+            # Trades from the previous round may have opened positions the feed is not covering yet
+            feed.refresh_subscriptions()
         if RUN_EVEN_WHEN_MARKET_IS_CLOSED or _is_market_open():
             results = await asyncio.gather(*[trader.run() for trader in traders], return_exceptions=True)
             for trader, res in zip(traders, results):
                 if isinstance(res, Exception):
                     logger.error(f"Trader '{trader.name}' encountered an isolated execution error: {res}", exc_info=res)
         else:
-            print("Market is closed, skipping run")
-        await asyncio.sleep(RUN_EVERY_N_MINUTES * 60)
+            print(f"Market is closed, skipping run (next session opens {_next_market_open():%Y-%m-%d %H:%M %Z})")
+        await asyncio.sleep(seconds_until_next_run())
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ from .templates import (
 from .mcp_config import trader_mcp_server_params, researcher_mcp_server_params
 from ..utils.tracers import make_trace_id
 from ..core.models import Account
+from ..core.executor import order_executor
 from ..utils.config import settings, TraderConfig
 
 load_dotenv(override=True)
@@ -35,36 +36,33 @@ openrouter_client = AsyncOpenAI(
 @function_tool
 async def get_balance(name: str) -> float:
     """Get current account cash balance."""
-    account = await Account.get(name.lower())
+    account = await Account.get(name.lower(), lazy=True)
     return float(account.balance)
 
 
 @function_tool
 async def get_holdings(name: str) -> dict:
     """Get current stock holdings for the account."""
-    account = await Account.get(name.lower())
+    account = await Account.get(name.lower(), lazy=True)
     return account.holdings
 
 
 @function_tool
 async def buy_shares(name: str, symbol: str, quantity: int, rationale: str) -> str:
     """Buy shares of a stock for the account."""
-    account = await Account.get(name.lower())
-    return await account.buy_shares(symbol, quantity, rationale)
+    return await order_executor.buy(name, symbol, quantity, rationale)
 
 
 @function_tool
 async def sell_shares(name: str, symbol: str, quantity: int, rationale: str) -> str:
     """Sell shares of a stock from the account."""
-    account = await Account.get(name.lower())
-    return await account.sell_shares(symbol, quantity, rationale)
+    return await order_executor.sell(name, symbol, quantity, rationale)
 
 
 @function_tool
 async def change_strategy(name: str, strategy: str) -> str:
     """Change investment strategy for the account."""
-    account = await Account.get(name.lower())
-    return await account.change_strategy(strategy)
+    return await order_executor.submit(name, lambda account: account.change_strategy(strategy))
 
 
 ACCOUNT_TOOLS = [get_balance, get_holdings, buy_shares, sell_shares, change_strategy]
@@ -133,7 +131,7 @@ class Trader:
 
     async def get_strategy(self) -> str:
         """Get strategy directly from Account model."""
-        account = await Account.get(self.name.lower())
+        account = await Account.get(self.name.lower(), lazy=True)
         return await account.get_strategy()
 
     async def run_agent(self, trader_mcp_servers, researcher_mcp_servers):
@@ -11,8 +11,8 @@ import pandas as pd
 import plotly.express as px
 from ..core.models import Account
 from ..utils.formatting import fmt_inr
-from ..core.database import async_read_log, setup_database
-from ..core.market import get_share_price
+from ..core.database import async_read_log, async_read_portfolio_series, setup_database
+from ..core.market import get_provider_health, get_share_price, get_share_prices
 from ..utils.config import TRADER_CONFIGS, TraderConfig, settings
 
 mapper = {
@@ -36,15 +36,22 @@ class TraderUI:
         self.emoji = config.emoji
         self.color = config.color
         self.account = None
+        self.portfolio_series = []
 
     async def init_account(self):
         """Asynchronously load account model."""
-        self.account = await Account.get(self.name)
+        await self.reload()
         return self
 
     async def reload(self):
-        """Asynchronously reload account model."""
-        self.account = await Account.get(self.name)
+        """
+        Asynchronously reload account model. Portfolio history is not loaded into the account;
+        charts read a bounded series from the rollup tables instead.
+        """
+        self.account = await Account.get(self.name, lazy=True)
+        await self.account.load_transactions()
+        series = await async_read_portfolio_series(self.name)
+        self.portfolio_series = [(ts, close) for ts, _, _, _, close in series["points"]]
 
     def get_title(self) -> str:
         return f"""
@@ -60,7 +67,7 @@ class TraderUI:
     def get_portfolio_value_df(self) -> pd.DataFrame:
         if not self.account:
             return pd.DataFrame(columns=["datetime", "value"])
-        df = pd.DataFrame(self.account.portfolio_value_time_series, columns=["datetime", "value"])
+        df = pd.DataFrame(self.portfolio_series, columns=["datetime", "value"])
         if df.empty:
             return df
         df["datetime"] = pd.to_datetime(df["datetime"])
@@ -109,23 +116,34 @@ class TraderUI:
         return fig
 
     def get_holdings_df(self) -> pd.DataFrame:
+        columns = ["Symbol", "Quantity", "Price", "Total Value", "Avg Cost", "Unrealized P&L", "Realized P&L"]
         if not self.account:
-            return pd.DataFrame(columns=["Symbol", "Quantity", "Price", "Total Value"])
+            return pd.DataFrame(columns=columns)
         holdings = self.account.get_holdings()
         if not holdings:
-            return pd.DataFrame(columns=["Symbol", "Quantity", "Price", "Total Value"])
+            return pd.DataFrame(columns=columns)
+        try:
+            prices = get_share_prices(list(holdings), allow_stale=True)
+        except Exception:
+            prices = {}
+            for symbol in holdings:
+                try:
+                    prices[symbol] = get_share_price(symbol, allow_stale=True)
+                except Exception:
+                    prices[symbol] = 0.0
+        positions = {p["symbol"]: p for p in self.account.get_positions(prices)}
         rows = []
         for symbol, qty in holdings.items():
-            try:
-                price = get_share_price(symbol)
-            except Exception:
-                price = 0.0
-            val = qty * price
+            price = prices[symbol]
+            position = positions.get(symbol, {})
             rows.append({
                 "Symbol": symbol,
                 "Quantity": qty,
                 "Price": fmt_inr(price),
-                "Total Value": fmt_inr(val)
+                "Total Value": fmt_inr(qty * price),
+                "Avg Cost": fmt_inr(position.get("average_cost", 0)),
+                "Unrealized P&L": fmt_inr(position.get("unrealized_pnl", 0)),
+                "Realized P&L": fmt_inr(position.get("realized_pnl", 0)),
             })
         return pd.DataFrame(rows)
 
@@ -168,7 +186,7 @@ class TraderUI:
 
     async def get_portfolio_value(self) -> str:
         await self.reload()
-        portfolio_value = float(self.account.calculate_portfolio_value() or 0.0)
+        portfolio_value = float(self.account.calculate_portfolio_value(allow_stale=True) or 0.0)
         pnl = float(self.account.calculate_profit_loss(portfolio_value) or 0.0)
         badge_class = "pv-badge-up" if pnl >= 0 else "pv-badge-down"
         pnl_badge_class = "pnl-up" if pnl >= 0 else "pnl-down"
@@ -213,7 +231,7 @@ class TraderUI:
 
     async def get_overview_card(self) -> str:
         await self.reload()
-        portfolio_value = float(self.account.calculate_portfolio_value() or 0.0)
+        portfolio_value = float(self.account.calculate_portfolio_value(allow_stale=True) or 0.0)
         pnl = float(self.account.calculate_profit_loss(portfolio_value) or 0.0)
         
         pnl_class = "pnl-up" if pnl >= 0 else "pnl-down"
@@ -254,7 +272,7 @@ async def get_global_header_html(traders: list[TraderUI]) -> str:
 
     for t in traders:
         await t.reload()
-        pv = float(t.account.calculate_portfolio_value() or 0.0)
+        pv = float(t.account.calculate_portfolio_value(allow_stale=True) or 0.0)
         pnl = float(t.account.calculate_profit_loss(pv) or 0.0)
         total_val += pv
         total_pnl += pnl
@@ -347,6 +365,21 @@ def get_all_transactions_html(traders: list[TraderUI]) -> str:
     return html
 
 
+def get_provider_health_df() -> pd.DataFrame:
+    rows = []
+    for h in get_provider_health():
+        rate = h["success_rate"]
+        rows.append([
+            h["provider"],
+            h["state"].replace("_", "-").upper(),
+            "—" if rate is None else f"{rate:.0%}",
+            "—" if h["latency_ms"] is None else f"{h['latency_ms']:.0f} ms",
+            h["calls"],
+            h["trips"],
+        ])
+    return pd.DataFrame(rows, columns=["Provider", "Circuit", "Success", "Median Latency", "Calls", "Trips"])
+
+
 def make_data_refresh_fn(traders: list[TraderUI]):
     async def refresh_data():
         for t in traders:
@@ -355,7 +388,7 @@ def make_data_refresh_fn(traders: list[TraderUI]):
         header_html = await get_global_header_html(traders)
         all_tx_html = get_all_transactions_html(traders)
         
-        results = [header_html, all_tx_html]
+        results = [header_html, all_tx_html, get_provider_health_df()]
         
         for t in traders:
             results.append(await t.get_overview_card())
@@ -403,6 +436,14 @@ def create_ui():
                             
                 gr.Markdown("### 📜 Real-Time Desk Transactions Feed")
                 all_tx_feed = gr.HTML(value=lambda: get_all_transactions_html(traders))
+
+                gr.Markdown("### 🛰️ Market Data Providers")
+                provider_health = gr.Dataframe(
+                    value=get_provider_health_df(),
+                    row_count=(3, "dynamic"),
+                    column_count=6,
+                    interactive=False
+                )
                 
             for i, t in enumerate(traders):
                 with gr.TabItem(f"{t.emoji} {t.name} Terminal"):
@@ -415,7 +456,7 @@ def create_ui():
                                 value=t.get_holdings_df(),
                                 label="Active Holdings",
                                 row_count=(5, "dynamic"),
-                                column_count=4,
+                                column_count=7,
                                 interactive=False
                             )
                             
@@ -446,7 +487,7 @@ def create_ui():
             )
             
         data_timer = gr.Timer(value=15.0)
-        data_outputs = [global_header, all_tx_feed]
+        data_outputs = [global_header, all_tx_feed, provider_health]
         for t_comp in trader_components:
             data_outputs.extend([
                 t_comp["overview_card"],
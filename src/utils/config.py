@@ -34,6 +34,10 @@ class Settings:
     )
     use_many_models: bool = os.getenv("USE_MANY_MODELS", "false").strip().lower() == "true"
 
+    # Streaming Market Feed (live ticks for held + watchlisted instruments)
+    use_market_feed: bool = os.getenv("USE_MARKET_FEED", "false").strip().lower() == "true"
+    market_feed_watchlist: str = os.getenv("MARKET_FEED_WATCHLIST", "")
+
     # Push Notification Credentials
     pushover_user_key: str = os.getenv("PUSHOVER_USER_KEY", "")
     pushover_api_token: str = os.getenv("PUSHOVER_API_TOKEN", "")
@@ -47,6 +51,9 @@ class Settings:
     def is_pushover_configured(self) -> bool:
         return bool(self.pushover_user_key and self.pushover_api_token)
 
+    def market_feed_watchlist_symbols(self) -> List[str]:
+        return [s.strip() for s in self.market_feed_watchlist.split(",") if s.strip()]
+
 
 # Global settings instance
 settings = Settings()
@@ -0,0 +1,165 @@
+"""
+http.py
+Shared, long-lived HTTP connection pools for market data and research clients.
+Sessions are process-wide singletons per client name, so repeated quotes to the same host
+reuse kept-alive TCP/TLS connections instead of opening a new one per call. Sync callers
+get a requests.Session; coroutines get an httpx.AsyncClient bound to their event loop.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("http")
+
+# Idle keep-alive connections retained per host, and distinct hosts pooled per session
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with bounded per-host connection pools and reuse counters.
+    At most `pool_maxsize` connections per host are kept alive; bursts beyond that are served
+    by extra connections that are closed after use rather than blocking the caller.
+    """
+
+    def __init__(self, name: str, pool_maxsize: int = HTTP_POOL_MAXSIZE, pool_hosts: int = HTTP_POOL_HOSTS):
+        super().__init__()
+        self.name = name
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self._adapter = adapter
+        self._requests: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        with self._lock:
+            self._requests[urlsplit(url).netloc] += 1
+        return super().request(method, url, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per host: requests sent, connections opened, and requests served on a reused connection."""
+        opened: Counter = Counter()
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                port = f":{pool.port}" if pool.port and pool.port not in (80, 443) else ""
+                opened[f"{pool.host}{port}"] += pool.num_connections
+        return _host_stats(self._requests, opened)
+
+
+class _AsyncConnectionCounter:
+    """httpcore trace hook counting new TCP connections per host for one AsyncClient."""
+
+    def __init__(self):
+        self.requests: Counter = Counter()
+        self.opened: Counter = Counter()
+
+    async def on_request(self, request: httpx.Request) -> None:
+        host = request.url.netloc.decode("ascii")
+        self.requests[host] += 1
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                self.opened[host] += 1
+
+        request.extensions["trace"] = trace
+
+
+def _host_stats(requests_by_host: Counter, opened_by_host: Counter) -> Dict[str, Dict[str, int]]:
+    return {
+        host: {
+            "requests": requests_by_host[host],
+            "connections": opened_by_host[host],
+            "reused": max(0, requests_by_host[host] - opened_by_host[host]),
+        }
+        for host in sorted(set(requests_by_host) | set(opened_by_host))
+    }
+
+
+_sessions: Dict[str, PooledSession] = {}
+_async_clients: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient, _AsyncConnectionCounter]] = {}
+_registry_lock = threading.Lock()
+
+
+def get_session(name: str) -> PooledSession:
+    """Process-wide pooled session for the client `name` (e.g. "groww", "pinchtab")."""
+    session = _sessions.get(name)
+    if session is None:
+        with _registry_lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _sessions[name] = PooledSession(name)
+    return session
+
+
+def get_async_client(name: str) -> httpx.AsyncClient:
+    """
+    Pooled httpx.AsyncClient for the client `name` on the running event loop. httpx pools are
+    tied to the loop that opened them, so each loop gets its own client; clients of loops that
+    have since closed are dropped.
+    """
+    loop = asyncio.get_running_loop()
+    key = (name, id(loop))
+    entry = _async_clients.get(key)
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+    with _registry_lock:
+        for stale in [k for k, (other, _, _) in _async_clients.items() if other.is_closed()]:
+            del _async_clients[stale]
+        counter = _AsyncConnectionCounter()
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAXSIZE * HTTP_POOL_HOSTS,
+                max_keepalive_connections=HTTP_POOL_MAXSIZE,
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+            ),
+            event_hooks={"request": [counter.on_request]},
+        )
+        _async_clients[key] = (loop, client, counter)
+    return client
+
+
+def http_pool_stats() -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Connection reuse per client name and host, merged across sync sessions and async clients."""
+    requests_by: Dict[str, Counter] = {}
+    opened_by: Dict[str, Counter] = {}
+    for name, session in list(_sessions.items()):
+        for host, row in session.stats().items():
+            requests_by.setdefault(name, Counter())[host] += row["requests"]
+            opened_by.setdefault(name, Counter())[host] += row["connections"]
+    for (name, _), (_, _, counter) in list(_async_clients.items()):
+        requests_by.setdefault(name, Counter()).update(counter.requests)
+        opened_by.setdefault(name, Counter()).update(counter.opened)
+    return {name: _host_stats(requests_by[name], opened_by.get(name, Counter())) for name in sorted(requests_by)}
+
+
+def close_sessions() -> None:
+    """Close every pooled sync session; async clients close with aclose_async_clients()."""
+    with _registry_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+async def aclose_async_clients() -> None:
+    """Close the pooled async clients bound to the running loop."""
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        owned = [k for k, (other, _, _) in _async_clients.items() if other is loop]
+        clients = [_async_clients.pop(k)[1] for k in owned]
+    for client in clients:
+        await client.aclose()
@@ -4,13 +4,12 @@ Client integration for INDmoney / INDstocks providing stock chart data and walle
 Supports official INDstocks API authentication and token-efficient PinchTab browser fallback.
 """
 
-import json
 import logging
 import os
-import urllib.request
-import urllib.parse
+from functools import lru_cache
 from typing import Any, Dict, Optional
-from src.utils.pinchtab_client import PinchtabClient
+from src.utils.http import get_session
+from src.utils.pinchtab_client import get_pinchtab_client
 
 logger = logging.getLogger("indmoney_client")
 
@@ -18,6 +17,7 @@ logger = logging.getLogger("indmoney_client")
 class INDmoneyClient:
     """
     Client for INDmoney / INDstocks integration.
+    API calls share the pooled "indmoney" keep-alive session.
     """
 
     def __init__(self, access_token: Optional[str] = None, api_key: Optional[str] = None):
@@ -25,7 +25,8 @@ class INDmoneyClient:
         self.api_key = api_key or os.environ.get("INDMONEY_API_KEY", "")
         self.mcp_url = os.environ.get("INDMONEY_MCP_URL", "https://mcp.indmoney.com/mcp")
         self.base_url = "https://api.indstocks.com"
-        self.pinchtab = PinchtabClient()
+        self.session = get_session("indmoney")
+        self.pinchtab = get_pinchtab_client()
 
     def get_wallet_balance(self) -> Dict[str, Any]:
         """
@@ -40,18 +41,18 @@ class INDmoneyClient:
             }
             # Attempt MCP endpoint request first
             try:
-                payload = json.dumps({"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "get_wallet_balance", "arguments": {}}, "id": 1}).encode("utf-8")
-                req = urllib.request.Request(self.mcp_url, data=payload, headers=headers, method="POST")
-                with urllib.request.urlopen(req, timeout=10) as resp:
-                    data = json.loads(resp.read().decode("utf-8"))
-                    res_content = data.get("result", {}).get("content", [{}])[0].get("text", "")
-                    return {
-                        "status": "success",
-                        "source": "official_mcp_server",
-                        "mcp_url": self.mcp_url,
-                        "data": data,
-                        "details": res_content or "Retrieved from INDmoney MCP endpoint"
-                    }
+                payload = {"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "get_wallet_balance", "arguments": {}}, "id": 1}
+                resp = self.session.post(self.mcp_url, json=payload, headers=headers, timeout=10)
+                resp.raise_for_status()
+                data = resp.json()
+                res_content = data.get("result", {}).get("content", [{}])[0].get("text", "")
+                return {
+                    "status": "success",
+                    "source": "official_mcp_server",
+                    "mcp_url": self.mcp_url,
+                    "data": data,
+                    "details": res_content or "Retrieved from INDmoney MCP endpoint"
+                }
             except Exception as exc:
                 logger.warning(f"INDmoney MCP wallet balance request failed: {exc}", exc_info=True)
 
@@ -79,23 +80,23 @@ class INDmoneyClient:
 
         # If API token is configured, call INDstocks chart API
         if self.access_token:
-            url = f"{self.base_url}/v1/market/chart?symbol={symbol_upper}&period={period}"
+            url = f"{self.base_url}/v1/market/chart"
             headers = {
                 "Authorization": f"Bearer {self.access_token}",
                 "X-Api-Key": self.api_key
             }
             try:
-                req = urllib.request.Request(url, headers=headers, method="GET")
-                with urllib.request.urlopen(req, timeout=10) as resp:
-                    data = json.loads(resp.read().decode("utf-8"))
-                    return {
-                        "status": "success",
-                        "symbol": symbol_upper,
-                        "source": "api",
-                        "chart_data": data.get("points", []),
-                        "current_price": data.get("current_price"),
-                        "change_percent": data.get("change_percent")
-                    }
+                resp = self.session.get(url, params={"symbol": symbol_upper, "period": period}, headers=headers, timeout=10)
+                resp.raise_for_status()
+                data = resp.json()
+                return {
+                    "status": "success",
+                    "symbol": symbol_upper,
+                    "source": "api",
+                    "chart_data": data.get("points", []),
+                    "current_price": data.get("current_price"),
+                    "change_percent": data.get("change_percent")
+                }
             except Exception as exc:
                 logger.warning(f"INDstocks chart API request failed for symbol '{symbol_upper}': {exc}", exc_info=True)
 
@@ -128,3 +129,9 @@ class INDmoneyClient:
         Retrieve comprehensive stock overview, valuation, and company metrics.
         """
         return self.get_stock_chart_data(symbol, period="1d")
+
+
+@lru_cache(maxsize=1)
+def get_indmoney_client() -> INDmoneyClient:
+    """Process-wide INDmoneyClient configured from the environment."""
+    return INDmoneyClient()
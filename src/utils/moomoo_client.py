@@ -5,27 +5,174 @@ Connects to OpenD gateway (host: 127.0.0.1, port: 11111) for US/Global stock quo
 account positions, and paper trading, with PinchTab web automation fallback.
 """
 
-import json
+import atexit
 import logging
 import os
-import urllib.request
-import urllib.parse
-from typing import Any, Dict, Optional
-from src.utils.pinchtab_client import PinchtabClient
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.utils.pinchtab_client import get_pinchtab_client
 
 logger = logging.getLogger("moomoo_client")
 
+# OpenD accepts at most 400 codes per get_market_snapshot request
+MOOMOO_SNAPSHOT_LIMIT = 400
+
+# Builds an OpenD context: factory(kind, host, port) with kind "quote" or "trade"
+ContextFactory = Callable[[str, str, int], Any]
+
+
+@lru_cache(maxsize=1)
+def _moomoo_sdk():
+    """The moomoo SDK module, or None when it is not installed (checked once per process)."""
+    try:
+        import moomoo
+    except ImportError:
+        return None
+    return moomoo
+
+
+def _sdk_context_factory(kind: str, host: str, port: int) -> Any:
+    moomoo = _moomoo_sdk()
+    if moomoo is None:
+        raise ImportError("moomoo SDK is not installed")
+    if kind == "quote":
+        return moomoo.OpenQuoteContext(host=host, port=port)
+    return moomoo.OpenSecTradeContext(host=host, port=port)
+
+
+class MoomooContextPool:
+    """
+    Long-lived OpenD quote and trade contexts for one gateway, shared by every MoomooClient
+    and thread (the SDK serializes requests on a context itself). Contexts open on first use;
+    a call that raises closes its context and is retried once on a fresh one, so a dropped
+    OpenD connection is re-established by the next request instead of by every request.
+    """
+
+    def __init__(self, host: str, port: int, factory: Optional[ContextFactory] = None):
+        self.host = host
+        self.port = port
+        self._factory = factory or _sdk_context_factory
+        self._contexts: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reconnects = 0
+        self.calls = 0
+
+    def _context(self, kind: str) -> Any:
+        ctx = self._contexts.get(kind)
+        if ctx is None:
+            with self._lock:
+                ctx = self._contexts.get(kind)
+                if ctx is None:
+                    ctx = self._contexts[kind] = self._factory(kind, self.host, self.port)
+                    self.opened += 1
+        return ctx
+
+    def _discard(self, kind: str, ctx: Any) -> None:
+        with self._lock:
+            if self._contexts.get(kind) is ctx:
+                del self._contexts[kind]
+        try:
+            ctx.close()
+        except Exception as exc:
+            logger.debug(f"Closing Moomoo {kind} context failed: {exc}")
+
+    def call(self, kind: str, method: str, *args, **kwargs) -> Any:
+        """Invoke `method` on the shared `kind` ("quote" or "trade") context, reconnecting once on failure."""
+        self.calls += 1
+        ctx = self._context(kind)
+        try:
+            return getattr(ctx, method)(*args, **kwargs)
+        except ImportError:
+            raise
+        except Exception as exc:
+            logger.warning(f"Moomoo {kind} context failed on {method} ({exc}); reconnecting to OpenD.")
+            self._discard(kind, ctx)
+            self.reconnects += 1
+            return getattr(self._context(kind), method)(*args, **kwargs)
+
+    def get_market_snapshot(self, codes: List[str]) -> List[Dict[str, Any]]:
+        """Snapshot rows for `codes`, MOOMOO_SNAPSHOT_LIMIT codes per request on the shared quote context."""
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(codes), MOOMOO_SNAPSHOT_LIMIT):
+            ret, data = self.call("quote", "get_market_snapshot", codes[start:start + MOOMOO_SNAPSHOT_LIMIT])
+            if ret != 0:
+                logger.warning(f"Moomoo snapshot request failed: {data}")
+                continue
+            if not data.empty:
+                rows.extend(data.to_dict("records"))
+        return rows
+
+    def close(self) -> None:
+        with self._lock:
+            contexts = list(self._contexts.items())
+            self._contexts.clear()
+        for kind, ctx in contexts:
+            try:
+                ctx.close()
+            except Exception as exc:
+                logger.debug(f"Closing Moomoo {kind} context failed: {exc}")
+
+    def stats(self) -> Dict[str, int]:
+        return {"open": len(self._contexts), "opened": self.opened, "reconnects": self.reconnects, "calls": self.calls}
+
+
+_context_pools: Dict[Tuple[str, int], MoomooContextPool] = {}
+_context_pools_lock = threading.Lock()
+
+
+def get_context_pool(host: str, port: int) -> MoomooContextPool:
+    """Process-wide context pool for the OpenD gateway at host:port."""
+    with _context_pools_lock:
+        pool = _context_pools.get((host, port))
+        if pool is None:
+            pool = _context_pools[(host, port)] = MoomooContextPool(host, port)
+        return pool
+
+
+@atexit.register
+def close_context_pools() -> None:
+    with _context_pools_lock:
+        pools = list(_context_pools.values())
+        _context_pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _normalize_code(symbol: str) -> str:
+    clean_symbol = symbol.upper().strip()
+    if not clean_symbol.startswith("US.") and not clean_symbol.startswith("HK."):
+        clean_symbol = f"US.{clean_symbol}"
+    return clean_symbol
+
+
+def _snapshot_quote(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": "success",
+        "symbol": str(row.get("code")),
+        "source": "moomoo_opend_api",
+        "last_price": float(row.get("last_price", 0.0)),
+        "high_price": float(row.get("high_price", 0.0)),
+        "low_price": float(row.get("low_price", 0.0)),
+        "volume": int(row.get("volume", 0)),
+        "turnover": float(row.get("turnover", 0.0))
+    }
+
 
 class MoomooClient:
     """
     Client interface for Moomoo API Skills and OpenD gateway.
+    OpenD requests go through the gateway's shared MoomooContextPool.
     """
 
-    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 contexts: Optional[MoomooContextPool] = None):
         self.host = host or os.environ.get("MOOMOO_HOST", "127.0.0.1")
         self.port = int(port or os.environ.get("MOOMOO_PORT", "11111"))
         self.trd_env = os.environ.get("MOOMOO_ENV", "SIMULATE")
-        self.pinchtab = PinchtabClient()
+        self.contexts = contexts or get_context_pool(self.host, self.port)
+        self.pinchtab = get_pinchtab_client()
 
     def get_stock_quote(self, symbol: str) -> Dict[str, Any]:
         """
@@ -34,29 +181,15 @@ class MoomooClient:
         Args:
             symbol: Ticker symbol (e.g. "US.AAPL", "AAPL", "US.TSLA", "US.NVDA")
         """
-        clean_symbol = symbol.upper().strip()
-        if not clean_symbol.startswith("US.") and not clean_symbol.startswith("HK."):
-            clean_symbol = f"US.{clean_symbol}"
+        clean_symbol = _normalize_code(symbol)
 
-        # 1. Try connecting via moomoo-api or futu-api SDK if installed
+        # 1. Try the shared OpenD quote context if the moomoo SDK is installed
         try:
-            import moomoo
-            quote_ctx = moomoo.OpenQuoteContext(host=self.host, port=self.port)
-            ret, data = quote_ctx.get_market_snapshot([clean_symbol])
-            quote_ctx.close()
-
-            if ret == 0 and not data.empty:
-                row = data.iloc[0]
-                return {
-                    "status": "success",
-                    "symbol": clean_symbol,
-                    "source": "moomoo_opend_api",
-                    "last_price": float(row.get("last_price", 0.0)),
-                    "high_price": float(row.get("high_price", 0.0)),
-                    "low_price": float(row.get("low_price", 0.0)),
-                    "volume": int(row.get("volume", 0)),
-                    "turnover": float(row.get("turnover", 0.0))
-                }
+            rows = self.contexts.get_market_snapshot([clean_symbol])
+            if rows:
+                return {**_snapshot_quote(rows[0]), "symbol": clean_symbol}
+        except ImportError:
+            pass
         except Exception as exc:
             logger.warning(f"Moomoo OpenAPI quote lookup failed for '{clean_symbol}': {exc}", exc_info=True)
 
@@ -84,16 +217,32 @@ class MoomooClient:
             "currency": "USD"
         }
 
+    def get_stock_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get snapshots for many symbols with one OpenD request.
+        Returns only the symbols OpenD answered, keyed by the normalized code (e.g. "US.AAPL");
+        callers fall back to get_stock_quote() for anything missing.
+        """
+        codes = list(dict.fromkeys(_normalize_code(symbol) for symbol in symbols))
+        if not codes:
+            return {}
+
+        quotes: Dict[str, Dict[str, Any]] = {}
+        try:
+            for row in self.contexts.get_market_snapshot(codes):
+                quotes[str(row.get("code"))] = _snapshot_quote(row)
+        except ImportError:
+            pass
+        except Exception as exc:
+            logger.warning(f"Moomoo OpenAPI batch snapshot failed for {len(codes)} symbols: {exc}", exc_info=True)
+        return quotes
+
     def get_account_positions(self) -> Dict[str, Any]:
         """
         Get Moomoo paper trading or live account assets, cash balance, and positions.
         """
         try:
-            import moomoo
-            trd_ctx = moomoo.OpenSecTradeContext(host=self.host, port=self.port)
-            ret, data = trd_ctx.accinfo_query(trd_env=self.trd_env)
-            trd_ctx.close()
-
+            ret, data = self.contexts.call("trade", "accinfo_query", trd_env=self.trd_env)
             if ret == 0 and not data.empty:
                 row = data.iloc[0]
                 return {
@@ -104,6 +253,8 @@ class MoomooClient:
                     "market_val": float(row.get("market_val", 0.0)),
                     "currency": "USD"
                 }
+        except ImportError:
+            pass
         except Exception as exc:
             logger.warning(f"Moomoo OpenAPI account query failed: {exc}", exc_info=True)
 
@@ -121,17 +272,17 @@ class MoomooClient:
         """
         Place paper trading or live trade order on Moomoo platform.
         """
-        clean_symbol = symbol.upper().strip()
-        if not clean_symbol.startswith("US.") and not clean_symbol.startswith("HK."):
-            clean_symbol = f"US.{clean_symbol}"
+        clean_symbol = _normalize_code(symbol)
 
         try:
-            import moomoo
-            trd_ctx = moomoo.OpenSecTradeContext(host=self.host, port=self.port)
+            moomoo = _moomoo_sdk()
+            if moomoo is None:
+                raise ImportError("moomoo SDK is not installed")
             trd_side = moomoo.TrdSide.BUY if side.upper() == "BUY" else moomoo.TrdSide.SELL
-            ret, data = trd_ctx.place_order(price=0.0, qty=qty, code=clean_symbol, trd_side=trd_side, order_type=moomoo.OrderType.MARKET, trd_env=self.trd_env)
-            trd_ctx.close()
-
+            ret, data = self.contexts.call(
+                "trade", "place_order", price=0.0, qty=qty, code=clean_symbol, trd_side=trd_side,
+                order_type=moomoo.OrderType.MARKET, trd_env=self.trd_env
+            )
             if ret == 0 and not data.empty:
                 order_id = str(data.iloc[0].get("order_id", "MOO_12345"))
                 return {
@@ -142,6 +293,8 @@ class MoomooClient:
                     "side": side.upper(),
                     "source": "moomoo_opend_api"
                 }
+        except ImportError:
+            pass
         except Exception as exc:
             logger.warning(f"Moomoo OpenAPI order placement failed for '{clean_symbol}': {exc}", exc_info=True)
 
@@ -153,3 +306,9 @@ class MoomooClient:
             "side": side.upper(),
             "source": "moomoo_simulated"
         }
+
+
+@lru_cache(maxsize=1)
+def get_moomoo_client() -> MoomooClient:
+    """Process-wide MoomooClient configured from the environment."""
+    return MoomooClient()
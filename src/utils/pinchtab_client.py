@@ -5,32 +5,39 @@ Python client wrapper for interacting with the PinchTab browser automation daemo
 
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
-import urllib.request
-import urllib.parse
-import urllib.error
+
+import requests
+
+from src.utils.http import get_session
+
+
+@lru_cache(maxsize=1)
+def _config_token() -> Optional[str]:
+    """Token from ~/.pinchtab/config.json, read once per process."""
+    config_path = Path.home() / ".pinchtab" / "config.json"
+    if config_path.is_file():
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("server", {}).get("token")
+        except Exception:
+            pass
+    return None
 
 
 class PinchtabClient:
     """
     Client interface for controlling PinchTab browser automation daemon.
+    Requests go over the shared "pinchtab" keep-alive session.
     """
 
     def __init__(self, base_url: str = "http://127.0.0.1:9867", token: Optional[str] = None):
         self.base_url = os.environ.get("PINCHTAB_URL", base_url).rstrip("/")
-        self.token = token or os.environ.get("PINCHTAB_TOKEN")
-
-        # Fallback to reading token from ~/.pinchtab/config.json if available
-        if not self.token:
-            config_path = Path.home() / ".pinchtab" / "config.json"
-            if config_path.is_file():
-                try:
-                    with open(config_path, "r", encoding="utf-8") as f:
-                        cfg = json.load(f)
-                        self.token = cfg.get("server", {}).get("token")
-                except Exception:
-                    pass
+        # Fallback to the token in ~/.pinchtab/config.json if available
+        self.token = token or os.environ.get("PINCHTAB_TOKEN") or _config_token()
+        self.session = get_session("pinchtab")
 
     def _headers(self) -> Dict[str, str]:
         headers = {"Content-Type": "application/json"}
@@ -40,23 +47,18 @@ class PinchtabClient:
 
     def _request(self, endpoint: str, method: str = "GET", data: Optional[Dict[str, Any]] = None, timeout: int = 15) -> Dict[str, Any]:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        headers = self._headers()
-
         payload = json.dumps(data).encode("utf-8") if data else None
-        req = urllib.request.Request(url, data=payload, headers=headers, method=method)
 
         try:
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                body = response.read().decode("utf-8")
-                return json.loads(body)
-        except urllib.error.HTTPError as e:
-            try:
-                err_body = e.read().decode("utf-8")
-                return json.loads(err_body)
-            except Exception:
-                return {"error": f"HTTP {e.code}: {e.reason}"}
-        except Exception as e:
+            response = self.session.request(method, url, data=payload, headers=self._headers(), timeout=timeout)
+        except requests.RequestException as e:
             return {"error": str(e)}
+        try:
+            return response.json()
+        except ValueError:
+            if response.ok:
+                return {"error": f"Invalid JSON response from {endpoint}"}
+            return {"error": f"HTTP {response.status_code}: {response.reason}"}
 
     def is_healthy(self) -> bool:
         """Check if PinchTab daemon is running and healthy."""
@@ -95,3 +97,9 @@ class PinchtabClient:
             "text": text_res.get("text", ""),
             "status": "success"
         }
+
+
+@lru_cache(maxsize=1)
+def get_pinchtab_client() -> PinchtabClient:
+    """Process-wide PinchtabClient for callers that do not need their own URL or token."""
+    return PinchtabClient()
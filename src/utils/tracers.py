@@ -1,10 +1,9 @@
 # src/utils/tracers.py
-"""Trace logging processor using non-blocking async log writing."""
+"""Trace logging processor using the buffered group-commit log writer."""
 
-import asyncio
 import uuid
 from agents import TracingProcessor, Trace, Span
-from ..core.database import async_write_log
+from ..core.database import log_writer, submit_log
 
 
 def make_trace_id(tag: str) -> str:
@@ -14,11 +13,7 @@ def make_trace_id(tag: str) -> str:
 
 
 def _log_async(name: str, log_type: str, message: str) -> None:
-    try:
-        loop = asyncio.get_running_loop()
-        loop.create_task(async_write_log(name, log_type, message))
-    except RuntimeError:
-        pass
+    submit_log(name, log_type, message)
 
 
 class LogTracer(TracingProcessor):
@@ -72,7 +67,7 @@ class LogTracer(TracingProcessor):
             _log_async(name, typ, message)
 
     def force_flush(self) -> None:
-        pass
+        log_writer.request_flush()
 
     def shutdown(self) -> None:
-        pass
\ No newline at end of file
+        log_writer.request_flush()
@@ -0,0 +1,169 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from src.core.database import setup_database, async_read_account, async_write_account, async_read_transactions, async_read_log
+from src.core.models import Account, Transaction
+
+
+class TestAccountPersistence(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.account = await Account.get("delta_test_user")
+        await self.account.reset("Delta Strategy")
+
+    def _append_trade(self, symbol: str, quantity: int, price: str, timestamp: str) -> None:
+        self.account.transactions.append(Transaction(
+            symbol=symbol,
+            quantity=quantity,
+            price=Decimal(price),
+            timestamp=timestamp,
+            rationale="delta test"
+        ))
+        self.account.holdings[symbol] = self.account.holdings.get(symbol, 0) + quantity
+        if self.account.holdings[symbol] == 0:
+            del self.account.holdings[symbol]
+        self.account.balance -= Decimal(price) * quantity
+
+    async def test_pending_changes_only_cover_new_rows(self):
+        self._append_trade("INFY", 10, "1500.00", "2026-08-02 10:00:00")
+        await self.account.save()
+
+        self._append_trade("TCS", 5, "3500.00", "2026-08-02 10:05:00")
+        self.account.portfolio_value_time_series.append(("2026-08-02 10:05:00", 100000.0))
+        delta = self.account.pending_changes()
+        self.assertEqual([t["symbol"] for t in delta["transactions"]], ["TCS"])
+        self.assertEqual(delta["holdings_upsert"], {"TCS": 5})
+        self.assertEqual(delta["holdings_delete"], [])
+        self.assertEqual(len(delta["portfolio_value_time_series"]), 1)
+
+        await self.account.save()
+        delta_after = self.account.pending_changes()
+        self.assertEqual(delta_after["transactions"], [])
+        self.assertEqual(delta_after["holdings_upsert"], {})
+
+        stored = await async_read_account("delta_test_user")
+        self.assertEqual([t["symbol"] for t in stored["transactions"]], ["INFY", "TCS"])
+        self.assertEqual(stored["holdings"], {"INFY": 10, "TCS": 5})
+        self.assertEqual(len(stored["portfolio_value_time_series"]), 1)
+
+    async def test_sold_out_holding_is_deleted(self):
+        self._append_trade("INFY", 10, "1500.00", "2026-08-02 11:00:00")
+        await self.account.save()
+        self._append_trade("INFY", -10, "1510.00", "2026-08-02 11:30:00")
+        self.assertEqual(self.account.pending_changes()["holdings_delete"], ["INFY"])
+        await self.account.save()
+
+        stored = await async_read_account("delta_test_user")
+        self.assertEqual(stored["holdings"], {})
+        self.assertEqual(len(stored["transactions"]), 2)
+
+    async def test_reset_clears_stored_history(self):
+        self._append_trade("INFY", 10, "1500.00", "2026-08-02 12:00:00")
+        await self.account.save()
+        await self.account.reset("Fresh Strategy")
+
+        stored = await async_read_account("delta_test_user")
+        self.assertEqual(stored["transactions"], [])
+        self.assertEqual(stored["holdings"], {})
+        self.assertEqual(stored["strategy"], "Fresh Strategy")
+
+    async def test_lazy_account_loads_header_only(self):
+        self._append_trade("INFY", 10, "1500.00", "2026-08-02 13:00:00")
+        self._append_trade("TCS", 2, "3500.00", "2026-08-02 13:05:00")
+        self.account.portfolio_value_time_series.append(("2026-08-02 13:05:00", 100000.0))
+        await self.account.save()
+
+        # Bypass the identity map to exercise a fresh lazy load
+        Account.evict("delta_test_user")
+        lazy = await Account.get("delta_test_user", lazy=True)
+        self.assertEqual(lazy.transactions, [])
+        self.assertEqual(lazy.portfolio_value_time_series, [])
+        self.assertEqual(lazy.holdings, {"INFY": 10, "TCS": 2})
+        self.assertEqual(lazy.balance, self.account.balance)
+        self.assertEqual(
+            lazy.calculate_profit_loss(Decimal("100000.00")),
+            self.account.calculate_profit_loss(Decimal("100000.00"))
+        )
+        with self.assertRaises(RuntimeError):
+            lazy.list_transactions()
+
+        streamed = [t.symbol async for t in lazy.iter_transactions(page_size=1)]
+        self.assertEqual(streamed, ["INFY", "TCS"])
+
+        # Trades made on the lazy copy are saved as deltas and stay after older rows once loaded
+        lazy.transactions.append(Transaction(
+            symbol="WIPRO", quantity=1, price=Decimal("450.00"),
+            timestamp="2026-08-02 13:10:00", rationale="lazy trade"
+        ))
+        lazy.holdings["WIPRO"] = 1
+        await lazy.save()
+        loaded = await lazy.load_transactions()
+        self.assertEqual([t.symbol for t in loaded], ["INFY", "TCS", "WIPRO"])
+        self.assertEqual(lazy.pending_changes()["transactions"], [])
+        self.assertEqual(len(await lazy.load_history()), 1)
+
+    async def test_keyset_pagination(self):
+        for minute in range(5):
+            self._append_trade("INFY", 1, "1500.00", f"2026-08-02 14:0{minute}:00")
+        await self.account.save()
+
+        first_page = await async_read_transactions("delta_test_user", limit=2)
+        second_page = await async_read_transactions("delta_test_user", after_id=first_page[-1]["id"], limit=2)
+        self.assertEqual(len(first_page), 2)
+        self.assertEqual(second_page[0]["timestamp"], "2026-08-02 14:02:00")
+
+    async def test_buy_commits_trade_history_and_logs_together(self):
+        with patch("src.core.models.aget_share_price", AsyncMock(return_value=100.0)), \
+                patch("src.core.models.aget_share_prices", AsyncMock(side_effect=lambda symbols: {s: 100.0 for s in symbols})):
+            await self.account.buy_shares("INFY", 3, "unit of work")
+
+        stored = await async_read_account("delta_test_user")
+        self.assertEqual(stored["holdings"], {"INFY": 3})
+        self.assertEqual(len(stored["transactions"]), 1)
+        self.assertEqual(len(stored["portfolio_value_time_series"]), 1)
+        messages = [message for _, _, message in await async_read_log("delta_test_user", last_n=2)]
+        self.assertTrue(messages[0].startswith("Bought 3 of INFY"))
+        self.assertTrue(messages[1].startswith("Retrieved account details"))
+
+
+class TestAccountIdentityMap(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.account = await Account.get("identity_test_user")
+        await self.account.reset("Identity Strategy")
+
+    async def test_unchanged_account_is_served_from_the_map(self):
+        with patch("src.core.models.async_read_account", AsyncMock()) as read_account:
+            again = await Account.get("identity_test_user", lazy=True)
+        self.assertIs(again, self.account)
+        read_account.assert_not_called()
+
+        await again.change_strategy("Write Through")
+        self.assertEqual((await Account.get("identity_test_user")).strategy, "Write Through")
+
+    async def test_write_from_elsewhere_triggers_reload(self):
+        stored = await async_read_account("identity_test_user")
+        stored["strategy"] = "Other Process"
+        version = await async_write_account("identity_test_user", stored)
+        self.assertEqual(version, self.account._version + 1)
+
+        reloaded = await Account.get("identity_test_user")
+        self.assertIsNot(reloaded, self.account)
+        self.assertEqual(reloaded.strategy, "Other Process")
+        self.assertIs(await Account.get("identity_test_user"), reloaded)
+
+    async def test_failed_trade_evicts_cached_instance(self):
+        with patch("src.core.models.aget_share_price", AsyncMock(return_value=100.0)), \
+                patch("src.core.models.aget_share_prices", AsyncMock(side_effect=RuntimeError("no quotes"))):
+            with self.assertRaises(RuntimeError):
+                await self.account.buy_shares("INFY", 3, "quote outage")
+
+        fresh = await Account.get("identity_test_user")
+        self.assertIsNot(fresh, self.account)
+        self.assertEqual(fresh.holdings, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from src.core.candles import CANDLE_DTYPE, CandleSource, CandleStore, GrowwCandleSource, exchange_timezone
+from src.core.instruments import Instrument
+
+DAY = 86400
+
+
+class SyntheticDailySource(CandleSource):
+    """Daily candles on weekdays with close = day index; records every requested range."""
+
+    def __init__(self):
+        self.requests = []
+
+    def supports_instrument(self, inst: Instrument) -> bool:
+        return True
+
+    def fetch(self, inst, interval, start, end):
+        self.requests.append((start, end))
+        tz = exchange_timezone(inst.exchange)
+        first = datetime.fromtimestamp(start, tz).replace(hour=0, minute=0, second=0)
+        rows = []
+        day = first
+        while day.timestamp() <= end:
+            ts = int(day.timestamp())
+            if ts >= start and day.weekday() < 5:
+                index = ts // DAY
+                rows.append((ts, index, index + 1, index - 1, float(index), 100))
+            day += timedelta(days=1)
+        return np.array(rows, dtype=CANDLE_DTYPE)
+
+
+class TestCandleStore(unittest.TestCase):
+
+    def setUp(self):
+        self.source = SyntheticDailySource()
+        self.store = CandleStore(tempfile.mkdtemp(prefix="candles_"), self.source)
+        self.tz = exchange_timezone("NSE")
+
+    def _day(self, iso: str) -> datetime:
+        return datetime.strptime(iso, "%Y-%m-%d").replace(tzinfo=self.tz)
+
+    def test_only_missing_ranges_are_fetched(self):
+        march = self.store.range("INFY", "1d", self._day("2026-03-02"), self._day("2026-03-13"))
+        self.assertEqual(len(march), 10)
+        self.assertIsInstance(march["close"], np.ndarray)
+        self.assertEqual(len(self.source.requests), 1)
+
+        # Fully covered: served from the memory map without touching the source
+        again = self.store.range("INFY", "1d", self._day("2026-03-04"), self._day("2026-03-06"))
+        self.assertEqual(list(again["close"]), list(march["close"][2:5]))
+        self.assertEqual(len(self.source.requests), 1)
+
+        # Extending both ends fetches just the two uncovered spans
+        wider = self.store.range("NSE:INFY", "1d", self._day("2026-02-23"), self._day("2026-03-20"))
+        self.assertEqual(len(wider), 20)
+        self.assertEqual(len(self.source.requests), 3)
+        self.assertTrue(np.all(np.diff(wider["ts"]) > 0))
+        self.assertEqual(self.source.requests[1][1], int(self._day("2026-03-02").timestamp()) - 1)
+
+    def test_close_on_falls_back_to_previous_trading_day(self):
+        friday = self.store.close_on("INFY", "2026-03-06")
+        self.assertEqual(self.store.close_on("INFY", "2026-03-08"), friday)
+        # The weekend itself is covered now and is not requested again
+        requests = len(self.source.requests)
+        self.store.close_on("INFY", "2026-03-07")
+        self.assertEqual(len(self.source.requests), requests)
+
+    def test_groww_payload_parsing(self):
+        rows = [[1772400600, 10, 11, 9, 10.5, 1000], ["2026-03-02T09:15:00", 1, 2, 0.5, 1.5, None]]
+        candles = GrowwCandleSource._parse(rows, self.tz)
+        self.assertEqual(candles["close"].tolist(), [10.5, 1.5])
+        self.assertEqual(int(candles["ts"][1]), int(datetime(2026, 3, 2, 9, 15, tzinfo=self.tz).timestamp()))
+        self.assertEqual(candles["volume"].tolist(), [1000, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
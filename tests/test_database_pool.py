@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+from src.core.database import DB, AsyncDatabaseManager, setup_database, db_manager, async_write_log, async_read_log
+
+
+class TestReaderPool(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.manager = AsyncDatabaseManager(DB, reader_pool_size=2)
+
+    async def asyncTearDown(self):
+        await self.manager.close()
+
+    async def test_reads_do_not_block_on_open_write_transaction(self):
+        writer = await self.manager.get_connection()
+        await writer.execute("BEGIN IMMEDIATE;")
+        await writer.execute(
+            "INSERT INTO logs (name, datetime, type, message) VALUES (?, ?, ?, ?)",
+            ("pool_test_user", "2026-08-02T10:00:00", "trace", "uncommitted")
+        )
+        try:
+            async with self.manager.reader() as reader:
+                async with reader.execute("SELECT COUNT(*) FROM logs WHERE message = 'uncommitted'") as cursor:
+                    (count,) = await asyncio.wait_for(cursor.fetchone(), timeout=2)
+            self.assertEqual(count, 0)
+        finally:
+            await writer.rollback()
+
+    async def test_pool_is_bounded_and_tracks_waits(self):
+        in_use = 0
+        peak = 0
+
+        async def read_once():
+            nonlocal in_use, peak
+            async with self.manager.reader() as reader:
+                in_use += 1
+                peak = max(peak, in_use)
+                async with reader.execute("SELECT COUNT(*) FROM accounts") as cursor:
+                    await cursor.fetchone()
+                await asyncio.sleep(0.01)
+                in_use -= 1
+
+        await asyncio.gather(*[read_once() for _ in range(8)])
+        stats = self.manager.stats()
+        self.assertLessEqual(peak, 2)
+        self.assertEqual(stats["open_readers"], 2)
+        self.assertEqual(stats["acquisitions"], 8)
+        self.assertGreater(stats["waits"], 0)
+        self.assertGreaterEqual(stats["max_wait_ms"], 0.0)
+
+    async def test_reader_connections_are_read_only(self):
+        async with self.manager.reader() as reader:
+            with self.assertRaises(Exception):
+                await reader.execute("DELETE FROM logs WHERE name = 'pool_test_user'")
+
+
+class TestTransactionLease(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+
+    async def test_concurrent_write_waits_for_unit_of_work(self):
+        entered = asyncio.Event()
+
+        async def failing_unit_of_work():
+            async with db_manager.transaction():
+                await async_write_log("tx_test_user", "account", "rolled back")
+                entered.set()
+                await asyncio.sleep(0.05)
+                raise ValueError("abort")
+
+        async def concurrent_log():
+            await entered.wait()
+            await async_write_log("tx_test_user", "account", "committed")
+
+        results = await asyncio.gather(failing_unit_of_work(), concurrent_log(), return_exceptions=True)
+        self.assertIsInstance(results[0], ValueError)
+
+        messages = [message for _, _, message in await async_read_log("tx_test_user", last_n=5)]
+        self.assertIn("committed", messages)
+        self.assertNotIn("rolled back", messages)
+
+    async def test_nested_blocks_join_outer_transaction(self):
+        async with db_manager.transaction() as outer:
+            async with db_manager.transaction() as inner:
+                self.assertIs(inner, outer)
+                await async_write_log("tx_nested_user", "account", "nested")
+            self.assertTrue(outer.in_transaction)
+        self.assertFalse(outer.in_transaction)
+        messages = [message for _, _, message in await async_read_log("tx_nested_user", last_n=1)]
+        self.assertEqual(messages, ["nested"])
+
+
+if __name__ == "__main__":
+    unittest.main()
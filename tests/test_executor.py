@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.core.database import setup_database, async_read_account
+from src.core.executor import OrderExecutor
+from src.core.models import Account
+
+
+async def slow_price(symbol):
+    # Yield to the loop so unserialized orders would interleave between quote and save
+    await asyncio.sleep(0.01)
+    return 100.0
+
+
+class TestOrderExecutor(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        for name in ("executor_user_a", "executor_user_b"):
+            await (await Account.get(name)).reset("Executor Strategy")
+        self.executor = OrderExecutor()
+        self.addAsyncCleanup(self.executor.close)
+        patcher = patch.multiple(
+            "src.core.models",
+            aget_share_price=AsyncMock(side_effect=slow_price),
+            aget_share_prices=AsyncMock(side_effect=lambda symbols: {s: 100.0 for s in symbols}),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_same_account_orders_apply_in_sequence(self):
+        fills = [self.executor.buy("executor_user_a", "INFY", 1, f"order {i}") for i in range(5)]
+        fills.append(self.executor.sell("executor_user_a", "INFY", 2, "trim"))
+        results = await asyncio.gather(*fills)
+        self.assertTrue(all(r.startswith("Completed") for r in results))
+
+        stored = await async_read_account("executor_user_a")
+        self.assertEqual(stored["holdings"], {"INFY": 3})
+        self.assertEqual(len(stored["transactions"]), 6)
+        # Five buys at 100.20 and a sale at 99.80
+        self.assertEqual(str(stored["balance"]), "99698.60")
+
+        stats = self.executor.stats()[0]
+        self.assertEqual((stats["account"], stats["completed"], stats["depth"]), ("executor_user_a", 6, 0))
+        self.assertGreaterEqual(stats["max_depth"], 5)
+
+    async def test_failures_resolve_their_own_future_only(self):
+        bad = self.executor.sell("executor_user_b", "INFY", 1, "nothing held")
+        good = self.executor.buy("executor_user_b", "INFY", 1, "after failure")
+        with self.assertRaises(ValueError):
+            await bad
+        self.assertTrue((await good).startswith("Completed"))
+        self.assertEqual(self.executor.stats()[0]["failed"], 1)
+
+    async def test_accounts_run_in_parallel(self):
+        started = []
+
+        async def hold(account):
+            started.append(account.name)
+            await asyncio.sleep(0.05)
+            return account.name
+
+        a = self.executor.submit("executor_user_a", hold)
+        b = self.executor.submit("executor_user_b", hold)
+        await asyncio.sleep(0.03)
+        self.assertEqual(sorted(started), ["executor_user_a", "executor_user_b"])
+        self.assertEqual(await asyncio.gather(a, b), ["executor_user_a", "executor_user_b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
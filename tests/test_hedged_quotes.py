@@ -0,0 +1,73 @@
+import asyncio
+import time
+import unittest
+from typing import Optional
+from unittest.mock import patch
+from src.core import market
+from src.core.database import setup_database
+from src.core.market import Instrument, MarketProvider, aget_share_price
+
+
+class ScriptedProvider(MarketProvider):
+    """Async provider double answering `price` after `delay` seconds."""
+
+    def __init__(self, price: Optional[float], delay: float = 0.0, specialist: bool = True):
+        self.price = price
+        self.delay = delay
+        self.specialist = specialist
+        self.started = 0
+        self.cancelled = False
+
+    def supports_instrument(self, inst: Instrument) -> bool:
+        return True
+
+    def get_price(self, inst: Instrument) -> Optional[float]:
+        raise AssertionError("the async resolver must not call get_price directly")
+
+    async def aget_price(self, inst: Instrument) -> Optional[float]:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.price
+
+
+class TestHedgedQuotes(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.symbol = f"HEDGE{time.time_ns()}"
+
+    async def _resolve(self, providers, **kwargs):
+        with patch.object(market, "_PROVIDERS", providers):
+            return await aget_share_price(self.symbol, **kwargs)
+
+    async def test_slow_provider_is_hedged_and_cancelled(self):
+        slow, fast = ScriptedProvider(10.0, delay=5), ScriptedProvider(20.0)
+        started = time.perf_counter()
+        self.assertEqual(await self._resolve([slow, fast], hedge_delay_ms=20), 20.0)
+        self.assertLess(time.perf_counter() - started, 1)
+        await asyncio.sleep(0)
+        self.assertTrue(slow.cancelled)
+
+    async def test_empty_answer_fails_over_without_waiting_for_hedge(self):
+        empty, backup = ScriptedProvider(None), ScriptedProvider(30.0, delay=0.01)
+        started = time.perf_counter()
+        self.assertEqual(await self._resolve([empty, backup], hedge_delay_ms=5000), 30.0)
+        self.assertLess(time.perf_counter() - started, 1)
+
+    async def test_specialists_are_tried_before_generalists(self):
+        generalist = ScriptedProvider(1.0, specialist=False)
+        specialist = ScriptedProvider(2.0)
+        self.assertEqual(await self._resolve([generalist, specialist], hedge_delay_ms=1000), 2.0)
+        self.assertEqual(generalist.started, 0)
+
+    async def test_timeout_fails_loudly(self):
+        with self.assertRaises(RuntimeError):
+            await self._resolve([ScriptedProvider(5.0, delay=5)], timeout=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
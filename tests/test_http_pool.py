@@ -0,0 +1,58 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.utils import http
+from src.utils.pinchtab_client import PinchtabClient, get_pinchtab_client
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"status": "ok", "path": self.path}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPooledHttp(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.host = f"127.0.0.1:{self.server.server_address[1]}"
+
+    def test_sync_session_reuses_connection(self):
+        session = http.get_session(f"test-sync-{self.host}")
+        self.assertIs(session, http.get_session(f"test-sync-{self.host}"))
+        for _ in range(5):
+            self.assertEqual(session.get(f"http://{self.host}/quote", timeout=5).json()["status"], "ok")
+        self.assertEqual(session.stats()[self.host], {"requests": 5, "connections": 1, "reused": 4})
+        session.close()
+
+    async def test_async_client_reuses_connection(self):
+        name = f"test-async-{self.host}"
+        client = http.get_async_client(name)
+        self.assertIs(client, http.get_async_client(name))
+        for _ in range(5):
+            resp = await client.get(f"http://{self.host}/quote", timeout=5)
+            self.assertEqual(resp.json()["status"], "ok")
+        self.assertEqual(http.http_pool_stats()[name][self.host], {"requests": 5, "connections": 1, "reused": 4})
+        await http.aclose_async_clients()
+
+    def test_pinchtab_clients_share_one_session(self):
+        client = PinchtabClient(base_url=f"http://{self.host}", token="t")
+        self.assertIs(client.session, get_pinchtab_client().session)
+        self.assertEqual(client.get_status()["path"], "/health")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.core import instruments
+from src.core.instruments import Instrument, InstrumentIndex
+
+
+class TestInstrumentIndex(unittest.TestCase):
+
+    def setUp(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.path = pathlib.Path(path)
+        self.addCleanup(self.path.unlink)
+        self._write({
+            "INFY": {"symbol": "INFY", "exchange": "NSE", "sector": "Information Technology", "lot_size": 1},
+            "AAPL": {"symbol": "AAPL", "exchange": "NASDAQ", "sector": "Information Technology"},
+            "NIFTYBEES": {"symbol": "NIFTYBEES", "exchange": "NSE", "asset_class": "ETF", "lot_size": 10},
+        })
+        self.index = InstrumentIndex([self.path])
+
+    def _write(self, config, mtime=None):
+        self.path.write_text(json.dumps(config), encoding="utf-8")
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_spellings_resolve_to_one_interned_instrument(self):
+        inst = self.index.resolve("US.AAPL")
+        self.assertIs(self.index.resolve("aapl"), inst)
+        self.assertIs(self.index.resolve("NASDAQ:AAPL"), inst)
+        self.assertEqual(inst.key, "NASDAQ:AAPL")
+        self.assertEqual(inst.sector, "Information Technology")
+
+        # Symbols outside the config are parsed by rule once and then shared
+        discovered = self.index.resolve("RELIANCE.NS")
+        self.assertIs(self.index.resolve("reliance"), discovered)
+        self.assertEqual((discovered.exchange, discovered.lot_size, discovered.sector), ("NSE", 1, None))
+        self.assertIs(self.index.get("NSE:RELIANCE"), discovered)
+
+        with self.assertRaises(Exception):
+            inst.symbol = "MSFT"
+
+    def test_screen_by_metadata(self):
+        tech = [inst.symbol for inst in self.index.screen(sector="information technology")]
+        self.assertEqual(tech, ["INFY", "AAPL"])
+        etfs = self.index.screen(exchange="NSE", asset_class="ETF")
+        self.assertEqual([(inst.symbol, inst.lot_size) for inst in etfs], [("NIFTYBEES", 10)])
+
+    def test_hot_reload_when_config_changes(self):
+        self.assertIsNone(self.index.resolve("TCS").sector)
+        self._write({"TCS": {"symbol": "TCS", "exchange": "NSE", "sector": "Information Technology"}},
+                    mtime=self.path.stat().st_mtime + 10)
+        with patch.object(instruments, "INSTRUMENT_RELOAD_CHECK_SECONDS", 0):
+            self.assertEqual(self.index.resolve("TCS").sector, "Information Technology")
+            self.assertEqual(self.index.reloads, 2)
+            self.assertEqual(self.index.resolve("US.AAPL").sector, None)
+
+    def test_parse_uses_shared_index(self):
+        self.assertIs(Instrument.parse("RELIANCE.NS"), Instrument.parse("NSE:RELIANCE"))
+        inst = Instrument("ABC", "BSE")
+        self.assertIs(Instrument.parse(inst), inst)
+        self.assertEqual(inst.key, "BSE:ABC")
+
+
+if __name__ == "__main__":
+    unittest.main()
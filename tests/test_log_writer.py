@@ -0,0 +1,40 @@
+import unittest
+from src.core.database import setup_database, async_read_log, LogBatchWriter
+
+
+class TestLogBatchWriter(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+
+    async def test_rows_are_batched_and_flushed(self):
+        writer = LogBatchWriter(max_batch=50, flush_interval_ms=10_000)
+        for i in range(120):
+            self.assertTrue(writer.submit("log_batch_user", "trace", f"message {i}"))
+        await writer.close()
+
+        stats = writer.stats()
+        self.assertEqual(stats["written"], 120)
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["batches"], 3)
+
+        rows = await async_read_log("log_batch_user", last_n=1)
+        self.assertEqual(rows[0][2], "message 119")
+
+    async def test_full_queue_drops_and_counts(self):
+        writer = LogBatchWriter(max_batch=100, flush_interval_ms=10_000, max_pending=5)
+        accepted = [writer.submit("log_drop_user", "trace", f"message {i}") for i in range(8)]
+        self.assertEqual(accepted.count(False), 3)
+        self.assertEqual(writer.stats()["dropped"], 3)
+        await writer.close()
+        self.assertEqual(writer.stats()["written"], 5)
+
+    async def test_flush_without_running_writer_task(self):
+        writer = LogBatchWriter(max_batch=100, flush_interval_ms=10_000)
+        writer.submit("log_sync_user", "trace", "written on shutdown")
+        writer.flush_sync()
+        self.assertEqual(writer.stats()["written"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
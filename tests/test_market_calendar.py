@@ -0,0 +1,53 @@
+import unittest
+from datetime import date, datetime, time, timezone
+from zoneinfo import ZoneInfo
+from src.core import market_calendar
+from src.core.market import is_market_open, next_market_open
+from src.core.market_calendar import ExchangeCalendar
+
+IST = ZoneInfo("Asia/Kolkata")
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+class TestMarketCalendar(unittest.TestCase):
+
+    def test_regular_session_and_holidays(self):
+        self.assertTrue(is_market_open(datetime(2026, 10, 16, 10, 0, tzinfo=IST)))
+        self.assertFalse(is_market_open(datetime(2026, 10, 16, 9, 0, tzinfo=IST)))
+        self.assertFalse(is_market_open(datetime(2026, 10, 16, 15, 31, tzinfo=IST)))
+        # Dussehra falls on a Tuesday
+        self.assertFalse(is_market_open(datetime(2026, 10, 20, 10, 0, tzinfo=IST)))
+        self.assertEqual(next_market_open(datetime(2026, 10, 19, 16, 0, tzinfo=IST)),
+                         datetime(2026, 10, 21, 9, 15, tzinfo=IST))
+        # BSE shares the NSE calendar
+        self.assertFalse(is_market_open(datetime(2026, 10, 20, 10, 0, tzinfo=IST), exchange="BSE"))
+
+    def test_next_open_over_weekend(self):
+        saturday = datetime(2026, 10, 17, 4, 0, tzinfo=timezone.utc)
+        self.assertFalse(is_market_open(saturday))
+        self.assertEqual(next_market_open(saturday), datetime(2026, 10, 19, 9, 15, tzinfo=IST))
+        # While a session is running, the next open is tomorrow's
+        self.assertEqual(next_market_open(datetime(2026, 10, 16, 11, 0, tzinfo=IST)),
+                         datetime(2026, 10, 19, 9, 15, tzinfo=IST))
+
+    def test_special_sessions(self):
+        # Muhurat trading on a Sunday evening
+        self.assertTrue(is_market_open(datetime(2026, 11, 8, 18, 30, tzinfo=IST)))
+        self.assertEqual(next_market_open(datetime(2026, 11, 7, 12, 0, tzinfo=IST)),
+                         datetime(2026, 11, 8, 18, 0, tzinfo=IST))
+        # US early close after Thanksgiving
+        nasdaq = market_calendar.get_calendar("NASDAQ")
+        self.assertTrue(nasdaq.is_open(datetime(2026, 11, 27, 12, 0, tzinfo=NEW_YORK)))
+        self.assertFalse(nasdaq.is_open(datetime(2026, 11, 27, 14, 0, tzinfo=NEW_YORK)))
+        self.assertEqual(nasdaq.next_close(datetime(2026, 11, 27, 10, 0, tzinfo=NEW_YORK)),
+                         datetime(2026, 11, 27, 13, 0, tzinfo=NEW_YORK))
+
+    def test_tables_extend_beyond_configured_years(self):
+        calendar = ExchangeCalendar("TEST", "Asia/Kolkata", (time(9, 15), time(15, 30)), set(), {})
+        self.assertEqual(calendar.next_open(datetime(2040, 12, 31, 16, 0, tzinfo=IST)),
+                         datetime(2041, 1, 1, 9, 15, tzinfo=IST))
+        self.assertIsNone(calendar.session_on(date(2041, 1, 5)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from src.core import market
+from src.core.database import setup_database
+from src.core.market import get_share_price, get_quote_cache_stats
+from src.core.market_feed import MarketDataDaemon, ReplayFeedSource, TickStore
+
+
+class EmptyProvider(market.MarketProvider):
+    """Provider double that records lookups and never has a quote."""
+
+    def __init__(self):
+        self.requested = []
+
+    def supports_instrument(self, inst) -> bool:
+        return True
+
+    def get_price(self, inst):
+        self.requested.append(inst.symbol)
+        return None
+
+
+class TestTickStore(unittest.TestCase):
+
+    def test_latest_honours_max_age_and_ignores_out_of_order_ticks(self):
+        store = TickStore(buffer_size=3)
+        store.update("nse:infy", 1500.0, ts=100.0)
+        store.update("NSE:INFY", 1499.0, ts=90.0)
+        self.assertEqual(store.latest("NSE:INFY").price, 1500.0)
+        self.assertIsNone(store.latest("NSE:INFY", max_age=5, now=110.0))
+
+        store.update("NSE:TCS", 3500.0, ts=101.0)
+        store.update("NSE:INFY", 1501.0, ts=102.0)
+        # The ring keeps only the newest three ticks
+        self.assertEqual([t.price for t in store.recent()], [1499.0, 3500.0, 1501.0])
+        self.assertEqual([t.price for t in store.recent("NSE:INFY", limit=1)], [1501.0])
+        self.assertEqual(store.stats(), {"instruments": 2, "buffered": 3, "received": 4})
+
+
+class TestReplayFeed(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        fd, self.path = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(fd, "w") as f:
+            for i, (key, price) in enumerate([("NSE:INFY", 1500.0), ("NSE:WIPRO", 450.0),
+                                              ("NSE:INFY", 1502.5), ("NASDAQ:AAPL", 190.0)]):
+                f.write(json.dumps({"key": key, "price": price, "ts": 1722580000 + i}) + "\n")
+        self.addCleanup(os.remove, self.path)
+        self.store = TickStore()
+
+    def _run_daemon(self, held, watchlist=()) -> MarketDataDaemon:
+        source = ReplayFeedSource(self.path)
+        daemon = MarketDataDaemon(source, self.store, watchlist=watchlist, held_symbols=lambda: held).start()
+        self.addCleanup(daemon.stop)
+        self.assertTrue(source.finished.wait(2))
+        return daemon
+
+    async def test_replay_only_delivers_subscribed_instruments(self):
+        daemon = self._run_daemon(held=["INFY"], watchlist=["NASDAQ:AAPL"])
+        self.assertEqual(daemon.keys, {"NSE:INFY", "NASDAQ:AAPL"})
+        self.assertEqual(self.store.latest("NSE:INFY").price, 1502.5)
+        self.assertEqual(self.store.latest("NASDAQ:AAPL").price, 190.0)
+        self.assertIsNone(self.store.latest("NSE:WIPRO"))
+
+    async def test_refresh_subscriptions_tracks_holdings(self):
+        held = ["INFY"]
+        daemon = self._run_daemon(held=held)
+        self.assertFalse(daemon.refresh_subscriptions())
+        held.append("WIPRO")
+        self.assertTrue(daemon.refresh_subscriptions())
+        self.assertEqual(daemon.source._keys, {"NSE:INFY", "NSE:WIPRO"})
+
+    async def test_share_price_reads_live_tick_before_providers(self):
+        symbol = f"FEEDTEST{time.time_ns()}"
+        provider = EmptyProvider()
+        with patch.object(market, "_PROVIDERS", [provider]), \
+                patch.object(market, "tick_store", self.store):
+            self.store.update(f"NSE:{symbol}", 123.25)
+            before = get_quote_cache_stats()["feed_hits"]
+            self.assertEqual(get_share_price(symbol), 123.25)
+            self.assertEqual(await market.aget_share_price(symbol), 123.25)
+            self.assertEqual(get_quote_cache_stats()["feed_hits"], before + 2)
+            self.assertEqual(provider.requested, [])
+
+            # A tick past the freshness window falls through to the providers
+            stale_symbol = f"{symbol}OLD"
+            self.store.update(f"NSE:{stale_symbol}", 120.0, ts=time.time() - 3600)
+            with self.assertRaises(RuntimeError):
+                get_share_price(stale_symbol)
+            self.assertEqual(provider.requested, [stale_symbol])
+
+
+if __name__ == "__main__":
+    unittest.main()
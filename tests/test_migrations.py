@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.core import migrations
+from src.core.migrations import SCHEMA_VERSION, migrate
+
+
+class TestSchemaMigrations(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.conn = sqlite3.connect(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def _tables(self):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+    def test_fresh_database_is_created_then_fast_pathed(self):
+        self.assertEqual(migrate(self.conn), SCHEMA_VERSION)
+        self.assertTrue({"accounts", "holdings", "transactions", "portfolio_history",
+                         "logs", "market", "portfolio_rollups"} <= self._tables())
+
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        self.assertEqual(migrate(self.conn), SCHEMA_VERSION)
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_legacy_json_import_resumes_after_failure(self):
+        self.conn.execute("CREATE TABLE accounts (name TEXT PRIMARY KEY, account TEXT)")
+        good = {"balance": "90000.50", "strategy": "legacy", "holdings": {"infy": 3},
+                "transactions": [{"symbol": "infy", "quantity": 3, "price": "1500.00",
+                                  "timestamp": "2026-08-01 10:00:00", "rationale": "old"}],
+                "portfolio_value_time_series": [["2026-08-01 10:00:00", 94500.5]]}
+        self.conn.executemany("INSERT INTO accounts VALUES (?, ?)", [
+            ("Alice", json.dumps(good)), ("Bob", "{not json"), ("Carol", json.dumps(good)),
+        ])
+        self.conn.commit()
+
+        with patch.object(migrations, "LEGACY_ACCOUNTS_CHUNK", 1):
+            self.assertEqual(migrate(self.conn), 3)
+            remaining = [row[0] for row in self.conn.execute("SELECT name FROM accounts_legacy")]
+            self.assertEqual(remaining, ["Bob", "Carol"])
+
+            self.conn.execute("UPDATE accounts_legacy SET account = ? WHERE name = 'Bob'", (json.dumps(good),))
+            self.conn.commit()
+            self.assertEqual(migrate(self.conn), SCHEMA_VERSION)
+
+        self.assertNotIn("accounts_legacy", self._tables())
+        self.assertEqual(
+            self.conn.execute("SELECT name, balance_paise FROM accounts ORDER BY name").fetchall(),
+            [("alice", 9000050), ("bob", 9000050), ("carol", 9000050)]
+        )
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone(), (3,))
+        # History imported before the rollup migration is backfilled into the rollups
+        self.assertEqual(
+            self.conn.execute("SELECT COUNT(*) FROM portfolio_rollups WHERE resolution = 'day'").fetchone(), (3,)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
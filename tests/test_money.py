@@ -0,0 +1,54 @@
+import sqlite3
+import unittest
+from decimal import Decimal
+from src.core.migrations import _migrate_money_columns
+from src.core.models import quantize_money
+from src.core.money import to_paise, paise_to_decimal, scale_paise
+
+
+class TestPaiseArithmetic(unittest.TestCase):
+
+    def test_to_paise_matches_quantize_money(self):
+        for value in ["1.005", "-2.675", "0.004", "123456.785", 2.675, 1e16, Decimal("7.125"), 42, "+3.1"]:
+            self.assertEqual(paise_to_decimal(to_paise(value)), quantize_money(value), value)
+
+    def test_scale_paise_rounds_half_up(self):
+        self.assertEqual(scale_paise(250, 501, 500), 251)    # 2.50 * 1.002 = 2.505 -> 2.51
+        self.assertEqual(scale_paise(250, 499, 500), 250)    # 2.50 * 0.998 = 2.495 -> 2.50
+        self.assertEqual(scale_paise(-250, 501, 500), -251)
+
+    def test_paise_to_decimal_keeps_two_places(self):
+        self.assertEqual(str(paise_to_decimal(10_000_000)), "100000.00")
+
+
+class TestMoneyColumnMigration(unittest.TestCase):
+
+    def test_text_columns_are_converted_in_place(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE accounts (name TEXT PRIMARY KEY, balance TEXT NOT NULL, strategy TEXT)")
+        conn.execute("""CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, account_name TEXT NOT NULL,
+            symbol TEXT NOT NULL, quantity INTEGER NOT NULL, price TEXT NOT NULL, timestamp TEXT NOT NULL, rationale TEXT)""")
+        conn.execute("""CREATE TABLE portfolio_history (id INTEGER PRIMARY KEY AUTOINCREMENT, account_name TEXT NOT NULL,
+            timestamp TEXT NOT NULL, portfolio_value TEXT NOT NULL)""")
+        conn.execute("INSERT INTO accounts VALUES ('warren', '98765.43', 'value')")
+        conn.executemany(
+            "INSERT INTO transactions (account_name, symbol, quantity, price, timestamp, rationale) VALUES (?, ?, ?, ?, ?, ?)",
+            [("warren", "INFY", 2, "1500.25", f"2026-08-02 10:00:0{i}", "r") for i in range(3)]
+        )
+        conn.executemany(
+            "INSERT INTO portfolio_history (account_name, timestamp, portfolio_value) VALUES (?, ?, ?)",
+            [("warren", "2026-08-02 10:00:00", "100000.5"), ("warren", "2026-08-02 10:01:00", "not-a-number")]
+        )
+        conn.commit()
+
+        _migrate_money_columns(conn)
+
+        self.assertEqual(conn.execute("SELECT balance_paise FROM accounts").fetchone(), (9876543,))
+        self.assertEqual(conn.execute("SELECT SUM(quantity * price_paise) FROM transactions").fetchone(), (900150,))
+        self.assertEqual(conn.execute("SELECT value_paise FROM portfolio_history").fetchall(), [(10000050,)])
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(transactions)")]
+        self.assertNotIn("price", columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.moomoo_client import MoomooClient, MoomooContextPool, MOOMOO_SNAPSHOT_LIMIT
+
+
+class FakeFrame:
+    """The slice of the pandas DataFrame API the pool reads from OpenD responses."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.empty = not rows
+        self.iloc = rows
+
+    def to_dict(self, orient):
+        assert orient == "records"
+        return list(self.rows)
+
+
+class FakeOpenD:
+    """In-process stand-in for an OpenD gateway: counts connections and can drop them all."""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.connections = 0
+        self.generation = 0
+        self.snapshot_requests = []
+        self.lock = threading.Lock()
+
+    def connect(self, kind: str, host: str, port: int) -> "FakeContext":
+        with self.lock:
+            self.connections += 1
+        return FakeContext(self, kind)
+
+    def drop_connections(self) -> None:
+        self.generation += 1
+
+
+class FakeContext:
+    def __init__(self, gateway: FakeOpenD, kind: str):
+        self.gateway = gateway
+        self.kind = kind
+        self.generation = gateway.generation
+        self.closed = False
+
+    def _check(self) -> None:
+        if self.closed or self.generation != self.gateway.generation:
+            raise ConnectionError("OpenD connection lost")
+
+    def get_market_snapshot(self, codes):
+        self._check()
+        self.gateway.snapshot_requests.append(len(codes))
+        rows = [{"code": code, "last_price": self.gateway.prices[code], "high_price": 0.0,
+                 "low_price": 0.0, "volume": 0, "turnover": 0.0}
+                for code in codes if code in self.gateway.prices]
+        return 0, FakeFrame(rows)
+
+    def accinfo_query(self, trd_env):
+        self._check()
+        return 0, FakeFrame([{"total_assets": 5000.0, "cash": 1000.0, "market_val": 4000.0}])
+
+    def close(self):
+        self.closed = True
+
+
+class TestMoomooContextPool(unittest.TestCase):
+
+    def setUp(self):
+        self.gateway = FakeOpenD({"US.AAPL": 190.0, "US.TSLA": 250.0, "HK.700": 380.0})
+        self.pool = MoomooContextPool("127.0.0.1", 11111, factory=self.gateway.connect)
+        self.client = MoomooClient(contexts=self.pool)
+
+    def test_contexts_are_shared_across_calls_and_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            quotes = list(executor.map(self.client.get_stock_quote, ["AAPL"] * 20))
+        self.assertTrue(all(q["last_price"] == 190.0 and q["source"] == "moomoo_opend_api" for q in quotes))
+        self.assertEqual(self.client.get_account_positions()["cash"], 1000.0)
+        # One quote and one trade context for 21 requests
+        self.assertEqual(self.gateway.connections, 2)
+        self.assertEqual(self.pool.stats()["calls"], 21)
+
+    def test_reconnects_after_dropped_connection(self):
+        self.assertEqual(self.client.get_stock_quote("US.TSLA")["last_price"], 250.0)
+        self.gateway.drop_connections()
+        self.assertEqual(self.client.get_stock_quote("US.TSLA")["last_price"], 250.0)
+        self.assertEqual(self.client.get_stock_quote("US.TSLA")["last_price"], 250.0)
+        self.assertEqual(self.gateway.connections, 2)
+        self.assertEqual(self.pool.reconnects, 1)
+
+    def test_multi_symbol_snapshot_is_chunked(self):
+        codes = ["AAPL", "US.TSLA", "HK.700"] + [f"US.X{i}" for i in range(MOOMOO_SNAPSHOT_LIMIT)]
+        quotes = self.client.get_stock_quotes(codes)
+        self.assertEqual({code: q["last_price"] for code, q in quotes.items()},
+                         {"US.AAPL": 190.0, "US.TSLA": 250.0, "HK.700": 380.0})
+        self.assertEqual(self.gateway.snapshot_requests, [MOOMOO_SNAPSHOT_LIMIT, 3])
+        self.assertEqual(self.gateway.connections, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from src.core.database import setup_database, async_read_portfolio_series, db_manager
+from src.core.models import Account
+
+
+class TestPortfolioRollups(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.account = await Account.get("rollup_test_user")
+        await self.account.reset("Rollup Strategy")
+
+    async def _save_points(self, points):
+        self.account.portfolio_value_time_series.extend(points)
+        await self.account.save()
+
+    async def _rollup(self, resolution, bucket):
+        async with db_manager.reader() as db:
+            async with db.execute("""
+                SELECT open_paise, high_paise, low_paise, close_paise, points FROM portfolio_rollups
+                WHERE account_name = ? AND resolution = ? AND bucket = ?
+            """, ("rollup_test_user", resolution, bucket)) as cursor:
+                return await cursor.fetchone()
+
+    async def test_inserts_fold_into_ohlc_buckets(self):
+        await self._save_points([
+            ("2026-08-03 10:00:05", 100000.0),
+            ("2026-08-03 10:00:40", 100500.0),
+            ("2026-08-03 10:01:10", 99000.0),
+        ])
+        # A late point that belongs before the current open
+        await self._save_points([("2026-08-03 10:00:01", 100100.0)])
+
+        self.assertEqual(await self._rollup("minute", "2026-08-03 10:00:00"), (10010000, 10050000, 10000000, 10050000, 3))
+        self.assertEqual(await self._rollup("hour", "2026-08-03 10:00:00"), (10010000, 10050000, 9900000, 9900000, 4))
+        self.assertEqual(await self._rollup("day", "2026-08-03 00:00:00"), (10010000, 10050000, 9900000, 9900000, 4))
+
+    async def test_rewritten_point_rebuilds_its_buckets(self):
+        await self._save_points([("2026-08-03 11:00:00", 100000.0), ("2026-08-03 11:00:30", 120000.0)])
+        async with db_manager.transaction() as db:
+            await db.execute(
+                "UPDATE portfolio_history SET value_paise = ? WHERE account_name = ? AND timestamp = ?",
+                (9000000, "rollup_test_user", "2026-08-03 11:00:30")
+            )
+        self.assertEqual(await self._rollup("minute", "2026-08-03 11:00:00"), (10000000, 10000000, 9000000, 9000000, 2))
+
+    async def test_series_picks_resolution_within_budget(self):
+        await self._save_points([(f"2026-08-03 {hour:02d}:{minute:02d}:00", 100000.0 + hour * 60 + minute)
+                                 for hour in range(9, 15) for minute in range(0, 60, 5)])
+
+        raw = await async_read_portfolio_series("rollup_test_user", max_points=100)
+        self.assertEqual(raw["resolution"], "raw")
+        self.assertEqual(len(raw["points"]), 72)
+
+        hourly = await async_read_portfolio_series("rollup_test_user", max_points=10)
+        self.assertEqual(hourly["resolution"], "hour")
+        self.assertEqual([p[0] for p in hourly["points"]][:2], ["2026-08-03 09:00:00", "2026-08-03 10:00:00"])
+        self.assertEqual(hourly["points"][0][1:], (100540.0, 100595.0, 100540.0, 100595.0))
+
+        windowed = await async_read_portfolio_series("rollup_test_user", start="2026-08-03 14:00:00", max_points=100)
+        self.assertEqual(len(windowed["points"]), 12)
+
+    async def test_reset_clears_rollups(self):
+        await self._save_points([("2026-08-03 12:00:00", 100000.0)])
+        await self.account.reset("Fresh Strategy")
+        series = await async_read_portfolio_series("rollup_test_user")
+        self.assertEqual(series["points"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
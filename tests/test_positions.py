@@ -0,0 +1,81 @@
+import unittest
+from decimal import Decimal
+from src.core.database import setup_database, async_read_account
+from src.core.models import Account, Transaction
+from src.core.positions import Position, PositionLedger
+
+
+class TestPositionLedger(unittest.TestCase):
+
+    def test_fifo_lots_and_realized_pnl(self):
+        position = Position("INFY")
+        position.apply(10, 10_000)
+        position.apply(10, 12_000)
+        position.apply(-15, 13_000)
+
+        self.assertEqual(position.quantity, 5)
+        self.assertEqual(list(position.lots), [[5, 12_000]])
+        self.assertEqual(position.cost_paise, 60_000)
+        self.assertEqual(position.realized_paise, 15 * 13_000 - (10 * 10_000 + 5 * 12_000))
+        self.assertEqual(position.average_cost_paise, 12_000)
+        self.assertEqual(position.unrealized_paise(11_000), -5_000)
+
+    def test_running_totals_match_net_invested(self):
+        ledger = PositionLedger()
+        trades = [("INFY", 10, 10_000), ("TCS", 2, 350_000), ("INFY", -4, 11_000), ("TCS", -2, 340_000)]
+        for trade in trades:
+            ledger.apply(*trade)
+        self.assertEqual(ledger.net_invested_paise, sum(qty * price for _, qty, price in trades))
+        self.assertEqual(ledger.total_realized_paise, 4 * 1_000 - 2 * 10_000)
+
+        restored = PositionLedger.from_rows(ledger.rows())
+        self.assertEqual(restored.net_invested_paise, ledger.net_invested_paise)
+        self.assertEqual(list(restored.positions["INFY"].lots), [[6, 10_000]])
+
+
+class TestAccountPositions(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.account = await Account.get("positions_test_user")
+        await self.account.reset("Positions Strategy")
+
+    def _trade(self, symbol: str, quantity: int, price: str, timestamp: str) -> None:
+        self.account.transactions.append(Transaction(
+            symbol=symbol, quantity=quantity, price=Decimal(price), timestamp=timestamp, rationale="ledger test"
+        ))
+        self.account.holdings[symbol] = self.account.holdings.get(symbol, 0) + quantity
+
+    async def test_only_traded_symbols_are_persisted(self):
+        self._trade("INFY", 10, "100.00", "2026-08-04 10:00:00")
+        self._trade("TCS", 1, "3500.00", "2026-08-04 10:01:00")
+        await self.account.save()
+
+        self._trade("INFY", -4, "110.00", "2026-08-04 10:02:00")
+        self.assertEqual([row["symbol"] for row in self.account.pending_changes()["positions_upsert"]], ["INFY"])
+        await self.account.save()
+
+        stored = await async_read_account("positions_test_user")
+        infy = next(row for row in stored["positions"] if row["symbol"] == "INFY")
+        self.assertEqual((infy["quantity"], infy["cost_paise"], infy["realized_paise"]), (6, 60_000, 4_000))
+
+        lazy = await Account.get("positions_test_user", lazy=True)
+        self.assertEqual(lazy.net_invested_paise(), self.account.net_invested_paise())
+        breakdown = {row["symbol"]: row for row in lazy.get_positions({"INFY": 120.0})}
+        self.assertEqual(breakdown["INFY"]["average_cost"], Decimal("100.00"))
+        self.assertEqual(breakdown["INFY"]["unrealized_pnl"], Decimal("120.00"))
+        self.assertEqual(breakdown["INFY"]["realized_pnl"], Decimal("40.00"))
+        self.assertNotIn("unrealized_pnl", breakdown["TCS"])
+
+    async def test_reset_clears_positions(self):
+        self._trade("INFY", 10, "100.00", "2026-08-04 11:00:00")
+        await self.account.save()
+        await self.account.reset("Fresh Strategy")
+
+        stored = await async_read_account("positions_test_user")
+        self.assertEqual(stored["positions"], [])
+        self.assertEqual(self.account.net_invested_paise(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
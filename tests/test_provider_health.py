@@ -0,0 +1,88 @@
+import time
+import unittest
+from typing import Optional
+from unittest.mock import patch
+from src.core import market
+from src.core.database import setup_database
+from src.core.market import Instrument, MarketProvider, get_provider_health, get_share_prices
+from src.core.provider_health import CLOSED, HALF_OPEN, OPEN, ProviderHealth
+
+
+class ScriptedProvider(MarketProvider):
+    """Provider double with a fixed price (None for failure) and artificial latency."""
+
+    def __init__(self, price: Optional[float], delay: float = 0.0):
+        self.price = price
+        self.delay = delay
+        self.calls = 0
+
+    def supports_instrument(self, inst: Instrument) -> bool:
+        return True
+
+    def get_price(self, inst: Instrument) -> Optional[float]:
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.price
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_failures_and_probes_once_after_cooldown(self):
+        health = ProviderHealth("p", failure_threshold=3, cooldown=10)
+        for now in (0, 1, 2):
+            self.assertTrue(health.allow(now))
+            health.record(False, 0.1, now=now)
+        self.assertEqual(health.snapshot(3)["state"], OPEN)
+        self.assertFalse(health.allow(5))
+
+        # After the cooldown exactly one probe is let through
+        self.assertEqual(health.snapshot(12)["state"], HALF_OPEN)
+        self.assertTrue(health.allow(12))
+        self.assertFalse(health.allow(12.5))
+        health.record(False, 0.1, now=13)
+        self.assertFalse(health.allow(14))
+
+        self.assertTrue(health.allow(23))
+        health.record(True, 0.05, ("NSE",), now=23)
+        self.assertEqual(health.snapshot(23)["state"], CLOSED)
+        self.assertEqual(health.snapshot(23)["trips"], 2)
+        self.assertEqual(health.latency("NSE"), 0.05)
+
+
+class TestHealthAwareRouting(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        market._price_cache.clear()
+
+    def _patch_providers(self, providers):
+        patcher = patch.object(market, "_PROVIDERS", providers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failing_provider_is_skipped_once_open(self):
+        broken, backup = ScriptedProvider(None), ScriptedProvider(99.0)
+        self._patch_providers([broken, backup])
+        for _ in range(6):
+            symbol = f"HEALTH{time.time_ns()}"
+            self.assertEqual(get_share_prices([symbol]), {symbol: 99.0})
+        # Only the calls up to the failure threshold reached the broken provider
+        self.assertEqual(broken.calls, market._provider_health.get(broken).failure_threshold)
+        self.assertEqual(backup.calls, 6)
+        self.assertEqual([h["state"] for h in get_provider_health()], [OPEN, CLOSED])
+        self.assertEqual(get_provider_health()[1]["success_rate"], 1.0)
+
+    def test_fastest_healthy_provider_is_preferred_per_exchange(self):
+        slow, fast = ScriptedProvider(10.0, delay=0.05), ScriptedProvider(20.0)
+        self._patch_providers([slow, fast])
+        # Both get measured while their latency is unknown, then the faster one leads
+        self.assertEqual(market._ordered_providers([slow, fast], "NSE"), [slow, fast])
+        market._provider_health.get(slow).record(True, 0.05, ("NSE",))
+        market._provider_health.get(fast).record(True, 0.001, ("NSE",))
+        self.assertEqual(market._ordered_providers([slow, fast], "NSE"), [fast, slow])
+        self.assertEqual(get_share_prices([f"ROUTE{time.time_ns()}"]).popitem()[1], 20.0)
+        self.assertEqual(slow.calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
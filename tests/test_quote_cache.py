@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+import unittest
+from typing import Optional
+from unittest.mock import patch
+from src.core import market
+from src.core.database import setup_database, read_market_cache_sync, write_market_cache_sync
+from src.core.market import Instrument, MarketProvider, aget_share_price, get_share_price, get_share_prices, get_quote_cache_stats
+from src.core.quote_cache import QuoteCache
+
+
+class CountingProvider(MarketProvider):
+    """Provider double that counts upstream calls."""
+
+    def __init__(self, price: float):
+        self.price = price
+        self.requested = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.requested)
+
+    def supports_instrument(self, inst: Instrument) -> bool:
+        return True
+
+    def get_price(self, inst: Instrument) -> Optional[float]:
+        self.requested.append(inst.symbol)
+        return self.price
+
+
+class BulkProvider(CountingProvider):
+    """Provider double with a bulk endpoint that prices everything except symbols starting with MISSING."""
+
+    def __init__(self, price: float):
+        super().__init__(price)
+        self.batches = []
+
+    def get_prices(self, insts):
+        self.batches.append([inst.symbol for inst in insts])
+        return {f"{inst.exchange}:{inst.symbol}": self.price for inst in insts if not inst.symbol.startswith("MISSING")}
+
+
+class TestTwoTierQuoteCache(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.provider = CountingProvider(321.5)
+        self.symbol = f"CACHETEST{time.time_ns()}"
+        patcher = patch.object(market, "_PROVIDERS", [self.provider])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_l2_serves_other_processes(self):
+        before = get_quote_cache_stats()
+        self.assertEqual(get_share_price(self.symbol), 321.5)
+        self.assertEqual(get_share_price(self.symbol), 321.5)
+
+        # A second process starts with an empty L1 and finds the quote in L2
+        market._price_cache.clear()
+        self.assertEqual(get_share_price(self.symbol), 321.5)
+
+        after = get_quote_cache_stats()
+        self.assertEqual(self.provider.calls, 1)
+        self.assertEqual(after["l1_hits"] - before["l1_hits"], 1)
+        self.assertEqual(after["l2_misses"] - before["l2_misses"], 1)
+        self.assertEqual(after["l2_hits"] - before["l2_hits"], 1)
+        self.assertEqual(after["provider_fetches"] - before["provider_fetches"], 1)
+
+    def test_expired_l2_entry_is_refetched(self):
+        key = f"quote:NSE:{self.symbol}"
+        self.assertTrue(write_market_cache_sync(key, {"price": 1.0}))
+        self.assertIsNotNone(read_market_cache_sync(key, max_age_seconds=60))
+        self.assertIsNone(read_market_cache_sync(key, max_age_seconds=-1))
+
+        with patch.object(market, "_CACHE_TTL_SECONDS", -1):
+            self.assertEqual(get_share_price(self.symbol), 321.5)
+        self.assertEqual(self.provider.calls, 1)
+
+
+
+class TestBatchedQuotes(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.suffix = time.time_ns()
+
+    def test_uncached_symbols_share_one_provider_batch(self):
+        bulk = BulkProvider(50.0)
+        a, b = f"BATCHA{self.suffix}", f"BATCHB{self.suffix}"
+        with patch.object(market, "_PROVIDERS", [bulk]):
+            prices = get_share_prices([a, b, a, f"NASDAQ:{b}"])
+            self.assertEqual(prices, {a: 50.0, b: 50.0, f"NASDAQ:{b}": 50.0})
+            self.assertEqual(len(bulk.batches), 1)
+            self.assertEqual(sorted(bulk.batches[0]), sorted([a, b, b]))
+
+            # Cached now, so no further provider traffic
+            self.assertEqual(get_share_prices([b, a]), {b: 50.0, a: 50.0})
+            self.assertEqual(len(bulk.batches), 1)
+
+            with self.assertRaises(RuntimeError) as ctx:
+                get_share_prices([a, f"MISSING{self.suffix}"])
+            self.assertIn("Live market quote unavailable", str(ctx.exception))
+
+    def test_providers_without_bulk_endpoint_fall_back_per_symbol(self):
+        single = CountingProvider(12.5)
+        symbols = [f"SINGLE{i}X{self.suffix}" for i in range(5)]
+        with patch.object(market, "_PROVIDERS", [single]):
+            self.assertEqual(get_share_prices(symbols), {symbol: 12.5 for symbol in symbols})
+        self.assertEqual(single.calls, 5)
+
+
+
+class SlowProvider(CountingProvider):
+    """Provider double whose lookups take a while, sync and async."""
+
+    def get_prices(self, insts):
+        time.sleep(0.2)
+        return super().get_prices(insts)
+
+    async def aget_price(self, inst):
+        self.requested.append(inst.symbol)
+        await asyncio.sleep(0.05)
+        return self.price
+
+
+class TestQuoteCachePolicies(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        await setup_database()
+        self.symbol = f"POLICY{time.time_ns()}"
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = QuoteCache(max_size=2, ttl=60)
+        cache.put("A", 1.0)
+        cache.put("B", 2.0)
+        cache.get("A")
+        cache.put("C", 3.0)
+        self.assertIsNone(cache.get("B"))
+        self.assertEqual(cache.get("A"), (1.0, True))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    async def test_concurrent_async_misses_share_one_fetch(self):
+        slow = SlowProvider(77.0)
+        with patch.object(market, "_PROVIDERS", [slow]):
+            prices = await asyncio.gather(*[aget_share_price(self.symbol) for _ in range(5)])
+        self.assertEqual(prices, [77.0] * 5)
+        self.assertEqual(slow.calls, 1)
+
+    def test_concurrent_thread_misses_share_one_batch(self):
+        slow = SlowProvider(88.0)
+        results = []
+        with patch.object(market, "_PROVIDERS", [slow]):
+            threads = [threading.Thread(target=lambda: results.append(get_share_price(self.symbol))) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(results, [88.0] * 3)
+        self.assertEqual(slow.calls, 1)
+
+    def test_stale_quote_is_served_while_refreshing(self):
+        fresh = CountingProvider(99.0)
+        key = f"NSE:{self.symbol}"
+        market._price_cache.put(key, 90.0, time.time() - market._price_cache.ttl - 1)
+        with patch.object(market, "_PROVIDERS", [fresh]), patch.object(market, "_L2_CACHE_ENABLED", False):
+            self.assertEqual(get_share_price(self.symbol, allow_stale=True), 90.0)
+            deadline = time.time() + 2
+            while market._price_cache.get(key) is None and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(market._price_cache.get(key), (99.0, True))
+            self.assertEqual(fresh.calls, 1)
+
+    def test_trading_path_never_uses_stale_quotes(self):
+        fresh = CountingProvider(99.0)
+        market._price_cache.put(f"NSE:{self.symbol}", 90.0, time.time() - market._price_cache.ttl - 1)
+        with patch.object(market, "_PROVIDERS", [fresh]), patch.object(market, "_L2_CACHE_ENABLED", False):
+            self.assertEqual(get_share_price(self.symbol), 99.0)
+
+
+if __name__ == "__main__":
+    unittest.main()